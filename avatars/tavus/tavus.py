@@ -5,7 +5,7 @@ from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Optional, List, Dict, Any, TypedDict
 from dotenv import load_dotenv
-from livekit.agents import JobContext, WorkerOptions, cli, WorkerPermissions, RoomOutputOptions
+from livekit.agents import JobContext, JobProcess, WorkerOptions, cli, WorkerPermissions, RoomOutputOptions
 from livekit.agents.llm import function_tool
 from livekit.agents.voice import Agent, AgentSession, RunContext
 from livekit.plugins.turn_detector.english import EnglishModel
@@ -245,7 +245,6 @@ class AvatarAgent(Agent):
                 # voice_id="cjVigY5qzO86Huf0OWal"
                 voice_id="21m00Tcm4TlvDq8ikWAM"
             ),
-            vad=silero.VAD.load(),
         )
 
     @function_tool
@@ -403,6 +402,9 @@ class AvatarAgent(Agent):
         await asyncio.sleep(5)
         self.session.generate_reply()
 
+def prewarm(proc: JobProcess):
+    proc.userdata["vad"] = silero.VAD.load()
+
 async def entrypoint(ctx: JobContext):
     agent = AvatarAgent()
     await ctx.connect()
@@ -411,7 +413,8 @@ async def entrypoint(ctx: JobContext):
     userdata = UserData(ctx=ctx)
     session = AgentSession[UserData](
         userdata=userdata, 
-        turn_detection=EnglishModel()
+        turn_detection=EnglishModel(),
+        vad=ctx.proc.userdata["vad"],
     )
 
     # Create the avatar session
@@ -557,6 +560,7 @@ async def entrypoint(ctx: JobContext):
 if __name__ == "__main__":
     cli.run_app(
         WorkerOptions(
-            entrypoint_fnc=entrypoint
+            entrypoint_fnc=entrypoint,
+            prewarm_fnc=prewarm
         )
     )
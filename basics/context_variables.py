@@ -1,7 +1,7 @@
 import logging
 from pathlib import Path
 from dotenv import load_dotenv
-from livekit.agents import JobContext, WorkerOptions, cli
+from livekit.agents import JobContext, JobProcess, WorkerOptions, cli
 from livekit.agents.voice import Agent, AgentSession
 from livekit.plugins import openai, deepgram, silero
 
@@ -24,13 +24,15 @@ class ContextAgent(Agent):
             instructions=instructions,
             stt=deepgram.STT(),
             llm=openai.LLM(model="gpt-4o"),
-            tts=openai.TTS(),
-            vad=silero.VAD.load()
+            tts=openai.TTS()
         )
     
     async def on_enter(self):
         self.session.generate_reply()
 
+def prewarm(proc: JobProcess):
+    proc.userdata["vad"] = silero.VAD.load()
+
 async def entrypoint(ctx: JobContext):
     await ctx.connect()
 
@@ -40,7 +42,7 @@ async def entrypoint(ctx: JobContext):
         "city": "Toronto"
     }
 
-    session = AgentSession()
+    session = AgentSession(vad=ctx.proc.userdata["vad"])
 
     await session.start(
         agent=ContextAgent(context_vars=context_variables),
@@ -48,4 +50,4 @@ async def entrypoint(ctx: JobContext):
     )
 
 if __name__ == "__main__":
-    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint))
\ No newline at end of file
+    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint, prewarm_fnc=prewarm))
\ No newline at end of file
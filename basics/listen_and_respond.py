@@ -2,7 +2,7 @@ import logging
 import os
 from pathlib import Path
 from dotenv import load_dotenv
-from livekit.agents import JobContext, WorkerOptions, cli
+from livekit.agents import JobContext, JobProcess, WorkerOptions, cli
 from livekit.agents.voice import Agent, AgentSession
 from livekit.plugins import openai, silero, deepgram
 
@@ -19,17 +19,20 @@ class SimpleAgent(Agent):
             """,
             stt=deepgram.STT(),
             llm=openai.LLM(model="gpt-4o"),
-            tts=openai.TTS(),
-            vad=silero.VAD.load()
+            tts=openai.TTS()
         )
     
     async def on_enter(self):
         self.session.generate_reply()
 
+def prewarm(proc: JobProcess):
+    # Load the VAD once per worker process instead of in every session
+    proc.userdata["vad"] = silero.VAD.load()
+
 async def entrypoint(ctx: JobContext):
     await ctx.connect()
 
-    session = AgentSession()
+    session = AgentSession(vad=ctx.proc.userdata["vad"])
 
     await session.start(
         agent=SimpleAgent(),
@@ -37,4 +40,4 @@ async def entrypoint(ctx: JobContext):
     )
 
 if __name__ == "__main__":
-    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint))
\ No newline at end of file
+    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint, prewarm_fnc=prewarm))
\ No newline at end of file
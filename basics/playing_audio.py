@@ -2,7 +2,7 @@ import logging
 from pathlib import Path
 import wave
 from dotenv import load_dotenv
-from livekit.agents import JobContext, WorkerOptions, cli
+from livekit.agents import JobContext, JobProcess, WorkerOptions, cli
 from livekit.agents.llm import function_tool
 from livekit.agents.voice import Agent, AgentSession, RunContext
 from livekit.plugins import deepgram, openai, silero
@@ -22,8 +22,7 @@ class FunctionAgent(Agent):
             """,
             stt=deepgram.STT(),
             llm=openai.LLM(model="gpt-4o"),
-            tts=openai.TTS(),
-            vad=silero.VAD.load()
+            tts=openai.TTS()
         )
 
     @function_tool
@@ -52,10 +51,13 @@ class FunctionAgent(Agent):
     async def on_enter(self):
         self.session.generate_reply()
 
+def prewarm(proc: JobProcess):
+    proc.userdata["vad"] = silero.VAD.load()
+
 async def entrypoint(ctx: JobContext):
     await ctx.connect()
 
-    session = AgentSession()
+    session = AgentSession(vad=ctx.proc.userdata["vad"])
 
     await session.start(
         agent=FunctionAgent(),
@@ -63,4 +65,4 @@ async def entrypoint(ctx: JobContext):
     )
 
 if __name__ == "__main__":
-    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint))
\ No newline at end of file
+    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint, prewarm_fnc=prewarm))
\ No newline at end of file
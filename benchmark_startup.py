@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+"""
+benchmark_startup.py
+────────────────────
+Measure how long the basics/ and flows/ examples spend on a session's
+critical path before the agent can respond: building the first agent, plus
+loading the Silero VAD when that happened in the agent's __init__.
+
+The examples now load the VAD once per worker process in `prewarm`
+(WorkerOptions(prewarm_fnc=...)) and hand it to every session through
+proc.userdata, so a session only pays for the agent itself. For each example
+this prints the per-session startup time both ways and the one-off prewarm
+cost, which the worker pays before it accepts any job.
+
+USAGE
+=====
+
+    python benchmark_startup.py --sessions 20
+
+Plugin constructors need API keys but make no requests, so placeholder keys
+are used when none are set.
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import os
+import sys
+import time
+from pathlib import Path
+
+for key in ("DEEPGRAM_API_KEY", "OPENAI_API_KEY", "CARTESIA_API_KEY"):
+    os.environ.setdefault(key, "benchmark")
+
+from livekit.plugins import silero
+
+ROOT = Path(__file__).parent
+
+# (directory, module, builds the agent the example's entrypoint starts with,
+#  given the module and the prewarmed proc.userdata)
+EXAMPLES = [
+    ("basics", "listen_and_respond", lambda m, userdata: m.SimpleAgent()),
+    ("basics", "function_calling", lambda m, userdata: m.FunctionAgent()),
+    ("basics", "context_variables", lambda m, userdata: m.ContextAgent(context_vars={"name": "Shayne", "age": 35, "city": "Toronto"})),
+    ("basics", "playing_audio", lambda m, userdata: m.FunctionAgent()),
+    ("flows", "simple_flow", lambda m, userdata: m.GreetingAgent(job_context=None)),
+    ("flows", "multi_stage_flow", lambda m, userdata: m.Stage1Agent(job_context=None)),
+    ("flows", "declarative_flow", lambda m, userdata: m.FlowRun(userdata["flow"], None).start_agent),
+]
+
+
+class Proc:
+    """The part of JobProcess that prewarm functions use."""
+
+    def __init__(self) -> None:
+        self.userdata: dict = {}
+
+
+def load_example(directory: str, name: str):
+    sys.path.insert(0, str(ROOT / directory))
+    try:
+        return importlib.import_module(name)
+    finally:
+        sys.path.pop(0)
+
+
+def median(values):
+    values = sorted(values)
+    return values[len(values) // 2]
+
+
+def time_sessions(start_session, sessions: int):
+    timings = []
+    for _ in range(sessions):
+        start = time.perf_counter()
+        start_session()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark session startup with and without a prewarmed VAD")
+    parser.add_argument("--sessions", type=int, default=20, help="Sessions to start per example")
+    args = parser.parse_args()
+
+    print(f"{'example':<28}{'prewarm':>10}{'VAD per session':>18}{'prewarmed':>12}{'saved':>10}")
+    for directory, name, build_agent in EXAMPLES:
+        module = load_example(directory, name)
+
+        proc = Proc()
+        start = time.perf_counter()
+        module.prewarm(proc)
+        prewarm = time.perf_counter() - start
+
+        # Before: every session loaded the VAD while building its agent
+        before = median(time_sessions(lambda: (silero.VAD.load(), build_agent(module, proc.userdata)), args.sessions))
+        after = median(time_sessions(lambda: build_agent(module, proc.userdata), args.sessions))
+        print(f"{directory + '/' + name:<28}"
+              f"{prewarm * 1000:>8.1f}ms"
+              f"{before * 1000:>16.2f}ms"
+              f"{after * 1000:>10.2f}ms"
+              f"{(before - after) * 1000:>8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
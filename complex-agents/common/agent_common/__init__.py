@@ -0,0 +1,22 @@
+"""
+Helpers shared by the agents in complex-agents/. Install once with
+
+    pip install -e complex-agents/common
+
+(requirements.txt at the repository root already does), so every agent can
+import them however it is started.
+"""
+
+from .chat_handoff import HandoffContext, estimate_tokens, item_text, llm_summarizer
+from .prompt_registry import PromptRegistry
+from .usage_ledger import Usage, UsageLedger
+
+__all__ = [
+    "HandoffContext",
+    "PromptRegistry",
+    "Usage",
+    "UsageLedger",
+    "estimate_tokens",
+    "item_text",
+    "llm_summarizer",
+]
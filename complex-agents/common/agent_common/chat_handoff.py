@@ -0,0 +1,157 @@
+"""
+Chat context handed from one agent to the next in multi-agent flows.
+"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional
+
+from livekit.agents.llm import ChatContext, ChatMessage
+
+logger = logging.getLogger("chat-handoff")
+
+
+# Rough token counting without a tokenizer dependency: about four characters
+# per token for English, plus a few tokens of per-item framing
+CHARS_PER_TOKEN = 4
+TOKENS_PER_ITEM = 4
+
+
+def estimate_tokens(text: str) -> int:
+    return TOKENS_PER_ITEM + (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def item_text(item) -> str:
+    """The text a chat item contributes to the prompt."""
+    if item.type == "message":
+        return "\n".join(c for c in item.content if isinstance(c, str))
+    if item.type == "function_call":
+        return f"{item.name}({item.arguments})"
+    if item.type == "function_call_output":
+        return item.output
+    return ""
+
+
+def llm_summarizer(llm) -> Callable[[str, list[str]], Awaitable[str]]:
+    """A `summarize` function for HandoffContext that asks `llm` for the summary."""
+    async def summarize(previous: str, lines: list[str]) -> str:
+        chat_ctx = ChatContext()
+        chat_ctx.add_message(
+            role="system",
+            content="Summarize this conversation in at most five short sentences. "
+                    "Keep names, numbers, dates and anything the caller asked for."
+        )
+        transcript = "\n".join(lines)
+        if previous:
+            transcript = f"Summary so far: {previous}\n\n{transcript}"
+        chat_ctx.add_message(role="user", content=transcript)
+        text = []
+        async with llm.chat(chat_ctx=chat_ctx) as stream:
+            async for chunk in stream:
+                if chunk.delta and chunk.delta.content:
+                    text.append(chunk.delta.content)
+        return "".join(text).strip()
+    return summarize
+
+
+class HandoffContext:
+    """
+    Chooses which chat items one agent hands to the next, within a token budget.
+
+    Items are taken newest first until `max_tokens` is reached, so the next
+    agent's prompt size stays bounded however long the call gets. Any single
+    message or tool output larger than `max_item_tokens` is clipped, so one
+    long tool result can't crowd out the rest. Token counts are cached by
+    item ID, so each item is only measured once per session.
+
+    With a `summarize` function (see `llm_summarizer`), items that fall out of
+    the budget are folded into a rolling summary that is handed over as a
+    system message. The summary is refreshed in the background, so a handoff
+    never waits on the LLM; it uses the latest summary that is ready.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = 1500,
+        *,
+        max_item_tokens: int = 400,
+        count_tokens: Callable[[str], int] = estimate_tokens,
+        summarize: Optional[Callable[[str, list[str]], Awaitable[str]]] = None,
+    ):
+        self.max_tokens = max_tokens
+        self.max_item_tokens = max_item_tokens
+        self.count_tokens = count_tokens
+        self.summarize = summarize
+        self._tokens: dict[str, int] = {}
+        self._clipped: dict[str, object] = {}
+        self._summary_text = ""
+        self._summary: Optional[ChatMessage] = None
+        self._summary_tokens = 0
+        self._summarized: set[str] = set()
+        self._summary_task: Optional[asyncio.Task] = None
+
+    def tokens(self, item) -> int:
+        count = self._tokens.get(item.id)
+        if count is None:
+            count = self._tokens[item.id] = self.count_tokens(item_text(item))
+        return count
+
+    def select(self, items: list, keep_system_message: bool = False, keep_function_call: bool = False) -> list:
+        """The newest `items` that fit the budget, oldest first."""
+        def _valid_item(item) -> bool:
+            if not keep_system_message and item.type == "message" and item.role == "system":
+                return False
+            if not keep_function_call and item.type in ["function_call", "function_call_output"]:
+                return False
+            return True
+
+        valid = [item for item in items if _valid_item(item)]
+        budget = self.max_tokens - (self._summary_tokens if self._summary else 0)
+        new_items = []
+        for item in reversed(valid):
+            item = self._clip(item)
+            budget -= self.tokens(item)
+            if budget < 0:
+                break
+            new_items.append(item)
+        new_items = new_items[::-1]
+
+        # A tool call's output without the call itself would confuse the LLM
+        while new_items and new_items[0].type in ["function_call", "function_call_output"]:
+            new_items.pop(0)
+
+        if self.summarize is not None:
+            kept = {item.id for item in new_items}
+            dropped = [item for item in valid if item.id not in kept and item.id not in self._summarized]
+            if dropped and (self._summary_task is None or self._summary_task.done()):
+                self._summary_task = asyncio.create_task(self._update_summary(dropped))
+        if self._summary is not None:
+            new_items.insert(0, self._summary)
+        return new_items
+
+    def _clip(self, item):
+        clipped = self._clipped.get(item.id)
+        if clipped is not None:
+            return clipped
+        if self.tokens(item) <= self.max_item_tokens or item.type not in ["message", "function_call_output"]:
+            return item
+        text = item_text(item)[:self.max_item_tokens * CHARS_PER_TOKEN] + " ... [truncated]"
+        update = {"content": [text]} if item.type == "message" else {"output": text}
+        clipped = self._clipped[item.id] = item.model_copy(update=update)
+        # The copy keeps the original's ID, so its clipped size replaces the full one
+        self._tokens[item.id] = self.count_tokens(text)
+        return clipped
+
+    async def _update_summary(self, items: list):
+        lines = [f"{item.role if item.type == 'message' else item.type}: {item_text(self._clip(item))}" for item in items]
+        try:
+            summary = await self.summarize(self._summary_text, lines)
+        except Exception:
+            logger.exception("failed to summarize the conversation for handoff")
+            return
+        if summary:
+            self._summary_text = summary
+            content = f"Summary of the earlier conversation: {summary}"
+            self._summary = ChatMessage(role="system", content=[content])
+            self._summary_tokens = self.count_tokens(content)
+            self._summarized.update(item.id for item in items)
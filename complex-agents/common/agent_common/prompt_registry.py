@@ -0,0 +1,73 @@
+"""
+Prompt loading for agents that keep their instructions in YAML files.
+"""
+
+import os
+import threading
+import time
+from string import Template
+
+import yaml
+
+
+class PromptRegistry:
+    """
+    Prompt YAML files parsed once per process and kept in memory.
+
+    A file is only re-read when its modification time or size changes, and
+    that is checked at most once every `check_interval` seconds, so agents
+    built during a session cost a dictionary lookup rather than a file read
+    and a YAML parse. Prompts may contain `$name` placeholders, which are
+    rendered from precompiled templates.
+    """
+
+    def __init__(self, directory: str, check_interval: float = 1.0):
+        self.directory = directory
+        self.check_interval = check_interval
+        # filename -> (stat signature, parsed YAML, compiled templates, last check)
+        self._prompts = {}
+        self._lock = threading.Lock()
+
+    def load_all(self) -> int:
+        """Parse every prompt file in the directory, e.g. in a worker's prewarm."""
+        filenames = [name for name in os.listdir(self.directory) if name.endswith(('.yaml', '.yml'))]
+        for filename in filenames:
+            self._entry(filename)
+        return len(filenames)
+
+    def get(self, filename: str, key: str = 'instructions', **variables) -> str:
+        """A prompt's text, with any `$name` placeholders filled from `variables`."""
+        entry = self._entry(filename)
+        if entry is None:
+            return ""
+        _, data, templates, _ = entry
+        if not variables:
+            return data.get(key, '')
+        template = templates.get(key)
+        if template is None:
+            template = templates[key] = Template(data.get(key, ''))
+        # safe_substitute leaves prices like "$50" and unknown names untouched
+        return template.safe_substitute(variables)
+
+    def _entry(self, filename: str):
+        entry = self._prompts.get(filename)
+        now = time.monotonic()
+        if entry is not None and now - entry[3] < self.check_interval:
+            return entry
+
+        path = os.path.join(self.directory, filename)
+        with self._lock:
+            try:
+                stat = os.stat(path)
+                signature = (stat.st_mtime_ns, stat.st_size)
+                if entry is not None and entry[0] == signature:
+                    entry = self._prompts[filename] = (signature, entry[1], entry[2], now)
+                    return entry
+                with open(path, 'r') as file:
+                    data = yaml.safe_load(file) or {}
+            except (OSError, yaml.YAMLError) as e:
+                print(f"Error loading prompt file {filename}: {e}")
+                # Keep serving the last good version while a file is being edited
+                return entry
+            entry = self._prompts[filename] = (signature, data, {}, now)
+            return entry
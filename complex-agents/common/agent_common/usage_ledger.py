@@ -0,0 +1,145 @@
+"""
+Per-session usage accounting for LLM tokens, TTS characters and STT audio.
+
+`UsageLedger` keeps running totals for one session, broken down by persona
+(the agent class that was active when the usage happened), and writes one
+summary record when the session closes. In multi-agent flows such as the
+personal shopper or medical triage, this shows which persona uses the most
+tokens.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from dataclasses import asdict, dataclass
+from typing import Callable, Optional
+
+from livekit.agents.metrics import LLMMetrics, STTMetrics, TTSMetrics
+
+logger = logging.getLogger("usage-ledger")
+
+
+@dataclass
+class Usage:
+    llm_requests: int = 0
+    prompt_tokens: int = 0
+    prompt_cached_tokens: int = 0
+    completion_tokens: int = 0
+    tts_requests: int = 0
+    tts_characters: int = 0
+    tts_audio_duration: float = 0.0
+    stt_audio_duration: float = 0.0
+
+    def add(self, other: "Usage") -> None:
+        for name, value in asdict(other).items():
+            setattr(self, name, getattr(self, name) + value)
+
+    def cost(self, prices: dict[str, float]) -> float:
+        """Estimated cost, given a price per unit for any of the fields above"""
+        return sum(getattr(self, name) * price for name, price in prices.items())
+
+
+class UsageLedger:
+    """
+    Accumulates usage for one session.
+
+    `persona` is called for every event to decide which bucket it goes in;
+    `attach` defaults it to the class name of the session's current agent.
+    `prices` optionally maps Usage field names to a price per unit (for
+    example {"prompt_tokens": 0.15e-6, "completion_tokens": 0.6e-6}) so the
+    summary includes an estimated cost.
+    """
+
+    def __init__(
+        self,
+        session_id: str,
+        *,
+        tenant: Optional[str] = None,
+        persona: Optional[Callable[[], str]] = None,
+        prices: Optional[dict[str, float]] = None,
+        summary_path: Optional[str] = None,
+    ) -> None:
+        self.session_id = session_id
+        self.tenant = tenant
+        self._persona = persona
+        self._prices = prices or {}
+        self._summary_path = summary_path
+        self._started_at = time.time()
+        self._by_persona: dict[str, Usage] = {}
+        self._closed = False
+
+    def attach(self, session) -> "UsageLedger":
+        """Observe a session's metrics, attributing usage to its current agent."""
+        def current_persona() -> str:
+            try:
+                return type(session.current_agent).__name__
+            except RuntimeError:
+                return "unknown"
+
+        if self._persona is None:
+            self._persona = current_persona
+        session.on("metrics_collected", lambda ev: self.observe(ev.metrics))
+        return self
+
+    def observe(self, metrics) -> None:
+        if isinstance(metrics, LLMMetrics):
+            usage = self._usage()
+            usage.llm_requests += 1
+            usage.prompt_tokens += metrics.prompt_tokens
+            usage.prompt_cached_tokens += getattr(metrics, "prompt_cached_tokens", 0) or 0
+            usage.completion_tokens += metrics.completion_tokens
+        elif isinstance(metrics, TTSMetrics):
+            usage = self._usage()
+            usage.tts_requests += 1
+            usage.tts_characters += metrics.characters_count
+            usage.tts_audio_duration += metrics.audio_duration
+        elif isinstance(metrics, STTMetrics):
+            self._usage().stt_audio_duration += metrics.audio_duration
+
+    def totals(self) -> Usage:
+        """Running totals across all personas."""
+        total = Usage()
+        for usage in self._by_persona.values():
+            total.add(usage)
+        return total
+
+    def by_persona(self) -> dict[str, Usage]:
+        return dict(self._by_persona)
+
+    def summary(self) -> dict:
+        total = self.totals()
+        record = {
+            "session_id": self.session_id,
+            "tenant": self.tenant,
+            "started_at": self._started_at,
+            "ended_at": time.time(),
+            "total": asdict(total),
+            "personas": {name: asdict(usage) for name, usage in self._by_persona.items()},
+        }
+        if self._prices:
+            record["estimated_cost"] = total.cost(self._prices)
+            record["persona_costs"] = {name: usage.cost(self._prices) for name, usage in self._by_persona.items()}
+        return record
+
+    async def close(self) -> dict:
+        """Write the summary record once; safe to use as a shutdown callback."""
+        record = self.summary()
+        if self._closed:
+            return record
+        self._closed = True
+        logger.info(f"Session usage: {json.dumps(record)}")
+        if self._summary_path:
+            await asyncio.to_thread(self._append_summary, record)
+        return record
+
+    def _usage(self) -> Usage:
+        persona = self._persona() if self._persona is not None else "default"
+        usage = self._by_persona.get(persona)
+        if usage is None:
+            usage = self._by_persona[persona] = Usage()
+        return usage
+
+    def _append_summary(self, record: dict) -> None:
+        with open(self._summary_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
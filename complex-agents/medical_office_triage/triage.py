@@ -1,15 +1,17 @@
 import logging
+import os
 from dataclasses import dataclass, field
 from typing import Optional
 
 from dotenv import load_dotenv
-from livekit.agents import JobContext, WorkerOptions, cli
+from livekit.agents import JobContext, JobProcess, WorkerOptions, cli
 from livekit.agents.llm import function_tool
 from livekit.agents.voice import Agent, AgentSession, RunContext
 from livekit.plugins import cartesia, deepgram, openai, silero
 from livekit.plugins import noise_cancellation
 
-from utils import load_prompt
+from agent_common import HandoffContext, UsageLedger, llm_summarizer
+from utils import load_prompt, prompts
 
 logger = logging.getLogger("medical-office-triage")
 logger.setLevel(logging.INFO)
@@ -22,6 +24,7 @@ class UserData:
     personas: dict[str, Agent] = field(default_factory=dict)
     prev_agent: Optional[Agent] = None
     ctx: Optional[JobContext] = None
+    handoff: HandoffContext = field(default_factory=HandoffContext)
 
     def summarize(self) -> str:
         return "User data: Medical office triage system"
@@ -57,30 +60,12 @@ class BaseAgent(Agent):
     def _truncate_chat_ctx(
         self,
         items: list,
-        keep_last_n_messages: int = 6,
         keep_system_message: bool = False,
         keep_function_call: bool = False,
     ) -> list:
-        """Truncate the chat context to keep the last n messages."""
-        def _valid_item(item) -> bool:
-            if not keep_system_message and item.type == "message" and item.role == "system":
-                return False
-            if not keep_function_call and item.type in ["function_call", "function_call_output"]:
-                return False
-            return True
-
-        new_items = []
-        for item in reversed(items):
-            if _valid_item(item):
-                new_items.append(item)
-            if len(new_items) >= keep_last_n_messages:
-                break
-        new_items = new_items[::-1]
-
-        while new_items and new_items[0].type in ["function_call", "function_call_output"]:
-            new_items.pop(0)
-
-        return new_items
+        """Keep the most recent items that fit the session's handoff token budget."""
+        userdata: UserData = self.session.userdata
+        return userdata.handoff.select(items, keep_system_message, keep_function_call)
 
     async def _transfer_to_agent(self, name: str, context: RunContext_T) -> Agent:
         """Transfer to another agent while preserving context"""
@@ -98,8 +83,7 @@ class TriageAgent(BaseAgent):
             instructions=load_prompt('triage_prompt.yaml'),
             stt=deepgram.STT(),
             llm=openai.LLM(model="gpt-4o-mini"),
-            tts=cartesia.TTS(),
-            vad=silero.VAD.load()
+            tts=cartesia.TTS()
         )
 
     @function_tool
@@ -119,8 +103,7 @@ class SupportAgent(BaseAgent):
             instructions=load_prompt('support_prompt.yaml'),
             stt=deepgram.STT(),
             llm=openai.LLM(model="gpt-4o-mini"),
-            tts=cartesia.TTS(),
-            vad=silero.VAD.load()
+            tts=cartesia.TTS()
         )
 
     @function_tool
@@ -140,8 +123,7 @@ class BillingAgent(BaseAgent):
             instructions=load_prompt('billing_prompt.yaml'),
             stt=deepgram.STT(),
             llm=openai.LLM(model="gpt-4o-mini"),
-            tts=cartesia.TTS(),
-            vad=silero.VAD.load()
+            tts=cartesia.TTS()
         )
 
     @function_tool
@@ -155,10 +137,20 @@ class BillingAgent(BaseAgent):
         return await self._transfer_to_agent("support", context)
 
 
+def prewarm(proc: JobProcess):
+    # Parse the prompt files and load the VAD once per worker process, before
+    # any session starts; every persona shares the one VAD
+    prompts.load_all()
+    proc.userdata["vad"] = silero.VAD.load()
+
+
 async def entrypoint(ctx: JobContext):
     await ctx.connect()
 
     userdata = UserData(ctx=ctx)
+    if os.getenv("HANDOFF_SUMMARY_MODEL"):
+        # Fold turns that no longer fit the handoff budget into a rolling summary
+        userdata.handoff.summarize = llm_summarizer(openai.LLM(model=os.getenv("HANDOFF_SUMMARY_MODEL")))
     triage_agent = TriageAgent()
     support_agent = SupportAgent()
     billing_agent = BillingAgent()
@@ -170,7 +162,13 @@ async def entrypoint(ctx: JobContext):
         "billing": billing_agent
     })
 
-    session = AgentSession[UserData](userdata=userdata)
+    session = AgentSession[UserData](userdata=userdata, vad=ctx.proc.userdata["vad"])
+
+    # Track tokens, TTS characters and STT audio per persona; the summary is
+    # logged (and appended to USAGE_SUMMARY_PATH if set) when the job ends
+    ledger = UsageLedger(session_id=ctx.room.name, summary_path=os.getenv("USAGE_SUMMARY_PATH"))
+    ledger.attach(session)
+    ctx.add_shutdown_callback(ledger.close)
 
     await session.start(
         agent=triage_agent,  # Start with the Medical Office Triage agent
@@ -178,4 +176,4 @@ async def entrypoint(ctx: JobContext):
     )
 
 if __name__ == "__main__":
-    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint))
\ No newline at end of file
+    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint, prewarm_fnc=prewarm))
\ No newline at end of file
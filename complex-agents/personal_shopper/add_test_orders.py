@@ -93,14 +93,12 @@ def add_test_orders():
         "shipping_address": "123 Main St, Anytown, USA"
     }
     
-    # Add orders to database
-    order1_id = db.add_order(customer_id, order1)
+    # Add all orders to the database in one transaction
+    order1_id, order2_id, order3_id = db.import_orders(
+        (customer_id, order, None) for order in (order1, order2, order3)
+    )
     logger.info(f"Added Order #{order1_id}: Electronics - Total: ${order1['total']}")
-    
-    order2_id = db.add_order(customer_id, order2)
     logger.info(f"Added Order #{order2_id}: Clothing - Total: ${order2['total']}")
-    
-    order3_id = db.add_order(customer_id, order3)
     logger.info(f"Added Order #{order3_id}: Home Goods - Total: ${order3['total']}")
     
     # Verify orders were added
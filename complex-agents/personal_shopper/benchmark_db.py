@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Benchmark CustomerDatabase under many concurrent shoppers.
+
+Each simulated shopper runs on its own thread, like concurrent agent sessions
+in one worker: it identifies itself, places several orders and reads its
+order history back. The same workload runs twice against fresh databases in a
+temporary directory:
+
+- legacy: a new connection per call in the default rollback-journal mode
+  (how CustomerDatabase used to work)
+- pooled: one persistent WAL connection per thread with tuned pragmas
+
+    python benchmark_db.py --shoppers 32 --orders 20
+"""
+
+import argparse
+import functools
+import logging
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import closing
+
+from database import CustomerDatabase
+
+FIRST_NAMES = ["Shayne", "Maria", "Wei", "Aisha", "Lars", "Priya", "Tom", "Yuki", "Omar", "Elena"]
+LAST_NAMES = ["Parlo", "Garcia", "Chen", "Khan", "Berg", "Patel", "Smith", "Sato", "Haddad", "Rossi"]
+PRODUCTS = [("Wireless Earbuds", 149.99), ("Phone Case", 29.99), ("Running Shoes", 89.5),
+            ("Coffee Grinder", 54.0), ("Desk Lamp", 39.99), ("Backpack", 74.25)]
+
+
+def per_call_connection(method):
+    """Run `method` on its own default connection, closed when it returns."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with closing(self._connect()) as conn:
+            # _conn() hands this connection to everything the call runs
+            self._local.conn = conn
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                self._local.conn = None
+    return wrapper
+
+
+class LegacyCustomerDatabase(CustomerDatabase):
+    """
+    The previous behaviour: every call opens a default connection
+    (rollback journal, no pragmas) and closes it before returning.
+    """
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    _initialize_db = per_call_connection(CustomerDatabase._initialize_db)
+    get_or_create_customer = per_call_connection(CustomerDatabase.get_or_create_customer)
+    add_order = per_call_connection(CustomerDatabase.add_order)
+    get_customer_order_history = per_call_connection(CustomerDatabase.get_customer_order_history)
+
+
+def random_order():
+    return {"items": [{"name": name, "quantity": random.randint(1, 3), "price": price}
+                      for name, price in random.sample(PRODUCTS, random.randint(1, 3))]}
+
+
+def shopper(db, index, orders, latencies, lock):
+    timings = []
+    first_name = random.choice(FIRST_NAMES)
+    last_name = f"{random.choice(LAST_NAMES)}{index}"
+
+    start = time.perf_counter()
+    customer_id = db.get_or_create_customer(first_name, last_name)
+    timings.append(time.perf_counter() - start)
+    for _ in range(orders):
+        start = time.perf_counter()
+        db.add_order(customer_id, random_order())
+        timings.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        db.get_customer_order_history(first_name, last_name)
+        timings.append(time.perf_counter() - start)
+
+    with lock:
+        latencies.extend(timings)
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+def run(db_class, path, shoppers, orders):
+    db = db_class(path)
+    latencies = []
+    lock = threading.Lock()
+    threads = [threading.Thread(target=shopper, args=(db, i, orders, latencies, lock)) for i in range(shoppers)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    db.close()
+    return elapsed, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CustomerDatabase with concurrent shoppers")
+    parser.add_argument("--shoppers", type=int, default=32, help="Concurrent simulated shoppers")
+    parser.add_argument("--orders", type=int, default=20, help="Orders placed by each shopper")
+    args = parser.parse_args()
+
+    # The per-call info logs would dominate the timings
+    logging.getLogger("personal-shopper-db").setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, db_class in (("legacy", LegacyCustomerDatabase), ("pooled", CustomerDatabase)):
+            elapsed, latencies = run(db_class, os.path.join(tmp, f"{name}.db"), args.shoppers, args.orders)
+            print(f"{name:>7}: {len(latencies) / elapsed:8,.0f} ops/s   "
+                  f"p50 {percentile(latencies, 50) * 1000:7.2f}ms   "
+                  f"p95 {percentile(latencies, 95) * 1000:7.2f}ms   "
+                  f"p99 {percentile(latencies, 99) * 1000:7.2f}ms   "
+                  f"({args.shoppers} shoppers x {args.orders} orders in {elapsed:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark CustomerDatabase read paths against a large dataset.
+
+Picks random customers from a database built by generate_dataset.py and
+times every read the agents make, so index and caching changes can be
+compared run to run:
+
+    python generate_dataset.py --db /tmp/shopper.db --customers 1000000
+    python benchmark_reads.py --db /tmp/shopper.db --samples 2000
+
+Order history is timed twice: cold (first read of a customer) and cached
+(the same page again).
+"""
+
+import argparse
+import logging
+import random
+import time
+
+from database import CustomerDatabase
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+def misheard(first_name, last_name):
+    """The name as speech-to-text might spell it: a vowel and a consonant changed."""
+    first_name = first_name.replace("ay", "a").replace("th", "t").replace("C", "K")
+    last_name = last_name.replace("o", "a", 1) if "o" in last_name else last_name + "e"
+    return first_name, last_name
+
+
+def time_calls(fn, args_list):
+    timings = []
+    for args in args_list:
+        start = time.perf_counter()
+        fn(*args)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CustomerDatabase read paths")
+    parser.add_argument("--db", required=True, help="Database built by generate_dataset.py")
+    parser.add_argument("--samples", type=int, default=1000, help="Random customers to query")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed")
+    args = parser.parse_args()
+
+    logging.getLogger("personal-shopper-db").setLevel(logging.WARNING)
+    rng = random.Random(args.seed)
+    db = CustomerDatabase(args.db)
+    conn = db._conn()
+
+    max_id = conn.execute("SELECT MAX(id) FROM customers").fetchone()[0]
+    if not max_id:
+        raise SystemExit(f"{args.db} has no customers; run generate_dataset.py first")
+    ids = [rng.randint(1, max_id) for _ in range(args.samples)]
+    customers = [(cid, *conn.execute("SELECT first_name, last_name FROM customers WHERE id = ?", (cid,)).fetchone())
+                 for cid in ids]
+    item_names = [row[0] for row in conn.execute("SELECT DISTINCT name FROM order_items LIMIT 50")] or ["Unknown Item"]
+    # The heaviest shoppers are the worst case for history and aggregates
+    heavy = [row[0] for row in conn.execute(
+        "SELECT customer_id FROM orders GROUP BY customer_id ORDER BY COUNT(*) DESC LIMIT ?", (min(args.samples, 100),)
+    )]
+
+    names = [(first, last) for _, first, last in customers]
+    benchmarks = [
+        ("find_customer", db.find_customer, names),
+        ("find_customer_candidates", db.find_customer_candidates, names),
+        ("find_customer_candidates (misheard)", db.find_customer_candidates, [misheard(f, l) for f, l in names]),
+        ("order history (cold)", db.get_customer_order_history, names),
+        ("order history (cached)", db.get_customer_order_history, names),
+        ("order history page 3", lambda f, l: db.get_customer_order_history(f, l, offset=20), names),
+        ("get_customer_orders (10)", lambda cid: db.get_customer_orders(cid, 10), [(cid,) for cid in ids]),
+        ("get_top_items", db.get_top_items, [(cid,) for cid in ids]),
+        ("get_top_items (heavy)", db.get_top_items, [(cid,) for cid in heavy]),
+        ("get_total_spent", db.get_total_spent, [(cid,) for cid in ids]),
+        ("get_spend_by_period", db.get_spend_by_period, [(cid,) for cid in ids]),
+        ("get_last_purchase", db.get_last_purchase, [(cid, rng.choice(item_names)) for cid in ids]),
+        ("get_last_purchase (substring)", db.get_last_purchase, [(cid, rng.choice(item_names)[:5]) for cid in ids]),
+        ("search_orders", db.search_orders, [(cid, rng.choice(item_names).split()[-1]) for cid in ids]),
+        ("search_orders (date range)", db.search_orders,
+         [(cid, rng.choice(item_names).split()[-1], ("2024-03-01", "2024-05-31")) for cid in ids]),
+        ("search_orders (substring)", db.search_orders, [(cid, "earb") for cid in ids]),
+        ("search_orders (heavy)", db.search_orders, [(cid, rng.choice(item_names).split()[-1]) for cid in heavy]),
+    ]
+
+    orders = conn.execute("SELECT COUNT(*) FROM orders").fetchone()[0]
+    print(f"{max_id:,} customers, {orders:,} orders; {args.samples} samples per read path\n")
+    print(f"{'read path':<38}{'p50':>10}{'p95':>10}{'p99':>10}{'ops/s':>12}")
+    for name, fn, args_list in benchmarks:
+        timings = time_calls(fn, args_list)
+        print(f"{name:<38}"
+              f"{percentile(timings, 50) * 1000:>8.3f}ms"
+              f"{percentile(timings, 95) * 1000:>8.3f}ms"
+              f"{percentile(timings, 99) * 1000:>8.3f}ms"
+              f"{len(timings) / sum(timings):>12,.0f}")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,40 +1,82 @@
+import asyncio
+import functools
 import sqlite3
 import os
 import json
-from typing import List, Dict, Optional, Any
+import queue
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 import logging
 
+from name_matching import deletion_keys, name_score, phonetic_key
+
 logger = logging.getLogger("personal-shopper-db")
 logger.setLevel(logging.INFO)
 
-class CustomerDatabase:
-    def __init__(self, db_path: str = None):
-        """Initialize the customer database."""
-        if db_path is None:
-            # Use a default path in the same directory as this file
-            script_dir = os.path.dirname(os.path.abspath(__file__))
-            db_path = os.path.join(script_dir, 'customer_data.db')
-        
-        self.db_path = db_path
-        self._initialize_db()
-    
-    def _initialize_db(self):
-        """Create the database and tables if they don't exist."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Create customers table
-        cursor.execute('''
+# Applied to every connection. WAL lets readers run alongside a writer, and
+# synchronous=NORMAL only fsyncs at checkpoints, which is safe in WAL mode.
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA cache_size=-16000",   # 16MB page cache
+    "PRAGMA mmap_size=268435456",  # 256MB memory-mapped reads
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA foreign_keys=ON",
+)
+
+# Statements are kept as constants so sqlite3's per-connection statement
+# cache prepares each one once and reuses it on every call.
+SELECT_CUSTOMER_ID = "SELECT id FROM customers WHERE first_name = ? AND last_name = ?"
+INSERT_CUSTOMER = "INSERT INTO customers (first_name, last_name, first_key, last_key) VALUES (?, ?, ?, ?)"
+INSERT_LAST_NAME_KEY = "INSERT OR IGNORE INTO last_name_keys (key, last_name) VALUES (?, ?)"
+INSERT_ORDER = "INSERT INTO orders (customer_id, order_details) VALUES (?, ?)"
+IMPORT_ORDER = "INSERT INTO orders (customer_id, order_details, order_date) VALUES (?, ?, COALESCE(?, CURRENT_TIMESTAMP))"
+# Expands an order's JSON items into order_items rows. Used both when an
+# order is added and to backfill orders that predate the table.
+INSERT_ORDER_ITEMS = """
+INSERT INTO order_items (order_id, customer_id, order_date, name, quantity, price, description)
+SELECT o.id, o.customer_id, o.order_date,
+       COALESCE(json_extract(item.value, '$.name'), 'Unknown Item'),
+       COALESCE(json_extract(item.value, '$.quantity'), 1),
+       json_extract(item.value, '$.price'),
+       COALESCE(json_extract(item.value, '$.description'), json_extract(item.value, '$.category'))
+FROM orders o, json_each(o.order_details, '$.items') AS item
+"""
+INSERT_ITEMS_FOR_ORDER = INSERT_ORDER_ITEMS + "WHERE o.id = ?"
+INSERT_ITEMS_FOR_ORDERS_AFTER = INSERT_ORDER_ITEMS + "WHERE o.id > ?"
+SELECT_CUSTOMER_ORDERS = (
+    "SELECT id, order_details, order_date FROM orders WHERE customer_id = ? "
+    "ORDER BY order_date DESC, id DESC LIMIT ? OFFSET ?"
+)
+# One indexed query for a page of history, with the customer's total order
+# count alongside each row (the LEFT JOIN keeps a row for customers with none)
+SELECT_ORDER_HISTORY = """
+SELECT c.id AS customer_id, o.id, o.order_details, o.order_date, COUNT(o.id) OVER () AS total
+FROM customers c LEFT JOIN orders o ON o.customer_id = c.id
+WHERE c.id = (SELECT id FROM customers WHERE first_name = ? AND last_name = ? ORDER BY id LIMIT 1)
+ORDER BY o.order_date DESC, o.id DESC
+LIMIT ? OFFSET ?
+"""
+
+# Schema migrations, applied in order. PRAGMA user_version records how many
+# have run, so existing databases are upgraded in place on startup.
+MIGRATIONS = [
+    # 1: initial schema
+    [
+        """
         CREATE TABLE IF NOT EXISTS customers (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             first_name TEXT NOT NULL,
             last_name TEXT NOT NULL,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
-        ''')
-        
-        # Create orders table
-        cursor.execute('''
+        """,
+        """
         CREATE TABLE IF NOT EXISTS orders (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             customer_id INTEGER NOT NULL,
@@ -42,70 +84,373 @@ class CustomerDatabase:
             order_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             FOREIGN KEY (customer_id) REFERENCES customers (id)
         )
-        ''')
+        """,
+    ],
+    # 2: indexes for customer lookup and order history
+    [
+        "CREATE INDEX IF NOT EXISTS idx_customers_name ON customers (first_name, last_name)",
+        "CREATE INDEX IF NOT EXISTS idx_orders_customer_date ON orders (customer_id, order_date)",
+    ],
+    # 3: one row per purchased item, so purchase questions are indexed queries
+    # rather than a json.loads of every order. customer_id and order_date are
+    # copied from the order so per-customer aggregates never need the join.
+    [
+        """
+        CREATE TABLE IF NOT EXISTS order_items (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            order_id INTEGER NOT NULL,
+            customer_id INTEGER NOT NULL,
+            order_date TIMESTAMP NOT NULL,
+            name TEXT NOT NULL COLLATE NOCASE,
+            quantity INTEGER NOT NULL DEFAULT 1,
+            price REAL,
+            FOREIGN KEY (order_id) REFERENCES orders (id),
+            FOREIGN KEY (customer_id) REFERENCES customers (id)
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_order_items_order ON order_items (order_id)",
+        "CREATE INDEX IF NOT EXISTS idx_order_items_customer_date ON order_items (customer_id, order_date)",
+        "CREATE INDEX IF NOT EXISTS idx_order_items_customer_name ON order_items (customer_id, name, order_date)",
+        """
+        INSERT INTO order_items (order_id, customer_id, order_date, name, quantity, price)
+        SELECT o.id, o.customer_id, o.order_date,
+               COALESCE(json_extract(item.value, '$.name'), 'Unknown Item'),
+               COALESCE(json_extract(item.value, '$.quantity'), 1),
+               json_extract(item.value, '$.price')
+        FROM orders o, json_each(o.order_details, '$.items') AS item
+        """,
+    ],
+    # 4: item descriptions and an FTS5 index over item names and descriptions,
+    # kept in sync with order_items by triggers. The index also holds each
+    # item's customer as a token, so a search only reads that customer's
+    # entries rather than every match in the store.
+    [
+        "ALTER TABLE order_items ADD COLUMN description TEXT",
+        # Re-expand existing orders so their items pick up descriptions
+        "DELETE FROM order_items",
+        INSERT_ORDER_ITEMS,
+        """
+        CREATE VIEW IF NOT EXISTS order_items_search AS
+        SELECT id, 'c' || customer_id AS customer, name, description FROM order_items
+        """,
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS order_items_fts USING fts5(
+            customer, name, description,
+            content='order_items_search', content_rowid='id', tokenize='porter unicode61'
+        )
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS order_items_fts_insert AFTER INSERT ON order_items BEGIN
+            INSERT INTO order_items_fts (rowid, customer, name, description)
+            VALUES (new.id, 'c' || new.customer_id, new.name, new.description);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS order_items_fts_delete AFTER DELETE ON order_items BEGIN
+            INSERT INTO order_items_fts (order_items_fts, rowid, customer, name, description)
+            VALUES ('delete', old.id, 'c' || old.customer_id, old.name, old.description);
+        END
+        """,
+        "INSERT INTO order_items_fts (order_items_fts) VALUES ('rebuild')",
+    ],
+    # 5: phonetic keys and last-name deletion keys for fuzzy customer lookup
+    [
+        "ALTER TABLE customers ADD COLUMN first_key TEXT",
+        "ALTER TABLE customers ADD COLUMN last_key TEXT",
+        "CREATE INDEX IF NOT EXISTS idx_customers_phonetic ON customers (last_key, first_key)",
+        "CREATE INDEX IF NOT EXISTS idx_customers_last_name ON customers (last_name)",
+        # Keys are kept per distinct last name rather than per customer, and
+        # each key is shared by only a handful of names, so lookups stay exact
+        # index probes even with millions of customers
+        """
+        CREATE TABLE IF NOT EXISTS last_name_keys (
+            key TEXT NOT NULL,
+            last_name TEXT NOT NULL,
+            PRIMARY KEY (key, last_name)
+        ) WITHOUT ROWID
+        """,
+        lambda conn: _backfill_name_index(conn),
+    ],
+]
+
+def _name_index_rows(first_name: str, last_name: str):
+    """The customer row values and last-name key rows for a new customer."""
+    return (
+        (first_name, last_name, phonetic_key(first_name), phonetic_key(last_name)),
+        [(key, last_name) for key in deletion_keys(last_name)],
+    )
+
+
+def _backfill_name_index(conn: sqlite3.Connection):
+    rows = conn.execute("SELECT id, first_name, last_name FROM customers").fetchall()
+    conn.executemany(
+        "UPDATE customers SET first_key = ?, last_key = ? WHERE id = ?",
+        [(phonetic_key(first), phonetic_key(last), cid) for cid, first, last in rows]
+    )
+    last_names = {last for _, _, last in rows}
+    conn.executemany(INSERT_LAST_NAME_KEY, [(key, last) for last in last_names for key in deletion_keys(last)])
+
+
+# Fuzzy customer lookup: candidates scoring below this are not returned
+MIN_MATCH_SCORE = 0.5
+
+# Orders per page of formatted history, and how many customers' formatted
+# history to keep cached
+HISTORY_PAGE_SIZE = 10
+HISTORY_CACHE_SIZE = 1024
+
+# Order search over one customer's items, newest matching order first.
+# Ranking by relevance would read global term statistics, which costs far more
+# than the search itself for common words, and recency is what callers mean.
+SEARCH_ORDERS = """
+SELECT i.order_id AS id, i.order_date, o.order_details, group_concat(i.name, ', ') AS matched_items
+FROM order_items_fts f
+JOIN order_items i ON i.id = f.rowid
+JOIN orders o ON o.id = i.order_id
+WHERE order_items_fts MATCH ?
+  AND i.order_date >= COALESCE(?, '0000-01-01') AND i.order_date < COALESCE(date(?, '+1 day'), '9999-12-31')
+GROUP BY i.order_id
+ORDER BY i.order_date DESC, i.order_id DESC
+LIMIT ?
+"""
+# Substring fallback for partial words; it reads only this customer's items
+# through the customer index, which is much cheaper than expanding an FTS
+# prefix against the whole vocabulary
+SEARCH_ORDERS_SUBSTRING = """
+SELECT i.order_id AS id, i.order_date, o.order_details, group_concat(i.name, ', ') AS matched_items
+FROM order_items i
+JOIN orders o ON o.id = i.order_id
+WHERE i.customer_id = ? AND ({})
+  AND i.order_date >= COALESCE(?, '0000-01-01') AND i.order_date < COALESCE(date(?, '+1 day'), '9999-12-31')
+GROUP BY i.order_id
+ORDER BY i.order_date DESC, i.order_id DESC
+LIMIT ?
+"""
+
+# strftime formats for grouping spend by period
+SPEND_PERIODS = {"day": "%Y-%m-%d", "week": "%Y-W%W", "month": "%Y-%m", "year": "%Y"}
+
+def _last_assigned_id(conn: sqlite3.Connection, table: str) -> int:
+    """
+    The highest ID an AUTOINCREMENT table has ever assigned. Deleted IDs are
+    never reused, so this can be above MAX(id); the next insert gets one more.
+    """
+    row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (table,)).fetchone()
+    current = conn.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}").fetchone()[0]
+    return max(row[0] if row else 0, current)
+
+
+class CustomerDatabase:
+    def __init__(self, db_path: str = None):
+        """Initialize the customer database."""
+        if db_path is None:
+            # Use a default path in the same directory as this file
+            script_dir = os.path.dirname(os.path.abspath(__file__))
+            db_path = os.path.join(script_dir, 'customer_data.db')
         
-        conn.commit()
-        conn.close()
+        self.db_path = db_path
+        # One persistent connection per thread, opened on first use
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        # (first_name, last_name) -> (customer_id, {(limit, offset): history})
+        self._history_cache = OrderedDict()
+        self._history_lock = threading.Lock()
+        # Bumped on every invalidation, so a read that overlapped a write
+        # doesn't cache what it saw
+        self._history_generation = 0
+        self._initialize_db()
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection with the tuned pragmas applied."""
+        conn = sqlite3.connect(self.db_path, timeout=30, cached_statements=256, check_same_thread=False)
+        conn.row_factory = sqlite3.Row  # This enables column access by name
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        return conn
+    
+    def _conn(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it if needed."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+    
+    def close(self):
+        """Close every thread's connection."""
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+    
+    def _initialize_db(self):
+        """Create the database or upgrade its schema to the latest version."""
+        conn = self._conn()
+        # IMMEDIATE takes the write lock up front, so two workers starting at
+        # once can't both apply the same migration
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            for number, statements in enumerate(MIGRATIONS[version:], start=version + 1):
+                for statement in statements:
+                    # Steps that need Python (such as computing name keys) are callables
+                    if callable(statement):
+                        statement(conn)
+                    else:
+                        conn.execute(statement)
+                conn.execute(f"PRAGMA user_version = {number}")
+                logger.info(f"Applied database migration {number}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
         logger.info(f"Database initialized at {self.db_path}")
     
+    def find_customer(self, first_name: str, last_name: str) -> Optional[int]:
+        """Return a customer's ID, or None if there is no such customer."""
+        result = self._conn().execute(SELECT_CUSTOMER_ID, (first_name, last_name)).fetchone()
+        return result[0] if result else None
+    
+    def find_customer_candidates(self, first_name: str, last_name: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """
+        Existing customers whose name matches a possibly misheard one, best
+        first, each with a score from 0 to 1 (1 is an exact match). Customers
+        whose names sound the same come from the phonetic index; last names
+        one typo away come from the deletion-key index.
+        """
+        conn = self._conn()
+        first_key, last_key = phonetic_key(first_name), phonetic_key(last_name)
+        rows = conn.execute(
+            "SELECT id, first_name, last_name FROM customers "
+            "WHERE (first_name = ? AND last_name = ?) OR (last_key = ? AND first_key = ?) LIMIT 200",
+            (first_name, last_name, last_key, first_key)
+        ).fetchall()
+        
+        keys = list(deletion_keys(last_name))
+        if keys:
+            # Last names one typo away, then their customers with a similar first name
+            placeholders = ",".join("?" * len(keys))
+            rows += conn.execute(
+                f"SELECT id, first_name, last_name FROM customers WHERE last_name IN "
+                f"(SELECT last_name FROM last_name_keys WHERE key IN ({placeholders})) "
+                f"AND (first_key = ? OR first_name = ?) LIMIT 200",
+                (*keys, first_key, first_name)
+            ).fetchall()
+        
+        candidates = {}
+        for row in rows:
+            score = name_score(first_name, last_name, row['first_name'], row['last_name'])
+            if score >= MIN_MATCH_SCORE:
+                candidates[row['id']] = {
+                    'id': row['id'],
+                    'first_name': row['first_name'],
+                    'last_name': row['last_name'],
+                    'score': round(score, 3),
+                }
+        return sorted(candidates.values(), key=lambda c: (-c['score'], c['id']))[:limit]
+    
     def get_or_create_customer(self, first_name: str, last_name: str) -> int:
         """Get a customer by name or create if not exists. Returns customer ID."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
+        conn = self._conn()
+        with conn:
+            return self._get_or_create_customer(conn, first_name, last_name)
+    
+    def add_order(self, customer_id: int, order_details: Dict[str, Any]) -> int:
+        """Add a new order for a customer. Returns order ID."""
+        conn = self._conn()
+        with conn:
+            order_id = self._insert_order(conn, customer_id, order_details)
+        self.invalidate_history(customer_id)
+        return order_id
+    
+    def invalidate_history(self, customer_id: int):
+        """Drop cached history for a customer; call after committing their orders."""
+        with self._history_lock:
+            self._history_generation += 1
+            for key in [k for k, (cid, _) in self._history_cache.items() if cid == customer_id]:
+                del self._history_cache[key]
+    
+    def import_customers(self, names: Iterable[Tuple[str, str]], batch_size: int = 10_000) -> range:
+        """
+        Insert many customers in one transaction. Names are not checked for
+        duplicates. Returns the range of new customer IDs, in input order.
+        """
+        conn = self._conn()
+        with conn:
+            # Take the write lock before reading the last ID, so no other
+            # writer can claim IDs between the read and our inserts
+            conn.execute("BEGIN IMMEDIATE")
+            first_id = _last_assigned_id(conn, "customers") + 1
+            count = 0
+            names = iter(names)
+            while batch := list(islice(names, batch_size)):
+                rows = [_name_index_rows(first, last) for first, last in batch]
+                conn.executemany(INSERT_CUSTOMER, [customer for customer, _ in rows])
+                conn.executemany(INSERT_LAST_NAME_KEY, [key for _, keys in rows for key in keys])
+                count += len(batch)
+        logger.info(f"Imported {count} customers")
+        return range(first_id, first_id + count)
+    
+    def import_orders(self, orders: Iterable[Tuple[int, Dict[str, Any], Optional[str]]], batch_size: int = 10_000) -> range:
+        """
+        Insert many (customer_id, order_details, order_date) orders in one
+        transaction; order_date may be None for now. Returns the range of new
+        order IDs, in input order.
+        """
+        conn = self._conn()
+        with conn:
+            # Held until commit, so the item expansion below only sees our orders
+            conn.execute("BEGIN IMMEDIATE")
+            last_id = _last_assigned_id(conn, "orders")
+            count = 0
+            orders = iter(orders)
+            while batch := list(islice(orders, batch_size)):
+                conn.executemany(IMPORT_ORDER, [(cid, json.dumps(details), date) for cid, details, date in batch])
+                count += len(batch)
+            # Expand the items of every imported order with one set-based statement
+            conn.execute(INSERT_ITEMS_FOR_ORDERS_AFTER, (last_id,))
+        with self._history_lock:
+            self._history_generation += 1
+            self._history_cache.clear()
+        logger.info(f"Imported {count} orders")
+        return range(last_id + 1, last_id + 1 + count)
+    
+    # Write helpers run inside a transaction owned by the caller, so the async
+    # writer (see AsyncCustomerDatabase) can commit many of them at once.
+    
+    def _get_or_create_customer(self, conn: sqlite3.Connection, first_name: str, last_name: str) -> int:
         # Check if customer exists
-        cursor.execute(
-            "SELECT id FROM customers WHERE first_name = ? AND last_name = ?", 
-            (first_name, last_name)
-        )
-        result = cursor.fetchone()
+        result = conn.execute(SELECT_CUSTOMER_ID, (first_name, last_name)).fetchone()
         
         if result:
             customer_id = result[0]
             logger.info(f"Found existing customer: {first_name} {last_name} (ID: {customer_id})")
         else:
             # Create new customer
-            cursor.execute(
-                "INSERT INTO customers (first_name, last_name) VALUES (?, ?)",
-                (first_name, last_name)
-            )
-            customer_id = cursor.lastrowid
+            customer, keys = _name_index_rows(first_name, last_name)
+            customer_id = conn.execute(INSERT_CUSTOMER, customer).lastrowid
+            conn.executemany(INSERT_LAST_NAME_KEY, keys)
             logger.info(f"Created new customer: {first_name} {last_name} (ID: {customer_id})")
         
-        conn.commit()
-        conn.close()
         return customer_id
     
-    def add_order(self, customer_id: int, order_details: Dict[str, Any]) -> int:
-        """Add a new order for a customer. Returns order ID."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
+    def _insert_order(self, conn: sqlite3.Connection, customer_id: int, order_details: Dict[str, Any]) -> int:
         # Convert order details to JSON string
         order_json = json.dumps(order_details)
         
-        cursor.execute(
-            "INSERT INTO orders (customer_id, order_details) VALUES (?, ?)",
-            (customer_id, order_json)
-        )
-        
-        order_id = cursor.lastrowid
+        order_id = conn.execute(INSERT_ORDER, (customer_id, order_json)).lastrowid
+        # Same transaction, so items and their order are committed together
+        conn.execute(INSERT_ITEMS_FOR_ORDER, (order_id,))
         logger.info(f"Added new order (ID: {order_id}) for customer ID: {customer_id}")
         
-        conn.commit()
-        conn.close()
         return order_id
     
-    def get_customer_orders(self, customer_id: int) -> List[Dict[str, Any]]:
-        """Get all orders for a customer."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row  # This enables column access by name
-        cursor = conn.cursor()
-        
-        cursor.execute(
-            "SELECT id, order_details, order_date FROM orders WHERE customer_id = ? ORDER BY order_date DESC",
-            (customer_id,)
-        )
+    def get_customer_orders(self, customer_id: int, limit: int = -1, offset: int = 0) -> List[Dict[str, Any]]:
+        """Get a customer's orders, newest first. A negative limit returns them all."""
+        cursor = self._conn().execute(SELECT_CUSTOMER_ORDERS, (customer_id, limit, offset))
         
         orders = []
         for row in cursor.fetchall():
@@ -116,49 +461,291 @@ class CustomerDatabase:
                 'details': order_data
             })
         
-        conn.close()
         return orders
     
-    def get_customer_order_history(self, first_name: str, last_name: str) -> str:
-        """Get a formatted string of customer order history for LLM consumption."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    def get_customer_order_history(self, first_name: str, last_name: str, limit: int = HISTORY_PAGE_SIZE, offset: int = 0) -> str:
+        """Get a formatted page of customer order history for LLM consumption."""
+        key = (first_name, last_name)
+        with self._history_lock:
+            cached = self._history_cache.get(key)
+            if cached is not None and (limit, offset) in cached[1]:
+                self._history_cache.move_to_end(key)
+                return cached[1][(limit, offset)]
+            generation = self._history_generation
         
-        # Get customer ID
-        cursor.execute(
-            "SELECT id FROM customers WHERE first_name = ? AND last_name = ?", 
-            (first_name, last_name)
-        )
-        result = cursor.fetchone()
+        rows = self._conn().execute(SELECT_ORDER_HISTORY, (first_name, last_name, limit, offset)).fetchall()
         
-        if not result:
-            conn.close()
+        if not rows:
+            if offset and self.find_customer(first_name, last_name) is not None:
+                return f"Customer {first_name} {last_name} has no orders beyond the first {offset}."
             return "No order history found for this customer."
         
-        customer_id = result[0]
-        orders = self.get_customer_orders(customer_id)
-        
-        if not orders:
-            return f"Customer {first_name} {last_name} has no previous orders."
+        customer_id = rows[0]['customer_id']
+        total = rows[0]['total']
+        if rows[0]['id'] is None:
+            history = f"Customer {first_name} {last_name} has no previous orders."
+        else:
+            history = self._format_history(first_name, last_name, rows, total, offset)
         
+        with self._history_lock:
+            if generation != self._history_generation:
+                return history
+            cached = self._history_cache.get(key)
+            if cached is None or cached[0] != customer_id:
+                cached = self._history_cache[key] = (customer_id, {})
+            cached[1][(limit, offset)] = history
+            self._history_cache.move_to_end(key)
+            while len(self._history_cache) > HISTORY_CACHE_SIZE:
+                self._history_cache.popitem(last=False)
+        return history
+    
+    def get_top_items(self, customer_id: int, limit: int = 5) -> List[Dict[str, Any]]:
+        """A customer's most purchased items by quantity."""
+        rows = self._conn().execute(
+            """
+            SELECT name, SUM(quantity) AS quantity, COUNT(DISTINCT order_id) AS orders,
+                   SUM(quantity * COALESCE(price, 0)) AS spent, MAX(order_date) AS last_purchased
+            FROM order_items WHERE customer_id = ?
+            GROUP BY name ORDER BY quantity DESC, spent DESC LIMIT ?
+            """,
+            (customer_id, limit)
+        ).fetchall()
+        return [dict(row) for row in rows]
+    
+    def get_total_spent(self, customer_id: int) -> Dict[str, Any]:
+        """Order count, item count and total spend for a customer."""
+        row = self._conn().execute(
+            """
+            SELECT COUNT(DISTINCT order_id) AS orders, COALESCE(SUM(quantity), 0) AS items,
+                   COALESCE(SUM(quantity * COALESCE(price, 0)), 0) AS spent
+            FROM order_items WHERE customer_id = ?
+            """,
+            (customer_id,)
+        ).fetchone()
+        return dict(row)
+    
+    def get_spend_by_period(self, customer_id: int, period: str = "month", limit: int = 12) -> List[Dict[str, Any]]:
+        """Spend per day, week, month or year, most recent period first."""
+        if period not in SPEND_PERIODS:
+            raise ValueError(f"period must be one of {', '.join(SPEND_PERIODS)}")
+        rows = self._conn().execute(
+            """
+            SELECT strftime(?, order_date) AS period, COUNT(DISTINCT order_id) AS orders,
+                   SUM(quantity * COALESCE(price, 0)) AS spent
+            FROM order_items WHERE customer_id = ?
+            GROUP BY period ORDER BY period DESC LIMIT ?
+            """,
+            (SPEND_PERIODS[period], customer_id, limit)
+        ).fetchall()
+        return [dict(row) for row in rows]
+    
+    def get_last_purchase(self, customer_id: int, item_name: str) -> Optional[Dict[str, Any]]:
+        """The most recent purchase of an item, matched by exact name (ignoring case) or else by substring."""
+        conn = self._conn()
+        query = (
+            "SELECT order_id, order_date, name, quantity, price FROM order_items "
+            "WHERE customer_id = ? AND name {} ? ORDER BY order_date DESC, order_id DESC LIMIT 1"
+        )
+        row = conn.execute(query.format("="), (customer_id, item_name)).fetchone()
+        if row is None:
+            # Substring matches can't use the name index, but only scan this customer's items
+            row = conn.execute(query.format("LIKE"), (customer_id, f"%{item_name}%")).fetchone()
+        return dict(row) if row else None
+    
+    def search_orders(self, customer_id: int, text: str, date_range: Optional[Tuple[Optional[str], Optional[str]]] = None,
+                      limit: int = 5) -> List[Dict[str, Any]]:
+        """
+        Full-text search over a customer's order items, e.g. "earbuds", limited
+        to an inclusive (start, end) range of YYYY-MM-DD dates if given; either
+        end may be None. Returns the matching orders, newest first.
+        """
+        words = re.findall(r"\w+", text)
+        if not words:
+            return []
+        start, end = date_range or (None, None)
+        conn = self._conn()
+        # Whole words are stemmed, so "earbud" matches "earbuds". Try every
+        # word, then any word, then any word as a substring.
+        attempts = [" OR ".join(f'"{word}"' for word in words)]
+        if len(words) > 1:
+            attempts.insert(0, " AND ".join(f'"{word}"' for word in words))
+        rows = []
+        for terms in attempts:
+            query = f'customer : "c{customer_id}" AND {{name description}} : ({terms})'
+            rows = conn.execute(SEARCH_ORDERS, (query, start, end, limit)).fetchall()
+            if rows:
+                break
+        else:
+            clause = " OR ".join(["i.name LIKE ? OR i.description LIKE ?"] * len(words))
+            patterns = [f"%{word}%" for word in words for _ in range(2)]
+            rows = conn.execute(SEARCH_ORDERS_SUBSTRING.format(clause), (customer_id, *patterns, start, end, limit)).fetchall()
+        return [{
+            'id': row['id'],
+            'date': row['order_date'],
+            'details': json.loads(row['order_details']),
+            'matched_items': row['matched_items'],
+        } for row in rows]
+    
+    def _format_history(self, first_name: str, last_name: str, rows, total: int, offset: int) -> str:
         # Format order history for LLM
-        history = f"Order history for {first_name} {last_name}:\n\n"
+        lines = [f"Order history for {first_name} {last_name}:", ""]
         
-        for order in orders:
-            history += f"Order #{order['id']} (Date: {order['date']}):\n"
-            details = order['details']
+        for row in rows:
+            lines.append(f"Order #{row['id']} (Date: {row['order_date']}):")
+            details = json.loads(row['order_details'])
             
             if 'items' in details:
                 for item in details['items']:
-                    history += f"- {item.get('quantity', 1)}x {item.get('name', 'Unknown Item')}"
+                    line = f"- {item.get('quantity', 1)}x {item.get('name', 'Unknown Item')}"
                     if 'price' in item:
-                        history += f" (${item['price']})"
-                    history += "\n"
+                        line += f" (${item['price']})"
+                    lines.append(line)
             else:
                 # Handle case where order details might be in a different format
-                history += f"- {json.dumps(details)}\n"
+                lines.append(f"- {json.dumps(details)}")
             
-            history += "\n"
+            lines.append("")
         
-        conn.close()
-        return history 
\ No newline at end of file
+        shown_to = offset + len(rows)
+        if offset or shown_to < total:
+            lines.append(f"Showing orders {offset + 1}-{shown_to} of {total}, newest first.")
+        return "\n".join(lines) + "\n"
+
+
+class AsyncCustomerDatabase:
+    """
+    Async facade over CustomerDatabase for use inside function tools.
+    
+    Reads run on a small dedicated thread pool (each thread keeps its own
+    connection), and all writes go through a single writer thread. The writer
+    commits everything queued since its last commit in one transaction, so a
+    burst of orders from many sessions costs one commit instead of many, and
+    no query or fsync ever runs on the event loop that drives audio.
+    """
+    
+    def __init__(self, db: Optional[CustomerDatabase] = None, *, read_workers: int = 4, max_write_batch: int = 64):
+        self.db = db or CustomerDatabase()
+        self._max_write_batch = max_write_batch
+        self._readers = ThreadPoolExecutor(max_workers=read_workers, thread_name_prefix="customer-db-read")
+        self._writes = queue.SimpleQueue()
+        self._writer = None
+        self._writer_lock = threading.Lock()
+    
+    async def find_customer(self, first_name: str, last_name: str) -> Optional[int]:
+        return await self._read(self.db.find_customer, first_name, last_name)
+    
+    async def find_customer_candidates(self, first_name: str, last_name: str, limit: int = 5) -> List[Dict[str, Any]]:
+        return await self._read(self.db.find_customer_candidates, first_name, last_name, limit)
+    
+    async def create_customer(self, first_name: str, last_name: str) -> int:
+        """Get or create a customer through the writer thread, skipping the read."""
+        return await self._write(self.db._get_or_create_customer, first_name, last_name)
+    
+    async def get_or_create_customer(self, first_name: str, last_name: str) -> int:
+        # Most callers are returning customers, which needs no write at all
+        customer_id = await self.find_customer(first_name, last_name)
+        if customer_id is not None:
+            return customer_id
+        return await self._write(self.db._get_or_create_customer, first_name, last_name)
+    
+    async def add_order(self, customer_id: int, order_details: Dict[str, Any]) -> int:
+        order_id = await self._write(self.db._insert_order, customer_id, order_details)
+        # The write is committed by now, so no reader can re-cache stale history
+        self.db.invalidate_history(customer_id)
+        return order_id
+    
+    async def get_customer_orders(self, customer_id: int, limit: int = -1, offset: int = 0) -> List[Dict[str, Any]]:
+        return await self._read(self.db.get_customer_orders, customer_id, limit, offset)
+    
+    async def get_customer_order_history(self, first_name: str, last_name: str, limit: int = HISTORY_PAGE_SIZE, offset: int = 0) -> str:
+        return await self._read(self.db.get_customer_order_history, first_name, last_name, limit, offset)
+    
+    async def get_top_items(self, customer_id: int, limit: int = 5) -> List[Dict[str, Any]]:
+        return await self._read(self.db.get_top_items, customer_id, limit)
+    
+    async def get_total_spent(self, customer_id: int) -> Dict[str, Any]:
+        return await self._read(self.db.get_total_spent, customer_id)
+    
+    async def get_spend_by_period(self, customer_id: int, period: str = "month", limit: int = 12) -> List[Dict[str, Any]]:
+        return await self._read(self.db.get_spend_by_period, customer_id, period, limit)
+    
+    async def get_last_purchase(self, customer_id: int, item_name: str) -> Optional[Dict[str, Any]]:
+        return await self._read(self.db.get_last_purchase, customer_id, item_name)
+    
+    async def search_orders(self, customer_id: int, text: str, date_range: Optional[Tuple[Optional[str], Optional[str]]] = None,
+                            limit: int = 5) -> List[Dict[str, Any]]:
+        return await self._read(self.db.search_orders, customer_id, text, date_range, limit)
+    
+    async def flush(self):
+        """Wait until every write queued so far has been committed."""
+        if self._writer is not None:
+            await self._write(lambda conn: None)
+    
+    async def aclose(self):
+        """Commit pending writes and stop the worker threads."""
+        with self._writer_lock:
+            writer, self._writer = self._writer, None
+        if writer is not None:
+            self._writes.put(None)
+            await asyncio.to_thread(writer.join)
+        self._readers.shutdown(wait=False)
+    
+    async def _read(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._readers, functools.partial(fn, *args))
+    
+    def _write(self, fn, *args) -> asyncio.Future:
+        # The writer thread is started lazily so that importing this module
+        # in a worker's parent process doesn't start threads before the fork
+        if self._writer is None:
+            with self._writer_lock:
+                if self._writer is None:
+                    self._writer = threading.Thread(target=self._run_writer, name="customer-db-writer", daemon=True)
+                    self._writer.start()
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._writes.put((fn, args, future, loop))
+        return future
+    
+    def _run_writer(self):
+        conn = self.db._conn()
+        while True:
+            batch = [self._writes.get()]
+            while batch[-1] is not None and len(batch) < self._max_write_batch:
+                try:
+                    batch.append(self._writes.get_nowait())
+                except queue.Empty:
+                    break
+            stopping = batch[-1] is None
+            requests = [r for r in batch if r is not None]
+            if requests:
+                self._commit(conn, requests)
+            if stopping:
+                return
+    
+    def _commit(self, conn: sqlite3.Connection, requests):
+        try:
+            with conn:
+                results = [fn(conn, *args) for fn, args, _, _ in requests]
+            errors = [None] * len(requests)
+        except Exception as e:
+            if len(requests) > 1:
+                # Retry one by one so a single bad write doesn't fail the others
+                for request in requests:
+                    self._commit(conn, [request])
+                return
+            results, errors = [None], [e]
+        for (_, _, future, loop), result, error in zip(requests, results, errors):
+            try:
+                loop.call_soon_threadsafe(_resolve, future, result, error)
+            except RuntimeError:
+                pass  # The caller's event loop has already closed
+
+
+def _resolve(future: asyncio.Future, result, error):
+    if future.cancelled():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
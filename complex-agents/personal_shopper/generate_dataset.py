@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Generate a synthetic customer and order dataset for the personal shopper.
+
+Customers and orders are streamed into CustomerDatabase's bulk importers, so
+millions of rows load in minutes with flat memory use. Order counts per
+customer are long-tailed, like real shoppers: most have a few orders and a
+few have hundreds.
+
+    # 1M customers, ~10M orders
+    python generate_dataset.py --db /tmp/shopper.db --customers 1000000 --orders 10
+
+Then measure the read paths against it with benchmark_reads.py.
+"""
+
+import argparse
+import logging
+import os
+import random
+import time
+from datetime import datetime, timedelta
+
+from database import CustomerDatabase
+
+FIRST_NAMES = [
+    "Shayne", "Shane", "Maria", "Mariah", "Wei", "Aisha", "Lars", "Priya", "Tom", "Thomas", "Yuki", "Omar",
+    "Elena", "Jon", "John", "Sean", "Shawn", "Katherine", "Catherine", "Kathryn", "Ahmed", "Li", "Chloe",
+    "Zoe", "Noah", "Liam", "Emma", "Olivia", "Ava", "Sofia", "Mateo", "Lucas", "Mia", "Isabella", "Amara",
+]
+# Surnames are built from syllables so there are enough distinct names for millions of customers
+SYLLABLES = ["par", "lo", "gar", "ci", "a", "chen", "kha", "berg", "pa", "tel", "smi", "th", "sa", "to",
+             "had", "dad", "ros", "si", "mor", "ri", "son", "ka", "mi", "na", "vo", "len", "der", "ek"]
+
+PRODUCTS = [
+    ("Smartphone XS Pro", 999.99, "Electronics"), ("Wireless Earbuds", 149.99, "Electronics"),
+    ("Noise Cancelling Headphones", 299.0, "Electronics"), ("Phone Case (Black)", 29.99, "Electronics"),
+    ("USB-C Charger", 24.5, "Electronics"), ("Smart Watch", 249.0, "Electronics"),
+    ("Men's Casual Shirt (Blue)", 39.99, "Clothing"), ("Jeans (Dark Wash)", 59.99, "Clothing"),
+    ("Leather Belt", 34.99, "Clothing"), ("Running Shoes", 89.5, "Clothing"), ("Rain Jacket", 119.0, "Clothing"),
+    ("Coffee Maker", 89.99, "Home"), ("Towel Set", 49.99, "Home"), ("Decorative Pillows", 24.99, "Home"),
+    ("Desk Lamp", 39.99, "Home"), ("Chef's Knife", 79.0, "Home"), ("Yoga Mat", 35.0, "Sports"),
+    ("Water Bottle", 19.99, "Sports"), ("Backpack", 74.25, "Sports"), ("Camping Tent", 199.0, "Sports"),
+]
+PAYMENT_METHODS = ["Credit Card", "PayPal", "Debit Card", "Gift Card"]
+
+
+def random_last_name(rng: random.Random) -> str:
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+
+
+def generate_customers(rng: random.Random, count: int):
+    for _ in range(count):
+        yield rng.choice(FIRST_NAMES), random_last_name(rng)
+
+
+def generate_orders(rng: random.Random, customer_ids: range, mean_orders: float, days: int):
+    now = datetime.now()
+    for customer_id in customer_ids:
+        # Pareto-distributed order counts give the long tail of heavy shoppers
+        for _ in range(min(int(rng.paretovariate(1.5) * mean_orders / 3), 2000)):
+            items = [
+                {"name": name, "quantity": rng.choice((1, 1, 1, 2, 3)), "price": price, "category": category}
+                for name, price, category in rng.sample(PRODUCTS, rng.randint(1, 4))
+            ]
+            order = {
+                "items": items,
+                "total": round(sum(item["price"] * item["quantity"] for item in items), 2),
+                "payment_method": rng.choice(PAYMENT_METHODS),
+            }
+            date = now - timedelta(seconds=rng.randrange(days * 86400))
+            yield customer_id, order, date.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic personal shopper dataset")
+    parser.add_argument("--db", required=True, help="Database file to create or extend")
+    parser.add_argument("--customers", type=int, default=100_000, help="Customers to generate")
+    parser.add_argument("--orders", type=float, default=10.0, help="Mean orders per customer")
+    parser.add_argument("--days", type=int, default=730, help="Spread order dates over this many past days")
+    parser.add_argument("--chunk", type=int, default=50_000, help="Customers per import transaction")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    rng = random.Random(args.seed)
+    db = CustomerDatabase(args.db)
+
+    start = time.perf_counter()
+    orders = 0
+    for offset in range(0, args.customers, args.chunk):
+        count = min(args.chunk, args.customers - offset)
+        customer_ids = db.import_customers(generate_customers(rng, count))
+        order_ids = db.import_orders(generate_orders(rng, customer_ids, args.orders, args.days))
+        orders += len(order_ids)
+        elapsed = time.perf_counter() - start
+        print(f"{offset + count:,} customers, {orders:,} orders ({(offset + count + orders) / elapsed:,.0f} rows/s)")
+
+    db.close()
+    size = os.path.getsize(args.db) / 1024 / 1024
+    print(f"Done in {time.perf_counter() - start:.1f}s; {args.db} is {size:,.0f}MB")
+
+
+if __name__ == "__main__":
+    main()
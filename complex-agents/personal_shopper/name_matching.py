@@ -0,0 +1,133 @@
+"""
+Name matching helpers for finding customers whose names were misheard.
+
+Speech-to-text often spells a name differently from how it was saved
+("Shane" for "Shayne", "Catherine" for "Kathryn"). `phonetic_key` maps names
+that sound alike to the same short key, which the database indexes for exact
+lookups. Near misses that sound different ("Parlo" and "Pardo") are found
+through `deletion_keys`: two names one typo apart share a key, so candidates
+come from an exact index lookup instead of a scan. `similarity` compares the
+character trigrams of two names to rank the candidates.
+"""
+
+import re
+import unicodedata
+
+VOWELS = set("aeiou")
+
+
+def normalize(name: str) -> str:
+    """Lowercase ASCII letters only, with accents removed."""
+    decomposed = unicodedata.normalize("NFKD", name)
+    return re.sub(r"[^a-z]", "", decomposed.encode("ascii", "ignore").decode().lower())
+
+
+def phonetic_key(name: str) -> str:
+    """A Metaphone-style key: consonant sounds, with the first vowel kept."""
+    word = normalize(name)
+    if not word:
+        return ""
+    # Silent or altered first letters
+    if word[:2] in ("kn", "gn", "pn", "wr", "ae"):
+        word = word[1:]
+    elif word[0] == "x":
+        word = "s" + word[1:]
+    elif word[:2] == "wh":
+        word = "w" + word[2:]
+
+    key = []
+    for i, c in enumerate(word):
+        prev = word[i - 1] if i else ""
+        nxt = word[i + 1] if i + 1 < len(word) else ""
+        after = word[i + 2] if i + 2 < len(word) else ""
+        if c in VOWELS:
+            code = c.upper() if i == 0 else ""
+        elif c == "b":
+            code = "" if prev == "m" and not nxt else "B"
+        elif c == "c":
+            if nxt == "h" or (nxt == "i" and after == "a"):
+                code = "X"
+            elif nxt in ("i", "e", "y"):
+                code = "S"
+            else:
+                code = "K"
+        elif c == "d":
+            code = "J" if nxt == "g" and after in ("e", "i", "y") else "T"
+        elif c == "g":
+            if nxt == "h" and after and after not in VOWELS:
+                code = ""
+            elif nxt in ("i", "e", "y"):
+                code = "J"
+            else:
+                code = "K"
+        elif c == "h":
+            code = "H" if nxt in VOWELS and prev not in ("c", "s", "p", "t", "g") else ""
+        elif c == "k":
+            code = "" if prev == "c" else "K"
+        elif c == "p":
+            code = "F" if nxt == "h" else "P"
+        elif c == "q":
+            code = "K"
+        elif c == "s":
+            code = "X" if nxt == "h" or (nxt == "i" and after in ("o", "a")) else "S"
+        elif c == "t":
+            if nxt == "i" and after in ("o", "a"):
+                code = "X"
+            elif nxt == "c" and after == "h":
+                code = ""
+            else:
+                # "th" is usually just "t" in names (Thomas, Kathryn)
+                code = "T"
+        elif c == "v":
+            code = "F"
+        elif c in ("w", "y"):
+            code = c.upper() if nxt in VOWELS else ""
+        elif c == "x":
+            code = "KS"
+        elif c == "z":
+            code = "S"
+        else:
+            code = c.upper()
+        # Doubled letters sound like one
+        if code and not (key and key[-1] == code):
+            key.append(code)
+    return "".join(key)
+
+
+def deletion_keys(name: str) -> set:
+    """The name and every spelling of it with one letter dropped."""
+    word = normalize(name)
+    keys = {word[:i] + word[i + 1:] for i in range(len(word))}
+    keys.add(word)
+    keys.discard("")
+    return keys
+
+
+def trigrams(name: str) -> set:
+    """Character trigrams of a name, padded so its start and end count."""
+    word = normalize(name)
+    if not word:
+        return set()
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def similarity(a: str, b: str) -> float:
+    """Trigram similarity between two names, from 0 to 1."""
+    ta, tb = trigrams(a), trigrams(b)
+    if not ta or not tb:
+        return 0.0
+    return len(ta & tb) / len(ta | tb)
+
+
+def name_score(first_name: str, last_name: str, candidate_first: str, candidate_last: str) -> float:
+    """How well a stored customer's name matches a heard one, from 0 to 1."""
+    def part(heard: str, stored: str) -> float:
+        if normalize(heard) == normalize(stored):
+            return 1.0
+        score = similarity(heard, stored)
+        if phonetic_key(heard) == phonetic_key(stored):
+            # Sounds the same: as good as a close spelling
+            score = max(score, 0.85)
+        return score
+    return (part(first_name, candidate_first) + part(last_name, candidate_last)) / 2
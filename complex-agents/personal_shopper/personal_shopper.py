@@ -4,22 +4,24 @@ from dataclasses import dataclass, field
 from typing import Optional
 
 from dotenv import load_dotenv
-from livekit.agents import JobContext, WorkerOptions, cli
+from livekit.agents import JobContext, JobProcess, WorkerOptions, cli
 from livekit.agents.llm import function_tool
 from livekit.agents.voice import Agent, AgentSession, RunContext
 from livekit.plugins import cartesia, deepgram, openai, silero
 from livekit.plugins import noise_cancellation
 
-from utils import load_prompt
-from database import CustomerDatabase
+from agent_common import HandoffContext, UsageLedger, llm_summarizer
+from utils import load_prompt, prompts
+from database import AsyncCustomerDatabase, HISTORY_PAGE_SIZE
 
 logger = logging.getLogger("personal-shopper")
 logger.setLevel(logging.INFO)
 
 load_dotenv()
 
-# Initialize the customer database
-db = CustomerDatabase()
+# Initialize the customer database. Queries run off the event loop, so disk
+# I/O never delays audio for the sessions sharing this worker.
+db = AsyncCustomerDatabase()
 
 @dataclass
 class UserData:
@@ -27,12 +29,15 @@ class UserData:
     personas: dict[str, Agent] = field(default_factory=dict)
     prev_agent: Optional[Agent] = None
     ctx: Optional[JobContext] = None
+    handoff: HandoffContext = field(default_factory=HandoffContext)
 
     # Customer information
     first_name: Optional[str] = None
     last_name: Optional[str] = None
     customer_id: Optional[str] = None
     current_order: Optional[dict] = None
+    # Close matches awaiting the customer's confirmation
+    candidates: list[dict] = field(default_factory=list)
 
     def is_identified(self) -> bool:
         """Check if the customer is identified."""
@@ -44,6 +49,7 @@ class UserData:
         self.last_name = None
         self.customer_id = None
         self.current_order = None
+        self.candidates = []
 
     def summarize(self) -> str:
         """Return a summary of the user data."""
@@ -88,30 +94,58 @@ class BaseAgent(Agent):
     def _truncate_chat_ctx(
         self,
         items: list,
-        keep_last_n_messages: int = 6,
         keep_system_message: bool = False,
         keep_function_call: bool = False,
     ) -> list:
-        """Truncate the chat context to keep the last n messages."""
-        def _valid_item(item) -> bool:
-            if not keep_system_message and item.type == "message" and item.role == "system":
-                return False
-            if not keep_function_call and item.type in ["function_call", "function_call_output"]:
-                return False
-            return True
-
-        new_items = []
-        for item in reversed(items):
-            if _valid_item(item):
-                new_items.append(item)
-            if len(new_items) >= keep_last_n_messages:
-                break
-        new_items = new_items[::-1]
-
-        while new_items and new_items[0].type in ["function_call", "function_call_output"]:
-            new_items.pop(0)
-
-        return new_items
+        """Keep the most recent items that fit the session's handoff token budget."""
+        userdata: UserData = self.session.userdata
+        return userdata.handoff.select(items, keep_system_message, keep_function_call)
+
+    async def _identify_customer(self, first_name: str, last_name: str, new_customer: bool) -> str:
+        """Find the customer's account, tolerating misheard spellings of their name."""
+        userdata: UserData = self.session.userdata
+        if new_customer:
+            customer_id = await db.create_customer(first_name, last_name)
+        else:
+            candidates = await db.find_customer_candidates(first_name, last_name)
+            if candidates and candidates[0]['score'] < 1.0:
+                # Ask once rather than guess: a wrong account means another identification round
+                userdata.candidates = candidates
+                options = "; ".join(
+                    f"ID {c['id']}: {c['first_name']} {c['last_name']}" for c in candidates
+                )
+                return (
+                    f"No exact match for {first_name} {last_name}, but these accounts are close: {options}. "
+                    "Ask the customer which is theirs, then call confirm_customer with its ID. "
+                    "If none is theirs, call identify_customer again with new_customer set to true."
+                )
+            if candidates:
+                return self._set_customer(candidates[0])
+            customer_id = await db.create_customer(first_name, last_name)
+
+        return self._set_customer({'id': customer_id, 'first_name': first_name, 'last_name': last_name})
+
+    def _set_customer(self, customer: dict) -> str:
+        userdata: UserData = self.session.userdata
+        userdata.first_name = customer['first_name']
+        userdata.last_name = customer['last_name']
+        userdata.customer_id = customer['id']
+        userdata.candidates = []
+        return f"Thank you, {customer['first_name']}. I've found your account."
+
+    @function_tool
+    async def confirm_customer(self, customer_id: int):
+        """
+        Confirm which of the suggested accounts belongs to the customer.
+
+        Args:
+            customer_id: The ID of the account the customer confirmed
+        """
+        userdata: UserData = self.session.userdata
+        for candidate in userdata.candidates:
+            if candidate['id'] == customer_id:
+                return self._set_customer(candidate)
+        return "That ID was not one of the suggested accounts. Please ask the customer for their name again."
 
     async def _transfer_to_agent(self, name: str, context: RunContext_T) -> Agent:
         """Transfer to another agent while preserving context."""
@@ -129,25 +163,20 @@ class TriageAgent(BaseAgent):
             instructions=load_prompt('triage_prompt.yaml'),
             stt=deepgram.STT(),
             llm=openai.LLM(model="gpt-4o-mini"),
-            tts=cartesia.TTS(),
-            vad=silero.VAD.load()
+            tts=cartesia.TTS()
         )
 
     @function_tool
-    async def identify_customer(self, first_name: str, last_name: str):
+    async def identify_customer(self, first_name: str, last_name: str, new_customer: bool = False):
         """
         Identify a customer by their first and last name.
 
         Args:
             first_name: The customer's first name
             last_name: The customer's last name
+            new_customer: True only if the customer said none of the suggested accounts is theirs
         """
-        userdata: UserData = self.session.userdata
-        userdata.first_name = first_name
-        userdata.last_name = last_name
-        userdata.customer_id = db.get_or_create_customer(first_name, last_name)
-
-        return f"Thank you, {first_name}. I've found your account."
+        return await self._identify_customer(first_name, last_name, new_customer)
 
     @function_tool
     async def transfer_to_sales(self, context: RunContext_T) -> Agent:
@@ -180,25 +209,20 @@ class SalesAgent(BaseAgent):
             instructions=load_prompt('sales_prompt.yaml'),
             stt=deepgram.STT(),
             llm=openai.LLM(model="gpt-4o-mini"),
-            tts=cartesia.TTS(),
-            vad=silero.VAD.load()
+            tts=cartesia.TTS()
         )
 
     @function_tool
-    async def identify_customer(self, first_name: str, last_name: str):
+    async def identify_customer(self, first_name: str, last_name: str, new_customer: bool = False):
         """
         Identify a customer by their first and last name.
 
         Args:
             first_name: The customer's first name
             last_name: The customer's last name
+            new_customer: True only if the customer said none of the suggested accounts is theirs
         """
-        userdata: UserData = self.session.userdata
-        userdata.first_name = first_name
-        userdata.last_name = last_name
-        userdata.customer_id = db.get_or_create_customer(first_name, last_name)
-
-        return f"Thank you, {first_name}. I've found your account."
+        return await self._identify_customer(first_name, last_name, new_customer)
 
     @function_tool
     async def start_order(self):
@@ -255,7 +279,7 @@ class SalesAgent(BaseAgent):
         userdata.current_order["total"] = total
 
         # Save order to database
-        order_id = db.add_order(userdata.customer_id, userdata.current_order)
+        order_id = await db.add_order(userdata.customer_id, userdata.current_order)
 
         # Create a summary of the order
         summary = f"Order #{order_id} has been completed. Total: ${total:.2f}\n"
@@ -268,6 +292,29 @@ class SalesAgent(BaseAgent):
 
         return summary
 
+    @function_tool
+    async def get_purchase_summary(self):
+        """Summarize what the current customer buys most and how much they have spent, overall and by month."""
+        userdata: UserData = self.session.userdata
+        if not userdata.is_identified():
+            return "Please identify the customer first using the identify_customer function."
+
+        totals = await db.get_total_spent(userdata.customer_id)
+        if not totals["orders"]:
+            return f"{userdata.first_name} has no previous purchases."
+
+        top_items = await db.get_top_items(userdata.customer_id)
+        by_month = await db.get_spend_by_period(userdata.customer_id, "month", limit=6)
+
+        summary = f"{totals['orders']} orders, {totals['items']} items, ${totals['spent']:.2f} spent in total.\n"
+        summary += "Most purchased items:\n"
+        for item in top_items:
+            summary += f"- {item['name']}: {item['quantity']} bought, last on {item['last_purchased']}\n"
+        summary += "Spend by month:\n"
+        for month in by_month:
+            summary += f"- {month['period']}: ${month['spent']:.2f} over {month['orders']} orders\n"
+        return summary
+
     @function_tool
     async def transfer_to_triage(self, context: RunContext_T) -> Agent:
         # Create a personalized message if customer is identified
@@ -299,35 +346,87 @@ class ReturnsAgent(BaseAgent):
             instructions=load_prompt('returns_prompt.yaml'),
             stt=deepgram.STT(),
             llm=openai.LLM(model="gpt-4o-mini"),
-            tts=cartesia.TTS(),
-            vad=silero.VAD.load()
+            tts=cartesia.TTS()
         )
 
     @function_tool
-    async def identify_customer(self, first_name: str, last_name: str):
+    async def identify_customer(self, first_name: str, last_name: str, new_customer: bool = False):
         """
         Identify a customer by their first and last name.
 
         Args:
             first_name: The customer's first name
             last_name: The customer's last name
+            new_customer: True only if the customer said none of the suggested accounts is theirs
+        """
+        return await self._identify_customer(first_name, last_name, new_customer)
+
+    @function_tool
+    async def get_order_history(self, page: int = 1):
+        """
+        Get the order history for the current customer, ten orders per page, newest first.
+
+        Args:
+            page: Which page of orders to fetch; page 1 has the most recent orders
         """
         userdata: UserData = self.session.userdata
-        userdata.first_name = first_name
-        userdata.last_name = last_name
-        userdata.customer_id = db.get_or_create_customer(first_name, last_name)
+        if not userdata.is_identified():
+            return "Please identify the customer first using the identify_customer function."
 
-        return f"Thank you, {first_name}. I've found your account."
+        page_size = HISTORY_PAGE_SIZE
+        order_history = await db.get_customer_order_history(
+            userdata.first_name, userdata.last_name, limit=page_size, offset=(max(page, 1) - 1) * page_size
+        )
+        return order_history
 
     @function_tool
-    async def get_order_history(self):
-        """Get the order history for the current customer."""
+    async def search_orders(self, item_description: str, start_date: Optional[str] = None, end_date: Optional[str] = None):
+        """
+        Search the current customer's past orders for an item, e.g. "earbuds" or "blue shirt".
+        Prefer this over get_order_history when the customer describes what they bought.
+
+        Args:
+            item_description: Words from the item's name or description
+            start_date: Optional earliest order date, as YYYY-MM-DD
+            end_date: Optional latest order date, as YYYY-MM-DD
+        """
         userdata: UserData = self.session.userdata
         if not userdata.is_identified():
             return "Please identify the customer first using the identify_customer function."
 
-        order_history = db.get_customer_order_history(userdata.first_name, userdata.last_name)
-        return order_history
+        orders = await db.search_orders(userdata.customer_id, item_description, (start_date, end_date))
+        if not orders:
+            return f"No orders matching '{item_description}' found for this customer."
+
+        result = f"Orders matching '{item_description}', newest first:\n\n"
+        for order in orders:
+            result += f"Order #{order['id']} (Date: {order['date']}), matching: {order['matched_items']}\n"
+            for item in order['details'].get('items', []):
+                result += f"- {item.get('quantity', 1)}x {item.get('name', 'Unknown Item')}"
+                if 'price' in item:
+                    result += f" (${item['price']})"
+                result += "\n"
+            result += "\n"
+        return result
+
+    @function_tool
+    async def find_last_purchase(self, item_name: str):
+        """
+        Find the most recent order in which the current customer bought an item.
+
+        Args:
+            item_name: The name, or part of the name, of the item
+        """
+        userdata: UserData = self.session.userdata
+        if not userdata.is_identified():
+            return "Please identify the customer first using the identify_customer function."
+
+        purchase = await db.get_last_purchase(userdata.customer_id, item_name)
+        if purchase is None:
+            return f"No purchase of {item_name} found for this customer."
+        price = f" at ${purchase['price']} each" if purchase['price'] is not None else ""
+        return (f"Last bought {purchase['quantity']}x {purchase['name']}{price} "
+                f"in order #{purchase['order_id']} on {purchase['order_date']}.")
 
     @function_tool
     async def process_return(self, order_id: int, item_name: str, reason: str):
@@ -372,11 +471,21 @@ class ReturnsAgent(BaseAgent):
         return await self._transfer_to_agent("sales", context)
 
 
+def prewarm(proc: JobProcess):
+    # Parse the prompt files and load the VAD once per worker process, before
+    # any session starts; every persona shares the one VAD
+    prompts.load_all()
+    proc.userdata["vad"] = silero.VAD.load()
+
+
 async def entrypoint(ctx: JobContext):
     await ctx.connect()
 
     # Initialize user data with context
     userdata = UserData(ctx=ctx)
+    if os.getenv("HANDOFF_SUMMARY_MODEL"):
+        # Fold turns that no longer fit the handoff budget into a rolling summary
+        userdata.handoff.summarize = llm_summarizer(openai.LLM(model=os.getenv("HANDOFF_SUMMARY_MODEL")))
 
     # Create agent instances
     triage_agent = TriageAgent()
@@ -391,7 +500,15 @@ async def entrypoint(ctx: JobContext):
     })
 
     # Create session with userdata
-    session = AgentSession[UserData](userdata=userdata)
+    session = AgentSession[UserData](userdata=userdata, vad=ctx.proc.userdata["vad"])
+
+    # Track tokens, TTS characters and STT audio per persona; the summary is
+    # logged (and appended to USAGE_SUMMARY_PATH if set) when the job ends
+    ledger = UsageLedger(session_id=ctx.room.name, summary_path=os.getenv("USAGE_SUMMARY_PATH"))
+    ledger.attach(session)
+    ctx.add_shutdown_callback(ledger.close)
+    # Make sure orders placed at the end of the call are committed
+    ctx.add_shutdown_callback(db.flush)
 
     await session.start(
         agent=triage_agent,  # Start with the Triage agent
@@ -399,4 +516,4 @@ async def entrypoint(ctx: JobContext):
     )
 
 if __name__ == "__main__":
-    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint))
+    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint, prewarm_fnc=prewarm))
@@ -3,7 +3,7 @@ import os
 from pathlib import Path
 from dotenv import load_dotenv
 from livekit import api
-from livekit.agents import JobContext, WorkerOptions, cli
+from livekit.agents import JobContext, JobProcess, WorkerOptions, cli
 from livekit.agents.voice import Agent, AgentSession
 from livekit.plugins import openai, silero, deepgram
 
@@ -20,13 +20,15 @@ class RecordingAgent(Agent):
             """,
             stt=deepgram.STT(),
             llm=openai.LLM(model="gpt-4o"),
-            tts=openai.TTS(),
-            vad=silero.VAD.load()
+            tts=openai.TTS()
         )
     
     async def on_enter(self):
         self.session.generate_reply()
 
+def prewarm(proc: JobProcess):
+    proc.userdata["vad"] = silero.VAD.load()
+
 async def entrypoint(ctx: JobContext):
     file_contents = ""
     with open("/path/to/credentials.json", "r") as f:
@@ -53,7 +55,7 @@ async def entrypoint(ctx: JobContext):
 
     await ctx.connect()
 
-    session = AgentSession()
+    session = AgentSession(vad=ctx.proc.userdata["vad"])
 
     await session.start(
         agent=RecordingAgent(),
@@ -63,4 +65,4 @@ async def entrypoint(ctx: JobContext):
     await lkapi.aclose()
 
 if __name__ == "__main__":
-    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint))
\ No newline at end of file
+    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint, prewarm_fnc=prewarm))
\ No newline at end of file
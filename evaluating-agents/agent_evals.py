@@ -1,7 +1,7 @@
 import logging
 from pathlib import Path
 from dotenv import load_dotenv
-from livekit.agents import JobContext, WorkerOptions, cli
+from livekit.agents import JobContext, JobProcess, WorkerOptions, cli
 from livekit.agents.llm import function_tool
 from livekit.agents.voice import Agent, AgentSession, RunContext
 from livekit.plugins import openai, deepgram, silero
@@ -37,8 +37,7 @@ class SimpleAgent(Agent):
             """,
             stt=deepgram.STT(),
             llm=openai.LLM(),
-            tts=openai.TTS(),
-            vad=silero.VAD.load()
+            tts=openai.TTS()
         )
     
     async def on_enter(self):
@@ -50,10 +49,13 @@ class SimpleAgent(Agent):
         self.session.say(result)
         return None, "I've graded the answer."
 
+def prewarm(proc: JobProcess):
+    proc.userdata["vad"] = silero.VAD.load()
+
 async def entrypoint(ctx: JobContext):
     await ctx.connect()
 
-    session = AgentSession()
+    session = AgentSession(vad=ctx.proc.userdata["vad"])
 
     await session.start(
         agent=SimpleAgent(),
@@ -61,4 +63,4 @@ async def entrypoint(ctx: JobContext):
     )
 
 if __name__ == "__main__":
-    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint, agent_name="agent_evaluator"))
\ No newline at end of file
+    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint, prewarm_fnc=prewarm, agent_name="agent_evaluator"))
\ No newline at end of file
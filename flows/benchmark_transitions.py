@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark stage transitions in the multi-stage survey.
+
+Walks the survey in multi_stage_flow.py from Stage 1 to the summary (seven
+agents) and times how long each transition spends building the next agent,
+two ways:
+
+- per-stage: every agent builds its own STT, LLM, TTS and loads the VAD
+  (how multi_stage_flow.py used to work)
+- session: agents inherit the plugins built once for the session
+
+    python benchmark_transitions.py --runs 20
+
+The plugin constructors need API keys but make no requests, so placeholder
+keys are used when none are set.
+"""
+
+import argparse
+import logging
+import os
+import random
+import time
+
+for key in ("DEEPGRAM_API_KEY", "OPENAI_API_KEY", "CARTESIA_API_KEY"):
+    os.environ.setdefault(key, "benchmark")
+
+from livekit.plugins import cartesia, deepgram, openai, silero
+
+import multi_stage_flow as flow
+
+
+def per_stage_plugins_init(self, job_context, instructions: str) -> None:
+    """The previous BaseAgent.__init__: new plugins for every stage."""
+    self.job_context = job_context
+    flow.Agent.__init__(
+        self,
+        instructions=instructions,
+        stt=deepgram.STT(),
+        llm=openai.LLM(model="gpt-4o"),
+        tts=cartesia.TTS(),
+        vad=silero.VAD.load()
+    )
+
+
+def survey_path(rng: random.Random):
+    """The agent classes a respondent visits, with a random answer at each choice."""
+    return [
+        flow.Stage1Agent,
+        rng.choice([flow.Stage1ABranchAgent, flow.Stage1BBranchAgent]),
+        flow.Stage2Agent,
+        rng.choice([flow.Stage2XBranchAgent, flow.Stage2YBranchAgent]),
+        flow.Stage3Agent,
+        rng.choice([flow.Stage3MBranchAgent, flow.Stage3NBranchAgent]),
+        flow.SummaryAgent,
+    ]
+
+
+def run_survey(path):
+    timings = []
+    for agent_cls in path:
+        start = time.perf_counter()
+        agent_cls(job_context=None)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark multi-stage survey transitions")
+    parser.add_argument("--runs", type=int, default=20, help="Complete surveys to walk through")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed for the survey answers")
+    args = parser.parse_args()
+
+    logging.getLogger("complex-flow").setLevel(logging.WARNING)
+    rng = random.Random(args.seed)
+    paths = [survey_path(rng) for _ in range(args.runs)]
+
+    # Building the session's plugins is a one-off cost, paid before the call starts
+    start = time.perf_counter()
+    deepgram.STT(), openai.LLM(model="gpt-4o"), cartesia.TTS(), silero.VAD.load()
+    setup = time.perf_counter() - start
+
+    # Both runs use the real stage classes; only BaseAgent.__init__ is swapped
+    results = {}
+    session_init = flow.BaseAgent.__init__
+    for name, base_init in (("per-stage", per_stage_plugins_init), ("session", session_init)):
+        flow.BaseAgent.__init__ = base_init
+        results[name] = [t for path in paths for t in run_survey(path)]
+    flow.BaseAgent.__init__ = session_init
+
+    print(f"{args.runs} surveys, {len(paths[0])} agents each; session plugins built once in {setup * 1000:.1f}ms\n")
+    print(f"{'plugins':<12}{'p50':>10}{'p95':>10}{'p99':>10}{'per survey':>14}")
+    for name, timings in results.items():
+        print(f"{name:<12}"
+              f"{percentile(timings, 50) * 1000:>8.2f}ms"
+              f"{percentile(timings, 95) * 1000:>8.2f}ms"
+              f"{percentile(timings, 99) * 1000:>8.2f}ms"
+              f"{sum(timings) / args.runs * 1000:>12.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,127 +1,43 @@
 import logging
+import os
+from pathlib import Path
 from dotenv import load_dotenv
-from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Type
 
-from livekit.agents import JobContext, WorkerOptions, cli
-from livekit.agents.llm import function_tool
-from livekit.agents.voice import Agent, AgentSession
+from livekit.agents import JobContext, JobProcess, WorkerOptions, cli
+from livekit.agents.voice import AgentSession
 from livekit.plugins import deepgram, openai, cartesia, silero
-from livekit import api
+
+from flow_engine import FlowGraph, FlowRun
 
 # Load environment and configure logger
 load_dotenv()
 logger = logging.getLogger("declarative-flow")
 logger.setLevel(logging.INFO)
 
-@dataclass
-class SurveyData:
-    """Stores all survey responses and state."""
-    responses: Dict[str, str] = field(default_factory=dict)
-    current_stage: str = "collect_name"
-    path_taken: List[str] = field(default_factory=list)
-
-    def record(self, question: str, answer: str):
-        self.responses[question] = answer
-        self.path_taken.append(f"Stage '{self.current_stage}' - {question}: {answer}")
-
-class BaseAgent(Agent):
-    """Base agent with common setup and transition logic."""
-    def __init__(self, job_context: JobContext, instructions: str) -> None:
-        self.job_context = job_context
-        super().__init__(
-            instructions=instructions,
-            stt=deepgram.STT(),
-            llm=openai.LLM(model="gpt-4o"),
-            tts=cartesia.TTS(),
-            vad=silero.VAD.load()
-        )
-
-    async def transition(self) -> Optional[Agent]:
-        """Move to the next agent based on the flow definition."""
-        current = self.session.state.get("current_node")
-        next_fn = flow.get(current, {}).get("next")
-        if not next_fn:
-            return None
-        next_node = next_fn(self.session.state)
-        if next_node is None:
-            return None
-        self.session.state["current_node"] = next_node
-        agent_cls: Type[Agent] = flow[next_node]["agent"]
-        return agent_cls(self.job_context)
-
-class DataCollectorAgent(BaseAgent):
-    """Generic agent for collecting a single piece of data and transitioning."""
-    key: str
-    label: str
-    question: str
-    instruction: str
-
-    def __init__(self, job_context: JobContext) -> None:
-        super().__init__(job_context=job_context, instructions=self.instruction)
-
-    async def on_enter(self) -> None:
-        await self.session.say(self.question)
-
-    @function_tool
-    async def collect(self, value: str) -> Optional[Agent]:
-        sd: SurveyData = self.session.userdata
-        sd.record(self.label, value)
-        self.session.state[self.key] = value
-        return await self.transition()
-
-class CollectNameAgent(DataCollectorAgent):
-    key = "name"
-    label = "Name"
-    question = "What is your name?"
-    instruction = "Please tell me your name."
-
-class CollectEmailAgent(DataCollectorAgent):
-    key = "email"
-    label = "Email"
-    question = "What is your email address?"
-    instruction = "Please tell me your email address."
-
-class SummaryAgent(BaseAgent):
-    def __init__(self, job_context: JobContext) -> None:
-        super().__init__(job_context=job_context, instructions="Summary of your information.")
-
-    async def on_enter(self) -> None:
-        sd: SurveyData = self.session.userdata
-        name = sd.responses.get("Name", "[not provided]")
-        email = sd.responses.get("Email", "[not provided]")
-        summary = f"Thank you! Here is what I collected:\n- Name: {name}\n- Email: {email}"
-        await self.session.say(summary)
-        logger.info("Survey complete. Closing session.")
-        await self.session.aclose()
-        try:
-            await self.job_context.api.room.delete_room(
-                api.DeleteRoomRequest(room=self.job_context.room.name)
-            )
-        except Exception as e:
-            logger.error(f"Error deleting room: {e}")
+# The flow is data: edit survey_flow.yaml (or point FLOW_PATH at another
+# YAML/JSON file) to change the questions and branches
+FLOW_PATH = os.getenv("FLOW_PATH", Path(__file__).parent / "survey_flow.yaml")
 
-flow = {
-    "collect_name": {
-        "agent": CollectNameAgent,
-        "next": lambda state: "collect_email"
-    },
-    "collect_email": {
-        "agent": CollectEmailAgent,
-        "next": lambda state: "summary"
-    },
-    "summary": {
-        "agent": SummaryAgent,
-        "next": None
-    }
-}
+def prewarm(proc: JobProcess):
+    # Load the VAD and validate and compile the flow once per worker process
+    proc.userdata["vad"] = silero.VAD.load()
+    proc.userdata["flow"] = FlowGraph.load(FLOW_PATH)
 
 async def entrypoint(ctx: JobContext) -> None:
     await ctx.connect()
-    session = AgentSession()
-    session.userdata = SurveyData()
-    session.state = {"current_node": "collect_name"}
-    await session.start(agent=CollectNameAgent(ctx), room=ctx.room)
+    # One set of plugins for the whole flow, shared by every node's agent
+    session = AgentSession(
+        stt=deepgram.STT(),
+        llm=openai.LLM(model="gpt-4o"),
+        tts=cartesia.TTS(),
+        vad=ctx.proc.userdata["vad"],
+    )
+    # Every node's agent is built here, before the call starts
+    run = FlowRun(ctx.proc.userdata["flow"], ctx)
+    session.userdata = run
+    # Synthesize the first question while the session connects
+    run.prefetch(session.tts, [run.graph.start])
+    await session.start(agent=run.start_agent, room=ctx.room)
 
 if __name__ == "__main__":
-    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint))
+    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint, prewarm_fnc=prewarm))
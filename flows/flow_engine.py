@@ -0,0 +1,352 @@
+"""
+Compiled declarative flows.
+
+A flow is a graph of nodes loaded from YAML or JSON (see survey_flow.yaml).
+`FlowGraph.load` parses and validates it once per worker process: every
+`goto` must name a node, every node must be reachable from `start` and able
+to reach an end, and every `when` predicate is compiled to a code object,
+checked to use only simple expressions over answers some node collects.
+
+`FlowRun` runs a graph for one session. It builds an agent for every node up
+front and reuses it whenever the flow returns to that node, so a transition
+only picks an agent out of a dict. While a node is asking its question, the
+questions of the nodes it can lead to are synthesized in the background, so
+the next question starts playing as soon as the answer is recorded.
+"""
+
+import ast
+import asyncio
+import json
+import logging
+import string
+import sys
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from livekit import api, rtc
+from livekit.agents import JobContext
+from livekit.agents.llm import function_tool
+from livekit.agents.voice import Agent
+
+logger = logging.getLogger("flow-engine")
+
+# What a `when` predicate may contain: comparisons, boolean logic, constants,
+# the collected answers and a few conversions
+ALLOWED_NODES = (
+    ast.Expression, ast.BoolOp, ast.And, ast.Or, ast.UnaryOp, ast.Not, ast.Compare,
+    ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.In, ast.NotIn, ast.Is, ast.IsNot,
+    ast.Name, ast.Load, ast.Constant, ast.Call, ast.Tuple, ast.List,
+)
+PREDICATE_FUNCTIONS = {"len": len, "int": int, "float": float, "str": str}
+
+
+class FlowError(ValueError):
+    """A flow definition that can't be run; lists every problem found."""
+
+    def __init__(self, source: str, problems: List[str]):
+        self.problems = problems
+        super().__init__(f"{source}: " + "; ".join(problems))
+
+
+@dataclass
+class Branch:
+    goto: str
+    when: Optional[str] = None
+    predicate: Any = None  # compiled code object; None always matches
+
+    def matches(self, answers: Dict[str, Optional[str]]) -> bool:
+        if self.predicate is None:
+            return True
+        try:
+            return bool(eval(self.predicate, {"__builtins__": {}, **PREDICATE_FUNCTIONS}, answers))
+        except Exception as e:
+            # A predicate over an unexpected answer (e.g. int("maybe")) just doesn't match
+            logger.warning(f"predicate {self.when!r} failed: {e}")
+            return False
+
+
+@dataclass
+class Node:
+    id: str
+    key: Optional[str] = None
+    label: Optional[str] = None
+    question: Optional[str] = None
+    instruction: Optional[str] = None
+    say: Optional[str] = None
+    branches: List[Branch] = field(default_factory=list)
+
+    @property
+    def is_end(self) -> bool:
+        return not self.branches
+
+    @property
+    def successors(self) -> List[str]:
+        return list(dict.fromkeys(branch.goto for branch in self.branches))
+
+    def next(self, answers: Dict[str, Optional[str]]) -> str:
+        for branch in self.branches:
+            if branch.matches(answers):
+                return branch.goto
+        # Validation guarantees a default branch, so this is unreachable
+        raise RuntimeError(f"no branch of {self.id} matched")
+
+
+class FlowGraph:
+    """A validated flow with precompiled predicates, shared by every session."""
+
+    def __init__(self, start: str, nodes: Dict[str, Node]):
+        self.start = start
+        self.nodes = nodes
+        self.keys = sorted({node.key for node in nodes.values() if node.key})
+
+    @classmethod
+    def load(cls, path) -> "FlowGraph":
+        path = Path(path)
+        with open(path) as f:
+            if path.suffix in (".yaml", ".yml"):
+                import yaml
+                spec = yaml.safe_load(f)
+            else:
+                spec = json.load(f)
+        return cls.from_dict(spec, source=str(path))
+
+    @classmethod
+    def from_dict(cls, spec: Dict[str, Any], source: str = "flow") -> "FlowGraph":
+        problems = []
+        raw_nodes = spec.get("nodes") if isinstance(spec, dict) else None
+        if not isinstance(raw_nodes, dict) or not raw_nodes:
+            raise FlowError(source, ["'nodes' must be a non-empty mapping"])
+        start = spec.get("start")
+        if start not in raw_nodes:
+            problems.append(f"start node {start!r} is not defined")
+
+        nodes = {}
+        for node_id, raw in raw_nodes.items():
+            raw = raw or {}
+            if not isinstance(raw, dict):
+                problems.append(f"{node_id}: must be a mapping, not {type(raw).__name__}")
+                continue
+            node = Node(
+                id=node_id,
+                key=raw.get("key"),
+                label=raw.get("label") or raw.get("key"),
+                question=raw.get("question"),
+                instruction=raw.get("instruction") or raw.get("question"),
+                say=raw.get("say"),
+            )
+            if node.say is None and not (node.key and node.question):
+                problems.append(f"{node_id}: needs 'key' and 'question', or 'say' to end the flow")
+            if node.say is not None and raw.get("next") is not None:
+                problems.append(f"{node_id}: an end node ('say') can't have 'next'")
+            if node.say is None and raw.get("next") is None:
+                problems.append(f"{node_id}: needs 'next'")
+
+            next_spec = raw.get("next")
+            if isinstance(next_spec, str):
+                next_spec = [{"goto": next_spec}]
+            elif next_spec is not None and not isinstance(next_spec, list):
+                problems.append(f"{node_id}: 'next' must be a node name or a list of branches")
+                next_spec = None
+            for i, raw_branch in enumerate(next_spec or []):
+                if not isinstance(raw_branch, dict) or not raw_branch.get("goto"):
+                    problems.append(f"{node_id}: branch {i} needs 'goto'")
+                    continue
+                node.branches.append(Branch(goto=raw_branch["goto"], when=raw_branch.get("when")))
+            if node.branches and node.branches[-1].when is not None:
+                problems.append(f"{node_id}: the last branch must have no 'when', so some branch always matches")
+            nodes[node_id] = node
+
+        keys = {node.key for node in nodes.values() if node.key}
+        for node in nodes.values():
+            if node.say is not None:
+                fields = {name for _, name, _, _ in string.Formatter().parse(node.say) if name}
+                for name in sorted(fields - keys):
+                    problems.append(f"{node.id}: 'say' uses {{{name}}}, which no node collects")
+            for branch in node.branches:
+                if branch.goto not in nodes:
+                    problems.append(f"{node.id}: goto {branch.goto!r} is not defined")
+                if branch.when is not None:
+                    try:
+                        branch.predicate = compile_predicate(branch.when, keys)
+                    except ValueError as e:
+                        problems.append(f"{node.id}: {e}")
+        if problems:
+            raise FlowError(source, problems)
+
+        graph = cls(start, nodes)
+        unreachable = set(nodes) - graph._reachable_from(start)
+        if unreachable:
+            problems.append(f"unreachable from {start!r}: {', '.join(sorted(unreachable))}")
+        stuck = [node_id for node_id in nodes if not any(nodes[n].is_end for n in graph._reachable_from(node_id))]
+        if stuck:
+            problems.append(f"can never reach an end node: {', '.join(sorted(stuck))}")
+        if problems:
+            raise FlowError(source, problems)
+        return graph
+
+    def _reachable_from(self, node_id: str) -> set:
+        seen = {node_id}
+        queue = deque([node_id])
+        while queue:
+            for successor in self.nodes[queue.popleft()].successors:
+                if successor not in seen:
+                    seen.add(successor)
+                    queue.append(successor)
+        return seen
+
+
+def compile_predicate(expression: str, keys: set):
+    """Compile a `when` expression, allowing only answers, constants and a few functions."""
+    try:
+        tree = ast.parse(expression, mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"invalid predicate {expression!r}: {e.msg}") from None
+    for node in ast.walk(tree):
+        if not isinstance(node, ALLOWED_NODES):
+            raise ValueError(f"predicate {expression!r} can't use {type(node).__name__}")
+        if isinstance(node, ast.Call) and not (isinstance(node.func, ast.Name) and node.func.id in PREDICATE_FUNCTIONS):
+            raise ValueError(f"predicate {expression!r} may only call {', '.join(PREDICATE_FUNCTIONS)}")
+        if isinstance(node, ast.Name) and node.id not in keys and node.id not in PREDICATE_FUNCTIONS:
+            raise ValueError(f"predicate {expression!r} uses {node.id!r}, which no node collects")
+    return compile(tree, f"<when {expression}>", "eval")
+
+
+class FlowRun:
+    """One session's progress through a FlowGraph; use it as the session's userdata."""
+
+    def __init__(self, graph: FlowGraph, job_context: JobContext):
+        self.graph = graph
+        self.job_context = job_context
+        # Questions not answered yet are None, so predicates can test for that
+        self.answers: Dict[str, Optional[str]] = dict.fromkeys(graph.keys)
+        self.responses: Dict[str, str] = {}
+        self.path_taken: List[str] = []
+        self.current_node = graph.start
+        self.agents: Dict[str, Agent] = {
+            node_id: (EndAgent(self, node) if node.is_end else NodeAgent(self, node))
+            for node_id, node in graph.nodes.items()
+        }
+        self._audio: Dict[str, asyncio.Task] = {}
+
+    @property
+    def start_agent(self) -> Agent:
+        return self.agents[self.graph.start]
+
+    def record(self, node: Node, value: str):
+        self.answers[node.key] = value
+        self.responses[node.label] = value
+        self.path_taken.append(f"Stage '{node.id}' - {node.label}: {value}")
+
+    def advance(self, node: Node) -> Agent:
+        self.current_node = node.next(self.answers)
+        return self.agents[self.current_node]
+
+    def prefetch(self, tts, node_ids: List[str]):
+        """Start synthesizing the questions of `node_ids` in the background."""
+        for node_id in node_ids:
+            question = self.graph.nodes[node_id].question
+            if question and node_id not in self._audio:
+                task = self._audio[node_id] = asyncio.create_task(_synthesize(tts, question))
+                # Branches that are never taken never await their task
+                task.add_done_callback(_log_failure)
+
+    async def ask(self, session, node: Node):
+        """Ask the node's question, using its prefetched audio when there is some."""
+        frames = None
+        task = self._audio.get(node.id)
+        if task is not None:
+            try:
+                # An unfinished prefetch started earlier, so it's still ahead of a new request
+                frames = await task
+            except Exception:
+                # Already logged by _log_failure; say it the normal way and retry next time
+                del self._audio[node.id]
+        if frames:
+            await session.say(node.question, audio=_replay(frames))
+        else:
+            await session.say(node.question)
+
+
+def _log_failure(task: asyncio.Task):
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning(f"prefetching a question failed: {task.exception()}")
+
+
+async def _synthesize(tts, text: str) -> List[rtc.AudioFrame]:
+    frames = []
+    async with tts.synthesize(text) as stream:
+        async for audio in stream:
+            frames.append(audio.frame)
+    return frames
+
+
+async def _replay(frames: List[rtc.AudioFrame]):
+    for frame in frames:
+        yield frame
+
+
+class NodeAgent(Agent):
+    """Asks one node's question and records the answer."""
+
+    def __init__(self, run: FlowRun, node: Node) -> None:
+        self.run = run
+        self.node = node
+        super().__init__(instructions=node.instruction)
+
+    async def on_enter(self) -> None:
+        # Synthesize what comes next while this question plays and the user answers
+        if self.session.tts is not None:
+            self.run.prefetch(self.session.tts, self.node.successors)
+        await self.run.ask(self.session, self.node)
+
+    @function_tool
+    async def collect(self, value: str):
+        """Record the user's answer to the current question."""
+        self.run.record(self.node, value)
+        next_agent = self.run.advance(self.node)
+        if next_agent is self:
+            # Looping back to this node. Saying the question from inside the tool
+            # would wait on the speech the tool belongs to, so the reply asks it
+            return f"That answer doesn't work here. Ask again: {self.node.question}"
+        return next_agent
+
+
+class EndAgent(Agent):
+    """Says the node's closing message, then ends the session and the room."""
+
+    def __init__(self, run: FlowRun, node: Node) -> None:
+        self.run = run
+        self.node = node
+        super().__init__(instructions="Thank the user and end the conversation.")
+
+    async def on_enter(self) -> None:
+        answers = {key: "[not provided]" if value is None else value for key, value in self.run.answers.items()}
+        await self.session.say(self.node.say.format_map(answers).strip())
+        logger.info(f"Flow complete: {self.run.path_taken}")
+        await self.session.aclose()
+        job_context = self.run.job_context
+        try:
+            await job_context.api.room.delete_room(api.DeleteRoomRequest(room=job_context.room.name))
+        except Exception as e:
+            logger.error(f"Error deleting room: {e}")
+
+
+def main():
+    """Validate flow files: python flow_engine.py survey_flow.yaml"""
+    status = 0
+    for path in sys.argv[1:]:
+        try:
+            graph = FlowGraph.load(path)
+        except FlowError as e:
+            print(f"invalid: {e}")
+            status = 1
+            continue
+        ends = [node_id for node_id, node in graph.nodes.items() if node.is_end]
+        print(f"ok: {path}: {len(graph.nodes)} nodes from {graph.start!r} to {', '.join(ends)}")
+    sys.exit(status)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,7 @@ from typing import Dict, List, Annotated
 from enum import Enum
 from pydantic import Field
 
-from livekit.agents import JobContext, WorkerOptions, cli
+from livekit.agents import JobContext, JobProcess, WorkerOptions, cli
 from livekit.agents.llm import function_tool
 from livekit.agents.voice import Agent, AgentSession
 from livekit.plugins import deepgram, openai, cartesia, silero
@@ -46,13 +46,9 @@ class BaseAgent(Agent):
     """Base agent class handling job context and common setup."""
     def __init__(self, job_context: JobContext, instructions: str) -> None:
         self.job_context = job_context
-        super().__init__(
-            instructions=instructions,
-            stt=deepgram.STT(),
-            llm=openai.LLM(model="gpt-4o"),
-            tts=cartesia.TTS(),
-            vad=silero.VAD.load()
-        )
+        # STT, LLM, TTS and VAD come from the session, so moving to another
+        # stage doesn't reconnect clients or reload the VAD model
+        super().__init__(instructions=instructions)
 
 # Stage 1: Preference A or B
 class Stage1Agent(BaseAgent):
@@ -254,9 +250,18 @@ class SummaryAgent(BaseAgent):
         except Exception as e:
             logger.error(f"Error deleting room: {e}")
 
+def prewarm(proc: JobProcess):
+    proc.userdata["vad"] = silero.VAD.load()
+
 async def entrypoint(ctx: JobContext) -> None:
     await ctx.connect()
-    session = AgentSession()
+    # One set of plugins for the whole survey, shared by every stage agent
+    session = AgentSession(
+        stt=deepgram.STT(),
+        llm=openai.LLM(model="gpt-4o"),
+        tts=cartesia.TTS(),
+        vad=ctx.proc.userdata["vad"],
+    )
     session.userdata = SurveyData()
     await session.start(
         agent=Stage1Agent(job_context=ctx),
@@ -264,4 +269,4 @@ async def entrypoint(ctx: JobContext) -> None:
     )
 
 if __name__ == "__main__":
-    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint))
\ No newline at end of file
+    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint, prewarm_fnc=prewarm))
\ No newline at end of file
@@ -1,6 +1,6 @@
 import logging
 from dotenv import load_dotenv
-from livekit.agents import JobContext, WorkerOptions, cli
+from livekit.agents import JobContext, JobProcess, WorkerOptions, cli
 from livekit.agents.llm import function_tool
 from livekit.agents.voice import Agent, AgentSession
 from livekit.plugins import deepgram, openai, cartesia, silero
@@ -18,8 +18,7 @@ class BaseAgent(Agent):
             instructions=instructions,
             stt=deepgram.STT(),
             llm=openai.LLM(model="gpt-4o"),
-            tts=cartesia.TTS(),
-            vad=silero.VAD.load()
+            tts=cartesia.TTS()
         )
 
 class GreetingAgent(BaseAgent):
@@ -81,9 +80,12 @@ class SummaryAgent(BaseAgent):
         request = api.DeleteRoomRequest(room=self.job_context.room.name)
         await self.job_context.api.room.delete_room(request)
 
+def prewarm(proc: JobProcess):
+    proc.userdata["vad"] = silero.VAD.load()
+
 async def entrypoint(ctx: JobContext) -> None:
     await ctx.connect()
-    session = AgentSession()
+    session = AgentSession(vad=ctx.proc.userdata["vad"])
     await session.start(
         agent=GreetingAgent(
             job_context=ctx
@@ -92,4 +94,4 @@ async def entrypoint(ctx: JobContext) -> None:
     )
 
 if __name__ == "__main__":
-    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint))
\ No newline at end of file
+    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint, prewarm_fnc=prewarm))
\ No newline at end of file
@@ -8,7 +8,7 @@ from typing import AsyncIterable, Optional, List, Dict
 import requests
 from dotenv import load_dotenv
 from livekit import rtc
-from livekit.agents import JobContext, WorkerOptions, cli
+from livekit.agents import JobContext, JobProcess, WorkerOptions, cli
 from livekit.agents.voice import Agent, AgentSession
 from livekit.agents.voice.agent_activity import StopResponse
 from livekit.plugins import openai, deepgram, silero
@@ -33,8 +33,7 @@ class SimpleAgent(Agent):
             """,
             stt=deepgram.STT(),
             llm=openai.LLM(),
-            tts=openai.TTS(),
-            vad=silero.VAD.load()
+            tts=openai.TTS()
         )  
         self.hot_word_detected = False
         self.hot_word = HOT_WORD
@@ -178,10 +177,13 @@ class SimpleAgent(Agent):
         # Otherwise, don't generate a reply
         raise StopResponse()
 
+def prewarm(proc: JobProcess):
+    proc.userdata["vad"] = silero.VAD.load()
+
 async def entrypoint(ctx: JobContext):
     await ctx.connect()
 
-    session = AgentSession()
+    session = AgentSession(vad=ctx.proc.userdata["vad"])
 
     await session.start(
         agent=SimpleAgent(),
@@ -189,4 +191,4 @@ async def entrypoint(ctx: JobContext):
     )
 
 if __name__ == "__main__":
-    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint))
+    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint, prewarm_fnc=prewarm))
@@ -2,7 +2,7 @@ import logging
 import os
 from dotenv import load_dotenv
 from pathlib import Path
-from livekit.agents import Agent, AgentSession, JobContext, WorkerOptions, cli, mcp
+from livekit.agents import Agent, AgentSession, JobContext, JobProcess, WorkerOptions, cli, mcp
 from livekit.plugins import deepgram, openai, silero
 from livekit.plugins.turn_detector.multilingual import MultilingualModel
 
@@ -22,11 +22,14 @@ class MyAgent(Agent):
     async def on_enter(self):
         self.session.generate_reply()
 
+def prewarm(proc: JobProcess):
+    proc.userdata["vad"] = silero.VAD.load()
+
 async def entrypoint(ctx: JobContext):
     await ctx.connect()
 
     session = AgentSession(
-        vad=silero.VAD.load(),
+        vad=ctx.proc.userdata["vad"],
         stt=deepgram.STT(model="nova-3", language="multi"),
         llm=openai.LLM(model="gpt-4o-mini"),
         tts=openai.TTS(voice="ash"),
@@ -49,4 +52,4 @@ async def entrypoint(ctx: JobContext):
 
 
 if __name__ == "__main__":
-    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint))
\ No newline at end of file
+    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint, prewarm_fnc=prewarm))
\ No newline at end of file
@@ -0,0 +1,412 @@
+"""
+One metrics collector for every agent, with pluggable sinks.
+
+    collector = MetricsCollector([ConsoleSink(), FileSink("metrics.jsonl")])
+    collector.attach(session)
+
+Every LiveKit metrics event is normalised once into a compact `MetricsRecord`
+(timestamps as epoch floats, errors as strings, the plugin's model and
+provider, only the fields that type carries) and handed to each sink. Sinks that only touch memory run inline;
+sinks that do I/O or heavy work subclass `BackgroundSink` and get their own
+thread and queue, so the event loop that drives audio only ever pays for a
+queue put.
+
+`instrument(ctx, session)` builds sinks from the METRICS_SINKS environment
+variable and wires up startup and shutdown, so any example can be
+instrumented with one line in its entrypoint.
+
+Collect from the session rather than from the plugins: the session stamps
+LLM and TTS metrics with their `speech_id` before re-emitting them, and
+end-of-utterance metrics are only ever emitted by the session.
+"""
+
+import abc
+import asyncio
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Optional
+
+logger = logging.getLogger("metrics-collector")
+
+# Short kind for each LiveKit metrics type, and the fields that kind carries
+KINDS = {
+    "llm_metrics": "llm",
+    "stt_metrics": "stt",
+    "eou_metrics": "eou",
+    "tts_metrics": "tts",
+    "vad_metrics": "vad",
+}
+
+FIELDS = {
+    "llm": ("duration", "ttft", "cancelled", "completion_tokens", "prompt_tokens", "total_tokens", "tokens_per_second"),
+    "stt": ("duration", "streamed", "audio_duration"),
+    "eou": ("end_of_utterance_delay", "transcription_delay"),
+    "tts": ("ttfb", "duration", "audio_duration", "cancelled", "characters_count", "streamed"),
+    "vad": ("idle_time", "inference_duration_total", "inference_count"),
+}
+
+
+def normalize_timestamp(timestamp) -> Optional[float]:
+    if timestamp is None:
+        return None
+    if isinstance(timestamp, datetime):
+        return timestamp.timestamp()
+    return float(timestamp)
+
+
+class MetricsRecord:
+    """A normalised metrics event. `source` is the original LiveKit object."""
+
+    __slots__ = ("kind", "type", "label", "request_id", "speech_id", "timestamp", "error", "values", "source",
+                 "model", "provider")
+
+    def __init__(self, kind, type, label, request_id, speech_id, timestamp, error, values, source,
+                 model=None, provider=None) -> None:
+        self.kind = kind
+        self.type = type
+        self.label = label
+        self.request_id = request_id
+        self.speech_id = speech_id
+        self.timestamp = timestamp
+        self.error = error
+        self.values = values
+        self.source = source
+        self.model = model
+        self.provider = provider
+
+    @classmethod
+    def from_metrics(cls, metrics) -> Optional["MetricsRecord"]:
+        metrics_type = getattr(metrics, "type", None)
+        kind = KINDS.get(metrics_type)
+        if kind is None and getattr(metrics, "inference_count", None) is not None:
+            # Older VAD plugins emit VADEvent objects rather than VADMetrics
+            kind = "vad"
+        if kind is None:
+            return None
+        error = getattr(metrics, "error", None)
+        metadata = getattr(metrics, "metadata", None)
+        return cls(
+            kind=kind,
+            type=str(metrics_type),
+            label=getattr(metrics, "label", None),
+            request_id=getattr(metrics, "request_id", None),
+            speech_id=getattr(metrics, "speech_id", None),
+            timestamp=normalize_timestamp(getattr(metrics, "timestamp", None)),
+            error=str(error) if error else None,
+            values={name: getattr(metrics, name, None) for name in FIELDS[kind]},
+            source=metrics,
+            model=getattr(metadata, "model_name", None),
+            provider=getattr(metadata, "model_provider", None),
+        )
+
+    def to_dict(self) -> dict:
+        data = {
+            "type": self.type,
+            "label": self.label,
+            "request_id": self.request_id,
+            "timestamp": self.timestamp,
+            "speech_id": self.speech_id,
+            "error": self.error,
+        }
+        if self.model:
+            data["model"] = self.model
+        if self.provider:
+            data["provider"] = self.provider
+        data.update(self.values)
+        return data
+
+
+class MetricsSink(abc.ABC):
+    """Base sink. `handle` runs on the event loop, so it must be cheap."""
+
+    def start(self) -> None:
+        pass
+
+    @abc.abstractmethod
+    def handle(self, record: MetricsRecord) -> None:
+        ...
+
+    async def aclose(self) -> None:
+        pass
+
+
+class BackgroundSink(MetricsSink):
+    """
+    A sink whose work happens on its own thread. `handle` just enqueues; the
+    thread drains the queue and passes everything waiting to `handle_batch`.
+    """
+
+    def __init__(self) -> None:
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=type(self).__name__, daemon=True)
+            self._thread.start()
+
+    def handle(self, record: MetricsRecord) -> None:
+        self._queue.put(record)
+
+    async def aclose(self) -> None:
+        if self._thread is not None:
+            self._queue.put(None)
+            # Joining blocks, so wait from a worker thread instead of the loop
+            await asyncio.to_thread(self._thread.join)
+            self._thread = None
+
+    @abc.abstractmethod
+    def handle_batch(self, records: list[MetricsRecord]) -> None:
+        ...
+
+    def on_close(self) -> None:
+        pass
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            records = [self._queue.get()]
+            while True:
+                try:
+                    records.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if records[-1] is None:
+                stopping = True
+            records = [r for r in records if r is not None]
+            if records:
+                try:
+                    self.handle_batch(records)
+                except Exception:
+                    logger.exception(f"{type(self).__name__} failed to handle {len(records)} records")
+        self.on_close()
+
+
+class ConsoleSink(MetricsSink):
+    """
+    Live aggregated console summary (see console_reporter.py). `kinds`
+    limits it to some kinds of metrics, e.g. {"llm"}.
+    """
+
+    def __init__(self, reporter=None, *, kinds: Optional[Iterable[str]] = None) -> None:
+        from console_reporter import ConsoleReporter
+        self.reporter = reporter or ConsoleReporter()
+        self._kinds = None if kinds is None else frozenset(kinds)
+
+    def start(self) -> None:
+        self.reporter.start()
+
+    def handle(self, record: MetricsRecord) -> None:
+        if self._kinds is None or record.kind in self._kinds:
+            self.reporter.observe(record.source)
+
+    async def aclose(self) -> None:
+        await self.reporter.stop()
+
+
+class FileSink(BackgroundSink):
+    """Appends every record to a JSONL file from a background thread."""
+
+    def __init__(self, path: str) -> None:
+        super().__init__()
+        self._path = path
+        self._file = None
+
+    def handle_batch(self, records: list[MetricsRecord]) -> None:
+        if self._file is None:
+            self._file = open(self._path, "a", encoding="utf-8")
+        self._file.write("".join(
+            json.dumps({"kind": r.kind, **r.to_dict()}, default=str) + "\n" for r in records
+        ))
+        self._file.flush()
+
+    def on_close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class HttpBatchSink(MetricsSink):
+    """
+    Forwards records to a batching exporter such as
+    send-metrics-to-3p/metrics_exporter.py; anything with a non-blocking
+    `submit(metric_type, data)` works.
+    """
+
+    def __init__(self, exporter, *, owns_exporter: bool = True) -> None:
+        self.exporter = exporter
+        self._owns_exporter = owns_exporter
+
+    def start(self) -> None:
+        if self._owns_exporter:
+            self.exporter.start()
+
+    def handle(self, record: MetricsRecord) -> None:
+        self.exporter.submit(record.kind, record.to_dict())
+
+    async def aclose(self) -> None:
+        if self._owns_exporter:
+            await self.exporter.aclose()
+
+
+class PrometheusSink(MetricsSink):
+    """
+    Feeds the in-process Prometheus registry (see prometheus_registry.py) and,
+    if `port` is given, serves it for scraping.
+    """
+
+    def __init__(self, collector=None, *, port: Optional[int] = None) -> None:
+        from prometheus_registry import AgentMetricsCollector
+        self.collector = collector or AgentMetricsCollector()
+        self._port = port
+        self._server: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._port is not None and self._server is None:
+            from prometheus_registry import start_metrics_server
+            self._server = asyncio.ensure_future(start_metrics_server(self.collector.registry, port=self._port))
+
+    def handle(self, record: MetricsRecord) -> None:
+        self.collector.observe(record.source)
+
+    async def aclose(self) -> None:
+        if self._server is not None:
+            runner = await self._server
+            await runner.cleanup()
+            self._server = None
+
+
+class TurnLatencySink(MetricsSink):
+    """Feeds a TurnLatencyCorrelator (see turn_latency.py)."""
+
+    def __init__(self, correlator) -> None:
+        self.correlator = correlator
+
+    def handle(self, record: MetricsRecord) -> None:
+        if record.kind in ("eou", "llm", "tts"):
+            self.correlator.observe(record.source)
+
+
+class AggregateSink(MetricsSink):
+    """In-memory count/sum/min/max per kind, label and numeric field."""
+
+    def __init__(self) -> None:
+        # (kind, label, field) -> [count, total, min, max]
+        self._stats: dict[tuple, list] = {}
+
+    def handle(self, record: MetricsRecord) -> None:
+        for field, value in record.values.items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0:
+                continue
+            key = (record.kind, record.label, field)
+            stats = self._stats.get(key)
+            if stats is None:
+                self._stats[key] = [1, value, value, value]
+            else:
+                stats[0] += 1
+                stats[1] += value
+                if value < stats[2]:
+                    stats[2] = value
+                if value > stats[3]:
+                    stats[3] = value
+
+    def snapshot(self) -> dict:
+        """{kind: {label: {field: {count, mean, min, max}}}}"""
+        result: dict = {}
+        for (kind, label, field), (count, total, low, high) in self._stats.items():
+            result.setdefault(kind, {}).setdefault(label or "default", {})[field] = {
+                "count": count, "mean": total / count, "min": low, "max": high,
+            }
+        return result
+
+
+class MetricsCollector:
+    """Normalises metrics events and dispatches them to sinks."""
+
+    def __init__(self, sinks: Iterable[MetricsSink] = ()) -> None:
+        self.sinks = list(sinks)
+        self.records = 0
+        self._started = False
+
+    def add_sink(self, sink: MetricsSink) -> None:
+        self.sinks.append(sink)
+        if self._started:
+            sink.start()
+
+    def start(self) -> None:
+        if not self._started:
+            self._started = True
+            for sink in self.sinks:
+                sink.start()
+
+    async def aclose(self) -> None:
+        for sink in self.sinks:
+            try:
+                await sink.aclose()
+            except Exception:
+                logger.exception(f"error closing {type(sink).__name__}")
+        self._started = False
+
+    def emit(self, metrics) -> None:
+        record = MetricsRecord.from_metrics(metrics)
+        if record is None:
+            return
+        self.records += 1
+        for sink in self.sinks:
+            try:
+                sink.handle(record)
+            except Exception:
+                logger.exception(f"{type(sink).__name__} failed to handle a {record.kind} record")
+
+    def attach(self, session) -> "MetricsCollector":
+        """Collect every metrics event an AgentSession emits."""
+        session.on("metrics_collected", lambda ev: self.emit(ev.metrics))
+        return self
+
+
+def sinks_from_env() -> list[MetricsSink]:
+    """
+    Build sinks from METRICS_SINKS, a comma-separated list of
+    console, file, http, prometheus and aggregate (default: console).
+    METRICS_JSONL_PATH, METRICS_SERVER_URL and PROMETHEUS_PORT configure them.
+    Unless METRICS_SAMPLING=0, the file and http sinks only get a sample of
+    VAD and STT events (see sampling.py).
+    """
+    sample = os.getenv("METRICS_SAMPLING", "1") != "0"
+    if sample:
+        from sampling import SampledSink
+    names = [n.strip() for n in os.getenv("METRICS_SINKS", "console").split(",") if n.strip()]
+    sinks: list[MetricsSink] = []
+    for name in names:
+        if name == "console":
+            sinks.append(ConsoleSink())
+        elif name == "file":
+            sink = FileSink(os.getenv("METRICS_JSONL_PATH", "metrics.jsonl"))
+            sinks.append(SampledSink(sink) if sample else sink)
+        elif name == "http":
+            sys.path.append(str(Path(__file__).parent / "send-metrics-to-3p"))
+            from metrics_exporter import MetricsExporter
+            sink = HttpBatchSink(MetricsExporter(os.getenv("METRICS_SERVER_URL", "http://localhost:5001")))
+            sinks.append(SampledSink(sink) if sample else sink)
+        elif name == "prometheus":
+            sinks.append(PrometheusSink(port=int(os.getenv("PROMETHEUS_PORT", "9100"))))
+        elif name == "aggregate":
+            sinks.append(AggregateSink())
+        else:
+            logger.warning(f"Unknown metrics sink: {name}")
+    return sinks
+
+
+def instrument(ctx, session, sinks: Optional[Iterable[MetricsSink]] = None) -> MetricsCollector:
+    """Attach a collector to `session`, start its sinks and close them at job shutdown."""
+    collector = MetricsCollector(sinks_from_env() if sinks is None else sinks)
+    collector.start()
+    collector.attach(session)
+    ctx.add_shutdown_callback(collector.aclose)
+    return collector
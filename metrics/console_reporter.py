@@ -0,0 +1,205 @@
+"""
+Aggregated, rate-limited console reporting for agent metrics.
+
+Instead of printing a table for every metrics event, `ConsoleReporter.observe`
+folds each event into running per-component aggregates (a few additions under
+an uncontended lock), and a single `rich.Live` display redraws one summary at
+a fixed refresh rate from its own thread. Rendering cost stays the same
+whether ten or ten thousand events arrive per second. Events can also be
+written to a JSONL file by a background writer thread.
+"""
+
+import asyncio
+import json
+import logging
+import queue
+import threading
+import time
+from typing import Optional
+
+from rich import box
+from rich.console import Console, Group
+from rich.live import Live
+from rich.table import Table
+
+logger = logging.getLogger("console-reporter")
+
+# Fields summarised per metrics type, with the unit used to display them
+REPORTED_FIELDS = {
+    "llm_metrics": [("ttft", "s"), ("duration", "s"), ("prompt_tokens", ""), ("completion_tokens", ""), ("tokens_per_second", "")],
+    "stt_metrics": [("duration", "s"), ("audio_duration", "s")],
+    "eou_metrics": [("end_of_utterance_delay", "s"), ("transcription_delay", "s")],
+    "tts_metrics": [("ttfb", "s"), ("duration", "s"), ("audio_duration", "s"), ("characters_count", "")],
+    "vad_metrics": [("idle_time", "s"), ("inference_duration_total", "s"), ("inference_count", "")],
+}
+
+TITLES = {
+    "llm_metrics": "LLM",
+    "stt_metrics": "STT",
+    "eou_metrics": "End of Utterance",
+    "tts_metrics": "TTS",
+    "vad_metrics": "VAD",
+}
+
+
+class _FieldStats:
+    __slots__ = ("count", "total", "min", "max", "last")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = float("-inf")
+        self.last = 0.0
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.last = value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+
+class _ComponentStats:
+    __slots__ = ("events", "errors", "cancelled", "last_timestamp", "fields")
+
+    def __init__(self, metrics_type: str) -> None:
+        self.events = 0
+        self.errors = 0
+        self.cancelled = 0
+        self.last_timestamp = 0.0
+        self.fields = {name: _FieldStats() for name, _ in REPORTED_FIELDS.get(metrics_type, ())}
+
+
+class ConsoleReporter:
+    """
+    Call `observe` from `metrics_collected` handlers (directly; no task needed),
+    `start` once the job is running and `stop` on shutdown.
+
+    Replaces a table printed per event with one summary redrawn
+    `refresh_per_second` times a second. Pass `jsonl_path` to also keep
+    every raw event.
+    """
+
+    def __init__(
+        self,
+        *,
+        refresh_per_second: float = 2.0,
+        jsonl_path: Optional[str] = None,
+        console: Optional[Console] = None,
+    ) -> None:
+        self._refresh_per_second = refresh_per_second
+        self._console = console or Console()
+        self._lock = threading.Lock()
+        # (metrics type, label) -> stats
+        self._components: dict[tuple[str, str], _ComponentStats] = {}
+        # Set by start(), so rates cover only the time the job has been running
+        self._started_at: Optional[float] = None
+        self._live: Optional[Live] = None
+
+        self._jsonl_path = jsonl_path
+        self._jsonl_queue: Optional[queue.SimpleQueue] = None
+        self._jsonl_thread: Optional[threading.Thread] = None
+
+    def observe(self, metrics) -> None:
+        metrics_type = getattr(metrics, "type", None)
+        if metrics_type not in REPORTED_FIELDS:
+            return
+        key = (metrics_type, getattr(metrics, "label", None) or "")
+
+        with self._lock:
+            stats = self._components.get(key)
+            if stats is None:
+                stats = self._components[key] = _ComponentStats(metrics_type)
+            stats.events += 1
+            stats.last_timestamp = getattr(metrics, "timestamp", 0.0) or 0.0
+            if getattr(metrics, "error", None):
+                stats.errors += 1
+            if getattr(metrics, "cancelled", False):
+                stats.cancelled += 1
+            for name, field in stats.fields.items():
+                value = getattr(metrics, name, None)
+                # ttft is -1 when no token was produced
+                if isinstance(value, (int, float)) and value >= 0:
+                    field.add(value)
+
+        if self._jsonl_queue is not None:
+            self._jsonl_queue.put(metrics)
+
+    def start(self) -> None:
+        if self._started_at is None:
+            self._started_at = time.time()
+        if self._jsonl_path and self._jsonl_thread is None:
+            self._jsonl_queue = queue.SimpleQueue()
+            self._jsonl_thread = threading.Thread(target=self._write_jsonl, name="metrics-jsonl", daemon=True)
+            self._jsonl_thread.start()
+        if self._live is None:
+            # Live redraws from its own thread, off the event loop
+            self._live = Live(
+                get_renderable=self.render,
+                console=self._console,
+                refresh_per_second=self._refresh_per_second,
+                transient=False,
+            )
+            self._live.start()
+
+    async def stop(self) -> None:
+        """Draw the final summary and flush the JSONL sink."""
+        if self._live is not None:
+            self._live.stop()
+            self._live = None
+        if self._jsonl_thread is not None:
+            self._jsonl_queue.put(None)
+            # Joining blocks until the file is flushed, so wait from a worker thread
+            await asyncio.to_thread(self._jsonl_thread.join)
+            self._jsonl_thread = None
+            self._jsonl_queue = None
+
+    def render(self) -> Group:
+        with self._lock:
+            components = [
+                (metrics_type, label, stats.events, stats.errors, stats.cancelled,
+                 [(name, f.count, f.last, f.total / f.count if f.count else 0.0, f.min, f.max)
+                  for name, f in stats.fields.items()])
+                for (metrics_type, label), stats in self._components.items()
+            ]
+
+        elapsed = max(time.time() - (self._started_at or time.time()), 1e-9)
+        tables = []
+        for metrics_type, label, events, errors, cancelled, fields in sorted(components):
+            title = f"[bold blue]{TITLES[metrics_type]} Metrics[/bold blue] [dim]{label}[/dim]"
+            caption = f"{events} events ({events / elapsed:.1f}/s), {errors} errors, {cancelled} cancelled"
+            table = Table(title=title, caption=caption, box=box.ROUNDED, header_style="bold cyan")
+            table.add_column("Metric", style="bold green")
+            for column in ("Last", "Mean", "Min", "Max"):
+                table.add_column(column, style="yellow", justify="right")
+            units = dict(REPORTED_FIELDS[metrics_type])
+            for name, count, last, mean, low, high in fields:
+                unit = units[name]
+                if not count:
+                    table.add_row(name, "-", "-", "-", "-")
+                    continue
+                fmt = (lambda v: f"{v:.4f}{unit}") if unit else (lambda v: f"{v:,.1f}")
+                table.add_row(name, fmt(last), fmt(mean), fmt(low), fmt(high))
+            tables.append(table)
+
+        if not tables:
+            return Group("[dim]Waiting for metrics...[/dim]")
+        return Group(*tables)
+
+    def _write_jsonl(self) -> None:
+        with open(self._jsonl_path, "a", encoding="utf-8") as f:
+            while True:
+                metrics = self._jsonl_queue.get()
+                if metrics is None:
+                    break
+                try:
+                    record = metrics.model_dump(mode="json") if hasattr(metrics, "model_dump") else dict(vars(metrics))
+                    f.write(json.dumps(record, default=str) + "\n")
+                except Exception:
+                    logger.exception("failed to write metrics record")
+                # Batch writes; only flush once the queue is drained
+                if self._jsonl_queue.empty():
+                    f.flush()
@@ -0,0 +1,51 @@
+import logging
+from pathlib import Path
+from dotenv import load_dotenv
+from livekit.agents import JobContext, JobProcess, WorkerOptions, cli
+from livekit.agents.voice import Agent, AgentSession
+from livekit.agents.voice.room_io import RoomInputOptions
+from livekit.plugins import deepgram, openai, silero
+
+from collector import instrument
+
+logger = logging.getLogger("metrics-collector")
+logger.setLevel(logging.INFO)
+
+load_dotenv(dotenv_path=Path(__file__).parent.parent / '.env')
+
+class InstrumentedAgent(Agent):
+    def __init__(self) -> None:
+        super().__init__(
+            instructions="""
+                You are a helpful agent.
+            """,
+            stt=deepgram.STT(),
+            llm=openai.LLM(model="gpt-4o"),
+            tts=openai.TTS()
+        )
+
+
+def prewarm(proc: JobProcess):
+    proc.userdata["vad"] = silero.VAD.load()
+
+
+async def entrypoint(ctx: JobContext):
+    await ctx.connect()
+
+    session = AgentSession(vad=ctx.proc.userdata["vad"])
+
+    # The one line: pick sinks with METRICS_SINKS, e.g. "console,file,prometheus"
+    instrument(ctx, session)
+
+    await session.start(
+        agent=InstrumentedAgent(),
+        room=ctx.room,
+        room_input_options=RoomInputOptions(),
+    )
+
+
+if __name__ == "__main__":
+    cli.run_app(WorkerOptions(
+        entrypoint_fnc=entrypoint,
+        prewarm_fnc=prewarm)
+    )
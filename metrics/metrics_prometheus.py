@@ -0,0 +1,59 @@
+import logging
+import os
+from pathlib import Path
+from dotenv import load_dotenv
+from livekit.agents import JobContext, JobProcess, WorkerOptions, cli
+from livekit.agents.voice import Agent, AgentSession
+from livekit.agents.voice.room_io import RoomInputOptions
+from livekit.plugins import deepgram, openai, silero
+
+from prometheus_registry import AgentMetricsCollector, start_metrics_server
+
+logger = logging.getLogger("metrics-prometheus")
+logger.setLevel(logging.INFO)
+
+load_dotenv(dotenv_path=Path(__file__).parent.parent / '.env')
+
+PROMETHEUS_PORT = int(os.getenv("PROMETHEUS_PORT", "9100"))
+
+# One registry per job process; it aggregates every metrics event in memory
+# and is only rendered when Prometheus scrapes it
+collector = AgentMetricsCollector()
+
+class PrometheusMetricsAgent(Agent):
+    def __init__(self) -> None:
+        super().__init__(
+            instructions="""
+                You are a helpful agent.
+            """,
+            stt=deepgram.STT(),
+            llm=openai.LLM(model="gpt-4o"),
+            tts=openai.TTS()
+        )
+
+
+def prewarm(proc: JobProcess):
+    proc.userdata["vad"] = silero.VAD.load()
+
+
+async def entrypoint(ctx: JobContext):
+    await ctx.connect()
+
+    runner = await start_metrics_server(collector.registry, port=PROMETHEUS_PORT)
+    ctx.add_shutdown_callback(runner.cleanup)
+
+    session = AgentSession(vad=ctx.proc.userdata["vad"])
+    collector.attach(session)
+
+    await session.start(
+        agent=PrometheusMetricsAgent(),
+        room=ctx.room,
+        room_input_options=RoomInputOptions(),
+    )
+
+
+if __name__ == "__main__":
+    cli.run_app(WorkerOptions(
+        entrypoint_fnc=entrypoint,
+        prewarm_fnc=prewarm)
+    )
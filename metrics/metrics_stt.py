@@ -1,22 +1,18 @@
 import logging
-import asyncio
+import os
 from pathlib import Path
 from dotenv import load_dotenv
-from livekit.agents import JobContext, WorkerOptions, cli
-from livekit.agents.metrics import STTMetrics, EOUMetrics
+from livekit.agents import JobContext, JobProcess, WorkerOptions, cli
 from livekit.agents.voice import Agent, AgentSession
 from livekit.agents.voice.room_io import RoomInputOptions
 from livekit.plugins import deepgram, openai, silero
-from rich.console import Console
-from rich.table import Table
-from rich import box
-from datetime import datetime
+
+from collector import ConsoleSink, instrument
+from console_reporter import ConsoleReporter
 
 logger = logging.getLogger("metrics-stt")
 logger.setLevel(logging.INFO)
 
-console = Console()
-
 load_dotenv(dotenv_path=Path(__file__).parent.parent / '.env')
 
 class STTMetricsAgent(Agent):
@@ -27,78 +23,19 @@ class STTMetricsAgent(Agent):
             """,
             stt=deepgram.STT(),
             llm=openai.LLM(model="gpt-4o"),
-            tts=openai.TTS(),
-            vad=silero.VAD.load()
+            tts=openai.TTS()
         )
-        
-        def stt_wrapper(metrics: STTMetrics):
-            asyncio.create_task(self.on_stt_metrics_collected(metrics))
-            
-        def eou_wrapper(metrics: EOUMetrics):
-            asyncio.create_task(self.on_eou_metrics_collected(metrics))
-            
-        self.stt.on("metrics_collected", stt_wrapper)
-        self.stt.on("eou_metrics_collected", eou_wrapper)
 
-    async def on_stt_metrics_collected(self, metrics: STTMetrics) -> None:
-        table = Table(
-            title="[bold blue]STT Metrics Report[/bold blue]",
-            box=box.ROUNDED,
-            highlight=True,
-            show_header=True,
-            header_style="bold cyan"
-        )
-        
-        table.add_column("Metric", style="bold green")
-        table.add_column("Value", style="yellow")
-        
-        timestamp = datetime.fromtimestamp(metrics.timestamp).strftime('%Y-%m-%d %H:%M:%S')
-        
-        table.add_row("Type", str(metrics.type))
-        table.add_row("Label", str(metrics.label))
-        table.add_row("Request ID", str(metrics.request_id))
-        table.add_row("Timestamp", timestamp)
-        table.add_row("Duration", f"[white]{metrics.duration:.4f}[/white]s")
-        table.add_row("Speech ID", str(metrics.speech_id))
-        table.add_row("Error", str(metrics.error))
-        table.add_row("Streamed", "✓" if metrics.streamed else "✗")
-        table.add_row("Audio Duration", f"[white]{metrics.audio_duration:.4f}[/white]s")
-        
-        console.print("\n")
-        console.print(table)
-        console.print("\n")
 
-    async def on_eou_metrics_collected(self, metrics: EOUMetrics) -> None:
-        table = Table(
-            title="[bold blue]End of Utterance Metrics Report[/bold blue]",
-            box=box.ROUNDED,
-            highlight=True,
-            show_header=True,
-            header_style="bold cyan"
-        )
-        
-        table.add_column("Metric", style="bold green")
-        table.add_column("Value", style="yellow")
-        
-        timestamp = datetime.fromtimestamp(metrics.timestamp).strftime('%Y-%m-%d %H:%M:%S')
-        
-        table.add_row("Type", str(metrics.type))
-        table.add_row("Label", str(metrics.label))
-        table.add_row("Timestamp", timestamp)
-        table.add_row("End of Utterance Delay", f"[white]{metrics.end_of_utterance_delay:.4f}[/white]s")
-        table.add_row("Transcription Delay", f"[white]{metrics.transcription_delay:.4f}[/white]s")
-        table.add_row("Speech ID", str(metrics.speech_id))
-        table.add_row("Error", str(metrics.error))
-        
-        console.print("\n")
-        console.print(table)
-        console.print("\n")
+def prewarm(proc: JobProcess):
+    proc.userdata["vad"] = silero.VAD.load()
 
 
 async def entrypoint(ctx: JobContext):
     await ctx.connect()
 
-    session = AgentSession()
+    session = AgentSession(vad=ctx.proc.userdata["vad"])
+    instrument(ctx, session, [ConsoleSink(ConsoleReporter(jsonl_path=os.getenv("METRICS_JSONL_PATH")), kinds={"stt", "eou"})])
 
     await session.start(
         agent=STTMetricsAgent(),
@@ -109,5 +46,6 @@ async def entrypoint(ctx: JobContext):
 
 if __name__ == "__main__":
     cli.run_app(WorkerOptions(
-        entrypoint_fnc=entrypoint)
+        entrypoint_fnc=entrypoint,
+        prewarm_fnc=prewarm)
     )
\ No newline at end of file
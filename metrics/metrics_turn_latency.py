@@ -0,0 +1,69 @@
+import logging
+from pathlib import Path
+from dotenv import load_dotenv
+from livekit.agents import JobContext, JobProcess, WorkerOptions, cli
+from livekit.agents.voice import Agent, AgentSession
+from livekit.agents.voice.room_io import RoomInputOptions
+from livekit.plugins import deepgram, openai, silero
+from rich.console import Console
+
+from turn_latency import TurnLatency, TurnLatencyCorrelator
+
+logger = logging.getLogger("metrics-turn-latency")
+logger.setLevel(logging.INFO)
+
+console = Console()
+
+load_dotenv(dotenv_path=Path(__file__).parent.parent / '.env')
+
+class TurnLatencyAgent(Agent):
+    def __init__(self) -> None:
+        super().__init__(
+            instructions="""
+                You are a helpful agent.
+            """,
+            stt=deepgram.STT(),
+            llm=openai.LLM(model="gpt-4o"),
+            tts=openai.TTS()
+        )
+
+
+def print_turn(turn: TurnLatency) -> None:
+    console.print(
+        f"[bold blue]Turn {turn.speech_id}[/bold blue] "
+        f"total [bold yellow]{turn.total_latency:.3f}s[/bold yellow] = "
+        f"eou {turn.end_of_utterance_delay:.3f}s + "
+        f"llm ttft {turn.llm_ttft:.3f}s + "
+        f"tts ttfb {turn.tts_ttfb:.3f}s"
+    )
+
+
+def prewarm(proc: JobProcess):
+    proc.userdata["vad"] = silero.VAD.load()
+
+
+async def entrypoint(ctx: JobContext):
+    await ctx.connect()
+
+    session = AgentSession(vad=ctx.proc.userdata["vad"])
+
+    correlator = TurnLatencyCorrelator(on_turn=print_turn)
+    correlator.attach(session)
+
+    async def log_percentiles():
+        logger.info(f"Turn latency over {correlator.completed} turns: {correlator.percentiles()}")
+
+    ctx.add_shutdown_callback(log_percentiles)
+
+    await session.start(
+        agent=TurnLatencyAgent(),
+        room=ctx.room,
+        room_input_options=RoomInputOptions(),
+    )
+
+
+if __name__ == "__main__":
+    cli.run_app(WorkerOptions(
+        entrypoint_fnc=entrypoint,
+        prewarm_fnc=prewarm)
+    )
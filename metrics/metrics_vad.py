@@ -1,22 +1,18 @@
 import logging
-import asyncio
+import os
 from pathlib import Path
 from dotenv import load_dotenv
-from livekit.agents import JobContext, WorkerOptions, cli, vad
-from livekit.agents.metrics import VADMetrics
+from livekit.agents import JobContext, JobProcess, WorkerOptions, cli
 from livekit.agents.voice import Agent, AgentSession
 from livekit.agents.voice.room_io import RoomInputOptions
 from livekit.plugins import deepgram, openai, silero
-from rich.console import Console
-from rich.table import Table
-from rich import box
-from datetime import datetime
+
+from collector import ConsoleSink, instrument
+from console_reporter import ConsoleReporter
 
 logger = logging.getLogger("metrics-vad")
 logger.setLevel(logging.INFO)
 
-console = Console()
-
 load_dotenv(dotenv_path=Path(__file__).parent.parent / '.env')
 
 class VADMetricsAgent(Agent):
@@ -27,46 +23,19 @@ class VADMetricsAgent(Agent):
             """,
             stt=deepgram.STT(),
             llm=openai.LLM(model="gpt-4o"),
-            tts=openai.TTS(),
-            vad=silero.VAD.load()
+            tts=openai.TTS()
         )
 
-        def sync_wrapper(event: vad.VADEvent):
-            asyncio.create_task(self.on_vad_event(event))
-            
-        self.vad.on("metrics_collected", sync_wrapper)
 
-    async def on_vad_event(self, event: vad.VADEvent):
-        table = Table(
-            title="[bold blue]VAD Event Metrics Report[/bold blue]",
-            box=box.ROUNDED,
-            highlight=True,
-            show_header=True,
-            header_style="bold cyan"
-        )
-        
-        table.add_column("Metric", style="bold green")
-        table.add_column("Value", style="yellow")
-        
-        timestamp = datetime.fromtimestamp(event.timestamp).strftime('%Y-%m-%d %H:%M:%S')
-        
-        table.add_row("Type", str(event.type))
-        table.add_row("Timestamp", timestamp)
-        table.add_row("Idle Time", f"[white]{event.idle_time:.4f}[/white]s")
-        table.add_row("Inference Duration Total", f"[white]{event.inference_duration_total:.4f}[/white]s")
-        table.add_row("Inference Count", str(event.inference_count))
-        table.add_row("Speech ID", str(event.speech_id))
-        table.add_row("Error", str(event.error))
-        
-        console.print("\n")
-        console.print(table)
-        console.print("\n")
+def prewarm(proc: JobProcess):
+    proc.userdata["vad"] = silero.VAD.load()
 
 
 async def entrypoint(ctx: JobContext):
     await ctx.connect()
 
-    session = AgentSession()
+    session = AgentSession(vad=ctx.proc.userdata["vad"])
+    instrument(ctx, session, [ConsoleSink(ConsoleReporter(jsonl_path=os.getenv("METRICS_JSONL_PATH")), kinds={"vad"})])
 
     await session.start(
         agent=VADMetricsAgent(),
@@ -77,5 +46,6 @@ async def entrypoint(ctx: JobContext):
 
 if __name__ == "__main__":
     cli.run_app(WorkerOptions(
-        entrypoint_fnc=entrypoint)
+        entrypoint_fnc=entrypoint,
+        prewarm_fnc=prewarm)
     )
\ No newline at end of file
@@ -0,0 +1,248 @@
+"""
+In-process Prometheus/OpenMetrics registry for agent metrics.
+
+`metrics_collected` handlers call `AgentMetricsCollector.observe`, which only
+bumps counters and histogram buckets in plain Python lists. All updates and
+scrapes happen on the job's event loop thread, so the hot path needs no locks
+and does no I/O; the text exposition is rendered only when Prometheus scrapes
+the `/metrics` endpoint served by `start_metrics_server`.
+"""
+
+import logging
+from bisect import bisect_left
+from typing import Iterable, Optional
+
+from aiohttp import web
+from livekit.agents.metrics import EOUMetrics, LLMMetrics, STTMetrics, TTSMetrics, VADMetrics
+
+logger = logging.getLogger("prometheus-registry")
+
+# Latency buckets in seconds, tuned for voice pipelines
+LATENCY_BUCKETS = (0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 10.0)
+# VAD inference runs in milliseconds
+INFERENCE_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._series: dict[tuple, object] = {}
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for labels, value in self._series.items():
+            lines.extend(self._render_series(labels, value))
+        return lines
+
+    def _render_series(self, labels: tuple, value) -> list[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, labels: tuple = (), amount: float = 1) -> None:
+        self._series[labels] = self._series.get(labels, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, labels: tuple, value: float) -> None:
+        self._series[labels] = value
+
+    def inc(self, labels: tuple = (), amount: float = 1) -> None:
+        self._series[labels] = self._series.get(labels, 0) + amount
+
+    def dec(self, labels: tuple = (), amount: float = 1) -> None:
+        self.inc(labels, -amount)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets=LATENCY_BUCKETS) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, labels: tuple, value: float) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            # One slot per bucket plus +Inf, then sum and count
+            series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def _render_series(self, labels: tuple, series) -> list[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), series):
+            cumulative += count
+            le = f'le="{_format_value(bound)}"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+        label_str = _format_labels(self.labelnames, labels)
+        lines.append(f"{self.name}_sum{label_str} {_format_value(series[-2])}")
+        lines.append(f"{self.name}_count{label_str} {series[-1]}")
+        return lines
+
+
+class MetricsRegistry:
+    """A named collection of metrics that renders the Prometheus text format."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets=LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+def model_labels(metrics) -> tuple[str, str]:
+    """(model, provider) for a metrics event, from its metadata or plugin label"""
+    metadata = getattr(metrics, "metadata", None)
+    model = getattr(metadata, "model_name", None) or "unknown"
+    provider = getattr(metadata, "model_provider", None)
+    if not provider:
+        # e.g. "livekit.plugins.openai.llm.LLM" -> "openai"
+        label = getattr(metrics, "label", "") or ""
+        parts = label.split(".")
+        provider = parts[2] if len(parts) > 2 and parts[1] == "plugins" else (label or "unknown")
+    return model, provider
+
+
+class AgentMetricsCollector:
+    """
+    Maps LiveKit metrics events onto Prometheus series labelled by model and
+    provider. Call `observe` from `metrics_collected` handlers, or `attach` it
+    to an AgentSession.
+    """
+
+    def __init__(self, registry: Optional[MetricsRegistry] = None) -> None:
+        self.registry = registry or MetricsRegistry()
+        r = self.registry
+        labels = ("model", "provider")
+        self.llm_ttft = r.histogram("livekit_llm_ttft_seconds", "LLM time to first token", labels)
+        self.llm_duration = r.histogram("livekit_llm_duration_seconds", "LLM request duration", labels)
+        self.llm_requests = r.counter("livekit_llm_requests_total", "LLM requests", labels + ("cancelled",))
+        self.llm_tokens = r.counter("livekit_llm_tokens_total", "LLM tokens", labels + ("kind",))
+        self.stt_audio = r.counter("livekit_stt_audio_seconds_total", "Audio seconds sent to STT", labels)
+        self.stt_duration = r.histogram("livekit_stt_duration_seconds", "Non-streaming STT request duration", labels)
+        self.stt_errors = r.counter("livekit_stt_errors_total", "STT requests that reported an error", labels)
+        self.eou_delay = r.histogram("livekit_eou_delay_seconds", "End of speech to end of turn decision", ())
+        self.transcription_delay = r.histogram("livekit_transcription_delay_seconds", "End of speech to final transcript", ())
+        self.tts_ttfb = r.histogram("livekit_tts_ttfb_seconds", "TTS time to first audio byte", labels)
+        self.tts_characters = r.counter("livekit_tts_characters_total", "Characters synthesized", labels)
+        self.tts_audio = r.counter("livekit_tts_audio_seconds_total", "Audio seconds synthesized", labels)
+        self.vad_inference = r.histogram(
+            "livekit_vad_inference_seconds", "Mean VAD inference time per report", labels, buckets=INFERENCE_BUCKETS
+        )
+        self.vad_inferences = r.counter("livekit_vad_inferences_total", "VAD inferences run", labels)
+        self.last_event = r.gauge("livekit_metrics_last_event_timestamp_seconds", "Timestamp of the last metrics event", ("type",))
+
+    def attach(self, session) -> None:
+        session.on("metrics_collected", lambda ev: self.observe(ev.metrics))
+
+    def observe(self, metrics) -> None:
+        if isinstance(metrics, LLMMetrics):
+            labels = model_labels(metrics)
+            if metrics.ttft >= 0:
+                self.llm_ttft.observe(labels, metrics.ttft)
+            self.llm_duration.observe(labels, metrics.duration)
+            self.llm_requests.inc(labels + (str(metrics.cancelled).lower(),))
+            self.llm_tokens.inc(labels + ("prompt",), metrics.prompt_tokens)
+            self.llm_tokens.inc(labels + ("completion",), metrics.completion_tokens)
+            self.last_event.set(("llm",), metrics.timestamp)
+        elif isinstance(metrics, STTMetrics):
+            labels = model_labels(metrics)
+            self.stt_audio.inc(labels, metrics.audio_duration)
+            if not metrics.streamed:
+                self.stt_duration.observe(labels, metrics.duration)
+            if getattr(metrics, "error", None):
+                self.stt_errors.inc(labels)
+            self.last_event.set(("stt",), metrics.timestamp)
+        elif isinstance(metrics, EOUMetrics):
+            self.eou_delay.observe((), metrics.end_of_utterance_delay)
+            self.transcription_delay.observe((), metrics.transcription_delay)
+            self.last_event.set(("eou",), metrics.timestamp)
+        elif isinstance(metrics, TTSMetrics):
+            labels = model_labels(metrics)
+            self.tts_ttfb.observe(labels, metrics.ttfb)
+            self.tts_characters.inc(labels, metrics.characters_count)
+            self.tts_audio.inc(labels, metrics.audio_duration)
+            self.last_event.set(("tts",), metrics.timestamp)
+        elif isinstance(metrics, VADMetrics) or getattr(metrics, "inference_count", None) is not None:
+            # Older VAD plugins emit VADEvent objects carrying the same fields
+            labels = model_labels(metrics)
+            if metrics.inference_count:
+                self.vad_inference.observe(labels, metrics.inference_duration_total / metrics.inference_count)
+                self.vad_inferences.inc(labels, metrics.inference_count)
+            self.last_event.set(("vad",), metrics.timestamp)
+
+
+async def start_metrics_server(registry: MetricsRegistry, host: str = "0.0.0.0", port: int = 9100, port_attempts: int = 32) -> web.AppRunner:
+    """
+    Serve `registry` at http://host:port/metrics on the current event loop.
+    Each job runs in its own process, so if `port` is taken the next free port
+    (up to `port_attempts` later) is used; point Prometheus at the whole range.
+    """
+    async def handle_metrics(request: web.Request) -> web.Response:
+        return web.Response(
+            body=registry.render().encode(),
+            headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"},
+        )
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle_metrics)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+
+    for offset in range(port_attempts):
+        site = web.TCPSite(runner, host, port + offset)
+        try:
+            await site.start()
+        except OSError:
+            continue
+        logger.info(f"Serving Prometheus metrics on http://{host}:{port + offset}/metrics")
+        return runner
+
+    await runner.cleanup()
+    raise OSError(f"No free port for the metrics endpoint in {port}-{port + port_attempts - 1}")
@@ -0,0 +1,161 @@
+"""
+Sampling and cardinality controls for high-volume metrics.
+
+VAD metrics fire several times per second per session and streaming STT
+about once a second, but latency SLOs are defined on EOU/LLM/TTS. Wrapping a
+network or storage sink in `SampledSink` cuts that volume without losing the
+signal:
+
+- each kind has a sampling rate; sampling is decided per `speech_id` so a
+  kept turn keeps all of its events
+- errors and slow outliers are always kept, whatever the rate
+- events that are sampled out are folded into a per-kind summary record
+  (count, mean and max of each numeric field) sent every `summary_interval`
+- the number of distinct labels per kind is capped; extra labels become "other"
+
+Local sinks (console, Prometheus, aggregates, turn latency) should stay
+unwrapped so they still see every event.
+"""
+
+import time
+import zlib
+import random
+from typing import Optional
+
+from collector import MetricsRecord, MetricsSink
+
+DEFAULT_RATES = {"vad": 0.02, "stt": 0.1}
+
+# kind -> (field, seconds): events at or above this are always kept
+DEFAULT_SLOW_THRESHOLDS = {
+    "llm": ("ttft", 1.5),
+    "tts": ("ttfb", 0.8),
+    "eou": ("end_of_utterance_delay", 1.0),
+    "vad": ("inference_duration_total", 0.1),
+}
+
+
+class SamplingPolicy:
+    def __init__(
+        self,
+        rates: Optional[dict[str, float]] = None,
+        *,
+        default_rate: float = 1.0,
+        slow_thresholds: Optional[dict[str, tuple[str, float]]] = None,
+        max_labels: int = 20,
+    ) -> None:
+        self.rates = DEFAULT_RATES if rates is None else rates
+        self.default_rate = default_rate
+        self.slow_thresholds = DEFAULT_SLOW_THRESHOLDS if slow_thresholds is None else slow_thresholds
+        self.max_labels = max_labels
+        self._labels: dict[str, set] = {}
+
+    def rate(self, kind: str) -> float:
+        return self.rates.get(kind, self.default_rate)
+
+    def keep(self, record: MetricsRecord) -> bool:
+        """Whether to forward this record as-is"""
+        rate = self.rate(record.kind)
+        if rate >= 1.0 or record.error:
+            return True
+        threshold = self.slow_thresholds.get(record.kind)
+        if threshold is not None:
+            value = record.values.get(threshold[0])
+            if isinstance(value, (int, float)) and value >= threshold[1]:
+                return True
+        if record.speech_id:
+            # Stable per speech so a sampled turn is kept whole
+            return zlib.crc32(record.speech_id.encode()) / 0xFFFFFFFF < rate
+        return random.random() < rate
+
+    def cap_label(self, record: MetricsRecord) -> Optional[str]:
+        """The label to report, or "other" once a kind has too many distinct labels"""
+        seen = self._labels.setdefault(record.kind, set())
+        if record.label in seen:
+            return record.label
+        if len(seen) < self.max_labels:
+            seen.add(record.label)
+            return record.label
+        return "other"
+
+
+class _KindSummary:
+    __slots__ = ("count", "fields")
+
+    def __init__(self) -> None:
+        self.count = 0
+        # field -> [total, max]
+        self.fields: dict[str, list] = {}
+
+    def add(self, record: MetricsRecord) -> None:
+        self.count += 1
+        for name, value in record.values.items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            stats = self.fields.get(name)
+            if stats is None:
+                self.fields[name] = [value, value]
+            else:
+                stats[0] += value
+                if value > stats[1]:
+                    stats[1] = value
+
+
+class SampledSink(MetricsSink):
+    """Applies a SamplingPolicy in front of another sink."""
+
+    def __init__(self, inner: MetricsSink, policy: Optional[SamplingPolicy] = None, *, summary_interval: float = 10.0) -> None:
+        self.inner = inner
+        self.policy = policy or SamplingPolicy()
+        self._summary_interval = summary_interval
+        self._summaries: dict[tuple[str, Optional[str]], _KindSummary] = {}
+        self._last_summary = time.monotonic()
+        self.kept = 0
+        self.sampled_out = 0
+
+    def start(self) -> None:
+        self.inner.start()
+
+    def handle(self, record: MetricsRecord) -> None:
+        label = self.policy.cap_label(record)
+        if self.policy.keep(record):
+            self.kept += 1
+            values = record.values
+            rate = self.policy.rate(record.kind)
+            if rate < 1.0:
+                # Lets the receiver weight sampled events when counting
+                values = {**values, "sample_rate": rate}
+            if label != record.label or values is not record.values:
+                record = MetricsRecord(record.kind, record.type, label, record.request_id, record.speech_id,
+                                       record.timestamp, record.error, values, record.source,
+                                       record.model, record.provider)
+            self.inner.handle(record)
+        else:
+            self.sampled_out += 1
+            key = (record.kind, label)
+            summary = self._summaries.get(key)
+            if summary is None:
+                summary = self._summaries[key] = _KindSummary()
+            summary.add(record)
+
+        # Flushed lazily from the event path; high-volume kinds arrive constantly
+        if time.monotonic() - self._last_summary >= self._summary_interval:
+            self.flush_summaries()
+
+    def flush_summaries(self) -> None:
+        now = time.monotonic()
+        window = now - self._last_summary
+        self._last_summary = now
+        summaries, self._summaries = self._summaries, {}
+        for (kind, label), summary in summaries.items():
+            values = {"window": window, "sampled_count": summary.count}
+            for name, (total, high) in summary.fields.items():
+                values[f"{name}_mean"] = total / summary.count
+                values[f"{name}_max"] = high
+            self.inner.handle(MetricsRecord(
+                kind, f"{kind}_summary", label, None, None, time.time(), None, values, None,
+            ))
+
+    async def aclose(self) -> None:
+        self.flush_summaries()
+        await self.inner.aclose()
@@ -0,0 +1,290 @@
+"""
+Replay load generator for the metrics ingestion path.
+
+Simulates many concurrent agent sessions, each producing a realistic stream of
+VAD/STT/EOU/LLM/TTS (and per-turn) metrics, and pushes them to a metrics
+server the same way metrics_exporter.py does: gzip-compressed NDJSON batches
+over keep-alive connections. Streams can be synthetic or replayed from a JSONL
+file recorded by the collector's FileSink (or by --record).
+
+USAGE
+=====
+
+    # 50 simulated sessions for 30 seconds against a local server
+    python load_generator.py --sessions 50 --duration 30
+
+    # Push 10x the normal event rate and save what was sent
+    python load_generator.py --sessions 50 --rate 10 --record load.jsonl
+
+    # Replay a recording as fast as the server accepts it
+    python load_generator.py --replay load.jsonl --sessions 20
+
+    # Triple LLM time to first token halfway through, to exercise SLO alerts
+    python load_generator.py --duration 300 --degrade ttft=3 --record degraded.jsonl
+
+The report gives accepted events per second, ingest (request) latency
+percentiles and the server's memory growth, read from /api/server/stats.
+"""
+
+import argparse
+import asyncio
+import gzip
+import json
+import random
+import time
+import uuid
+from typing import Optional
+
+import aiohttp
+
+# Per-session event rates (events per second) at --rate 1
+VAD_RATE = 2.0
+STT_RATE = 1.0
+# A user turn (EOU + LLM + TTS + turn record) every this many seconds
+TURN_INTERVAL = 6.0
+
+LLM_LABEL = "livekit.plugins.openai.llm.LLM"
+STT_LABEL = "livekit.plugins.deepgram.stt.STT"
+TTS_LABEL = "livekit.plugins.openai.tts.TTS"
+VAD_LABEL = "livekit.plugins.silero.vad.VAD"
+
+
+def _lognormal(median: float, spread: float = 0.35) -> float:
+    """Latencies are long-tailed; a lognormal around a median is a fair model"""
+    return random.lognormvariate(0, spread) * median
+
+
+def synthetic_turn(profile: dict) -> list[dict]:
+    """The EOU, LLM, TTS and turn events for one user turn"""
+    now = time.time()
+    speech_id = f"SP_{uuid.uuid4().hex[:12]}"
+    eou_delay = _lognormal(profile["eou"])
+    ttft = _lognormal(profile["ttft"])
+    ttfb = _lognormal(profile["ttfb"])
+    prompt_tokens = random.randint(300, 3000)
+    completion_tokens = random.randint(10, 120)
+    characters = completion_tokens * 4
+    return [
+        {"metric_type": "eou", "type": "eou_metrics", "label": STT_LABEL, "timestamp": now,
+         "end_of_utterance_delay": eou_delay, "transcription_delay": eou_delay * 0.6,
+         "speech_id": speech_id, "error": None},
+        {"metric_type": "llm", "type": "llm_metrics", "label": profile["llm_label"], "request_id": uuid.uuid4().hex,
+         "timestamp": now, "duration": ttft + completion_tokens / 40, "ttft": ttft, "cancelled": False,
+         "completion_tokens": completion_tokens, "prompt_tokens": prompt_tokens,
+         "total_tokens": prompt_tokens + completion_tokens, "tokens_per_second": 40.0,
+         "model": profile["llm_model"], "speech_id": speech_id, "error": None},
+        {"metric_type": "tts", "type": "tts_metrics", "label": profile["tts_label"], "request_id": uuid.uuid4().hex,
+         "timestamp": now, "ttfb": ttfb, "duration": ttfb + 0.5, "audio_duration": characters / 15,
+         "cancelled": False, "characters_count": characters, "streamed": True,
+         "model": profile["tts_model"], "speech_id": speech_id, "error": None},
+        {"metric_type": "turn", "speech_id": speech_id, "timestamp": now,
+         "end_of_utterance_delay": eou_delay, "transcription_delay": eou_delay * 0.6,
+         "llm_ttft": ttft, "tts_ttfb": ttfb, "total_latency": eou_delay + ttft + ttfb,
+         "llm_label": profile["llm_label"], "tts_label": profile["tts_label"]},
+    ]
+
+
+def synthetic_vad() -> dict:
+    return {"metric_type": "vad", "type": "vad_metrics", "label": VAD_LABEL, "timestamp": time.time(),
+            "idle_time": random.uniform(0, 0.05), "inference_duration_total": _lognormal(0.012),
+            "inference_count": 32, "speech_id": None, "error": None}
+
+
+def synthetic_stt() -> dict:
+    return {"metric_type": "stt", "type": "stt_metrics", "label": STT_LABEL, "request_id": uuid.uuid4().hex,
+            "timestamp": time.time(), "duration": 0.0, "streamed": True, "audio_duration": 1.0,
+            "speech_id": None, "error": None}
+
+
+def default_profile() -> dict:
+    """Median latencies (seconds) and labels used for synthetic sessions"""
+    return {"eou": 0.45, "ttft": 0.55, "ttfb": 0.25, "llm_label": LLM_LABEL, "tts_label": TTS_LABEL,
+            "llm_model": "gpt-4o-mini", "tts_model": "tts-1"}
+
+
+def load_replay(path: str) -> list[dict]:
+    """Read events recorded by --record or the collector's FileSink"""
+    events = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            event = json.loads(line)
+            # FileSink records use "kind"; the wire format uses "metric_type"
+            if "metric_type" not in event:
+                event["metric_type"] = event.pop("kind")
+            events.append(event)
+    return events
+
+
+class LoadStats:
+    def __init__(self) -> None:
+        self.sent = 0
+        self.accepted = 0
+        self.failed_requests = 0
+        self.latencies: list[float] = []
+
+    def percentile(self, p: float) -> float:
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+
+class SimulatedSession:
+    """One agent session: generates its event stream and flushes it in batches."""
+
+    def __init__(self, http: aiohttp.ClientSession, url: str, stats: LoadStats, args, profile: dict,
+                 replay: Optional[list[dict]] = None, recorder=None) -> None:
+        self._http = http
+        self._url = f"{url.rstrip('/')}/metrics/batch"
+        self._stats = stats
+        self._args = args
+        self._profile = profile
+        self._replay = replay
+        self._recorder = recorder
+        self._pending: list[dict] = []
+
+    async def run(self, deadline: float) -> None:
+        if self._replay is not None:
+            await self._run_replay(deadline)
+        else:
+            await self._run_synthetic(deadline)
+        await self._flush()
+
+    async def _run_synthetic(self, deadline: float) -> None:
+        rate = self._args.rate
+        tick = 0.1
+        next_turn = time.monotonic() + random.uniform(0, TURN_INTERVAL / rate)
+        next_flush = time.monotonic() + self._args.flush_interval
+        vad_credit = stt_credit = 0.0
+        while time.monotonic() < deadline:
+            await asyncio.sleep(tick)
+            now = time.monotonic()
+            vad_credit += VAD_RATE * rate * tick
+            stt_credit += STT_RATE * rate * tick
+            while vad_credit >= 1:
+                self._pending.append(synthetic_vad())
+                vad_credit -= 1
+            while stt_credit >= 1:
+                self._pending.append(synthetic_stt())
+                stt_credit -= 1
+            if now >= next_turn:
+                self._pending.extend(synthetic_turn(self._profile))
+                next_turn = now + random.expovariate(rate / TURN_INTERVAL)
+            if now >= next_flush or len(self._pending) >= self._args.batch_size:
+                await self._flush()
+                next_flush = now + self._args.flush_interval
+
+    async def _run_replay(self, deadline: float) -> None:
+        # Each session starts at a random offset so sessions don't send identical batches
+        offset = random.randrange(len(self._replay))
+        i = 0
+        while time.monotonic() < deadline:
+            self._pending.append(dict(self._replay[(offset + i) % len(self._replay)]))
+            i += 1
+            if len(self._pending) >= self._args.batch_size:
+                await self._flush()
+
+    async def _flush(self) -> None:
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        if self._recorder is not None:
+            self._recorder.extend(batch)
+        body = gzip.compress("\n".join(json.dumps(e, separators=(",", ":")) for e in batch).encode(), compresslevel=1)
+        headers = {"Content-Type": "application/x-ndjson", "Content-Encoding": "gzip"}
+        self._stats.sent += len(batch)
+        start = time.perf_counter()
+        try:
+            async with self._http.post(self._url, data=body, headers=headers) as resp:
+                await resp.read()
+                if resp.status == 200:
+                    self._stats.accepted += len(batch)
+                else:
+                    self._stats.failed_requests += 1
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            self._stats.failed_requests += 1
+        self._stats.latencies.append(time.perf_counter() - start)
+
+
+async def server_stats(http: aiohttp.ClientSession, url: str) -> Optional[dict]:
+    try:
+        async with http.get(f"{url.rstrip('/')}/api/server/stats") as resp:
+            return await resp.json() if resp.status == 200 else None
+    except aiohttp.ClientError:
+        return None
+
+
+async def degrade_profile(profile: dict, args) -> None:
+    """Multiply profile latencies (e.g. ttft=3) part-way through a synthetic run"""
+    changes = {}
+    for item in args.degrade:
+        field, _, factor = item.partition("=")
+        if field not in ("eou", "ttft", "ttfb"):
+            raise ValueError(f"Cannot degrade {field!r}; expected eou, ttft or ttfb")
+        changes[field] = float(factor)
+    delay = args.duration / 2 if args.degrade_after is None else args.degrade_after
+    await asyncio.sleep(delay)
+    for field, factor in changes.items():
+        profile[field] *= factor
+    print(f"Degraded {', '.join(args.degrade)} after {delay:.0f}s")
+
+
+async def run_load(args, profile: Optional[dict] = None) -> LoadStats:
+    profile = profile or default_profile()
+    replay = load_replay(args.replay) if args.replay else None
+    recorder: Optional[list[dict]] = [] if args.record else None
+    stats = LoadStats()
+
+    connector = aiohttp.TCPConnector(limit=args.connections)
+    async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=30)) as http:
+        before = await server_stats(http, args.url)
+        start = time.monotonic()
+        deadline = start + args.duration
+        sessions = [SimulatedSession(http, args.url, stats, args, profile, replay, recorder) for _ in range(args.sessions)]
+        degrade = asyncio.ensure_future(degrade_profile(profile, args)) if args.degrade else None
+        await asyncio.gather(*(s.run(deadline) for s in sessions))
+        if degrade is not None:
+            degrade.cancel()
+        elapsed = time.monotonic() - start
+        after = await server_stats(http, args.url)
+
+    if recorder is not None:
+        with open(args.record, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(e) + "\n" for e in recorder)
+
+    print(f"{args.sessions} sessions for {elapsed:.1f}s against {args.url}")
+    print(f"  sent:      {stats.sent:,} events")
+    print(f"  accepted:  {stats.accepted:,} events ({stats.accepted / elapsed:,.0f}/s)")
+    print(f"  failed:    {stats.failed_requests} requests")
+    print(f"  ingest latency: p50 {stats.percentile(50) * 1000:.1f}ms  "
+          f"p95 {stats.percentile(95) * 1000:.1f}ms  p99 {stats.percentile(99) * 1000:.1f}ms  "
+          f"({len(stats.latencies)} requests)")
+    if before and after:
+        growth = (after["rss_bytes"] - before["rss_bytes"]) / 1024 / 1024
+        print(f"  server memory: {before['rss_bytes'] / 1024 / 1024:.1f}MB -> "
+              f"{after['rss_bytes'] / 1024 / 1024:.1f}MB ({growth:+.1f}MB), "
+              f"store pending {after['store_pending']}, dropped {after['store_dropped']}")
+    return stats
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:5001", help="Metrics server URL")
+    parser.add_argument("--sessions", type=int, default=50, help="Concurrent simulated agent sessions")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to run")
+    parser.add_argument("--rate", type=float, default=1.0, help="Multiplier on realistic per-session event rates")
+    parser.add_argument("--batch-size", type=int, default=200, help="Max events per request")
+    parser.add_argument("--flush-interval", type=float, default=1.0, help="Seconds between flushes per session")
+    parser.add_argument("--connections", type=int, default=16, help="Max concurrent HTTP connections")
+    parser.add_argument("--replay", help="Replay events from a JSONL recording instead of generating them")
+    parser.add_argument("--record", help="Save every event sent to this JSONL file")
+    parser.add_argument("--degrade", action="append", metavar="FIELD=FACTOR",
+                        help="Slow down eou, ttft or ttfb by FACTOR part-way through (repeatable)")
+    parser.add_argument("--degrade-after", type=float, help="Seconds before --degrade applies (default: half the run)")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    asyncio.run(run_load(parse_args()))
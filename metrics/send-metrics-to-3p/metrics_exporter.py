@@ -0,0 +1,170 @@
+import asyncio
+import gzip
+import json
+import logging
+import random
+import time
+from collections import deque
+from typing import Optional
+
+import aiohttp
+
+logger = logging.getLogger("metrics-exporter")
+
+
+class MetricsExporter:
+    """
+    Batches metrics events in memory and ships them to the metrics server
+    over a single keep-alive HTTP session.
+
+    `submit` is synchronous and O(1), so it can be called straight from a
+    `metrics_collected` handler without creating a task per event. A
+    background task flushes the queue when it reaches `max_batch_size` or
+    every `flush_interval` seconds, whichever comes first. When the queue is
+    full the oldest events are dropped so the newest data always gets through.
+    Batches are sent as gzip-compressed NDJSON unless `compression=None`.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        *,
+        max_queue_size: int = 10_000,
+        max_batch_size: int = 200,
+        flush_interval: float = 1.0,
+        max_retries: int = 3,
+        retry_backoff: float = 0.25,
+        timeout: float = 5.0,
+        compression: Optional[str] = "gzip",
+    ) -> None:
+        self._endpoint = f"{base_url.rstrip('/')}/metrics/batch"
+        self._queue: deque[dict] = deque(maxlen=max_queue_size)
+        self._max_batch_size = max_batch_size
+        self._flush_interval = flush_interval
+        self._max_retries = max_retries
+        self._retry_backoff = retry_backoff
+        self._timeout = aiohttp.ClientTimeout(total=timeout)
+        if compression not in (None, "gzip"):
+            raise ValueError(f"Unsupported compression: {compression}")
+        self._compression = compression
+
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+        self._closing = False
+
+        # Exporter self-metrics
+        self._submitted = 0
+        self._dropped = 0
+        self._sent = 0
+        self._failed = 0
+        self._failed_batches = 0
+        self._flushes = 0
+        self._last_flush_latency = 0.0
+        self._max_flush_latency = 0.0
+        self._total_flush_latency = 0.0
+
+    def start(self) -> None:
+        """Open the HTTP session and start the background flush task."""
+        if self._task is not None:
+            return
+        connector = aiohttp.TCPConnector(limit=4, keepalive_timeout=30)
+        self._session = aiohttp.ClientSession(connector=connector, timeout=self._timeout)
+        self._task = asyncio.create_task(self._run())
+
+    def submit(self, metric_type: str, data: dict) -> None:
+        """Queue one metrics event. Never blocks and never raises."""
+        if len(self._queue) == self._queue.maxlen:
+            # deque(maxlen=...) evicts the oldest entry on append
+            self._dropped += 1
+        self._queue.append({"metric_type": metric_type, **data})
+        self._submitted += 1
+        if len(self._queue) >= self._max_batch_size:
+            self._wakeup.set()
+
+    async def aclose(self) -> None:
+        """Flush whatever is still queued and close the HTTP session."""
+        if self._task is None:
+            return
+        self._closing = True
+        self._wakeup.set()
+        await self._task
+        self._task = None
+        await self._session.close()
+        self._session = None
+        logger.info(f"Metrics exporter closed: {self.stats()}")
+
+    def stats(self) -> dict:
+        """Return the exporter's own health metrics."""
+        return {
+            "queue_depth": len(self._queue),
+            "submitted": self._submitted,
+            "dropped": self._dropped,
+            "sent": self._sent,
+            "failed": self._failed,
+            "failed_batches": self._failed_batches,
+            "flushes": self._flushes,
+            "last_flush_latency": self._last_flush_latency,
+            "max_flush_latency": self._max_flush_latency,
+            "avg_flush_latency": self._total_flush_latency / self._flushes if self._flushes else 0.0,
+        }
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self._flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            while self._queue:
+                batch = [self._queue.popleft() for _ in range(min(self._max_batch_size, len(self._queue)))]
+                try:
+                    await self._send(batch)
+                except Exception:
+                    # A bad event (e.g. one json can't encode) loses its batch, not the exporter
+                    logger.exception(f"Failed to send a batch of {len(batch)} metrics events")
+                    self._failed += len(batch)
+                    self._failed_batches += 1
+
+            if self._closing:
+                return
+
+    async def _send(self, batch: list[dict]) -> None:
+        body = "\n".join(json.dumps(event, separators=(",", ":")) for event in batch).encode()
+        headers = {"Content-Type": "application/x-ndjson"}
+        if self._compression == "gzip":
+            # Level 1 keeps compression cheap on the event loop; NDJSON still shrinks ~5-10x
+            body = gzip.compress(body, compresslevel=1)
+            headers["Content-Encoding"] = "gzip"
+
+        start = time.perf_counter()
+        for attempt in range(self._max_retries + 1):
+            try:
+                async with self._session.post(self._endpoint, data=body, headers=headers) as resp:
+                    if resp.status < 500:
+                        if resp.status >= 400:
+                            # The server rejected the batch; retrying won't help
+                            logger.warning(f"Metrics batch rejected ({resp.status}): {await resp.text()}")
+                            self._failed += len(batch)
+                            self._failed_batches += 1
+                        else:
+                            self._sent += len(batch)
+                        break
+                    logger.debug(f"Metrics server returned {resp.status}, attempt {attempt + 1}")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.debug(f"Error sending metrics batch, attempt {attempt + 1}: {e}")
+
+            if attempt == self._max_retries or self._closing:
+                logger.warning(f"Dropping {len(batch)} metrics events after {attempt + 1} attempts")
+                self._failed += len(batch)
+                self._failed_batches += 1
+                break
+            # Exponential backoff with full jitter
+            await asyncio.sleep(random.uniform(0, self._retry_backoff * (2 ** attempt)))
+
+        latency = time.perf_counter() - start
+        self._flushes += 1
+        self._last_flush_latency = latency
+        self._max_flush_latency = max(self._max_flush_latency, latency)
+        self._total_flush_latency += latency
@@ -0,0 +1,209 @@
+"""
+Constant-memory streaming aggregates for the metrics server.
+
+Latency fields are recorded into log-bucketed histograms (the same idea as an
+HDR histogram: bucket width grows with the value, so relative error is bounded
+at every scale). Each field keeps one rolling histogram per window, built from
+a ring of time slices that are reset as they expire, so percentiles over the
+last minute, five minutes or hour cost the same memory no matter how many
+events arrive.
+"""
+
+import math
+import threading
+import time
+from array import array
+from collections import defaultdict
+
+# Histogram range and resolution. With a growth factor of 1.05 any recorded
+# value is reported within ~2.5% of its true value.
+MIN_VALUE = 0.0001   # 100 microseconds
+MAX_VALUE = 300.0    # 5 minutes
+GROWTH = 1.05
+_LOG_GROWTH = math.log(GROWTH)
+NUM_BUCKETS = int(math.ceil(math.log(MAX_VALUE / MIN_VALUE) / _LOG_GROWTH)) + 2
+
+# window name -> (window length in seconds, number of slices)
+WINDOWS = {
+    "1m": (60, 12),
+    "5m": (300, 10),
+    "1h": (3600, 12),
+}
+
+# Numeric fields worth summarising for each metric type
+SUMMARY_FIELDS = {
+    "llm": ["ttft", "duration", "tokens_per_second"],
+    "stt": ["duration", "audio_duration"],
+    "tts": ["ttfb", "duration", "audio_duration"],
+    "eou": ["end_of_utterance_delay", "transcription_delay"],
+    "vad": ["inference_duration_total", "idle_time"],
+    "turn": ["total_latency", "end_of_utterance_delay", "llm_ttft", "tts_ttfb"],
+}
+
+PERCENTILES = (50, 95, 99)
+
+
+def _bucket_index(value):
+    if value <= MIN_VALUE:
+        return 0
+    if value >= MAX_VALUE:
+        return NUM_BUCKETS - 1
+    return int(math.log(value / MIN_VALUE) / _LOG_GROWTH) + 1
+
+
+def _bucket_value(index):
+    """Representative value for a bucket (its geometric midpoint)"""
+    if index == 0:
+        return MIN_VALUE
+    if index == NUM_BUCKETS - 1:
+        return MAX_VALUE
+    return MIN_VALUE * GROWTH ** (index - 0.5)
+
+
+class LatencyHistogram:
+    """Fixed-size log-bucketed histogram with exact count, sum, min and max."""
+
+    __slots__ = ("counts", "count", "total", "min", "max")
+
+    def __init__(self):
+        self.counts = array("L", bytes(NUM_BUCKETS * array("L").itemsize))
+        self.reset()
+
+    def reset(self):
+        for i in range(NUM_BUCKETS):
+            self.counts[i] = 0
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def record(self, value):
+        self.counts[_bucket_index(value)] += 1
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        if not other.count:
+            return
+        counts = self.counts
+        for i, c in enumerate(other.counts):
+            if c:
+                counts[i] += c
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def percentile(self, p):
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(self.count * p / 100))
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank:
+                # Never report outside the observed range
+                return min(max(_bucket_value(i), self.min), self.max)
+        return self.max
+
+    def summary(self):
+        if not self.count:
+            return {"count": 0}
+        result = {
+            "count": self.count,
+            "mean": self.total / self.count,
+            "min": self.min,
+            "max": self.max,
+        }
+        for p in PERCENTILES:
+            result[f"p{p}"] = self.percentile(p)
+        return result
+
+
+class RollingHistogram:
+    """A histogram over the trailing `window` seconds, kept as a ring of slices."""
+
+    __slots__ = ("slice_width", "slices", "epochs")
+
+    def __init__(self, window, num_slices):
+        self.slice_width = window / num_slices
+        self.slices = [LatencyHistogram() for _ in range(num_slices)]
+        self.epochs = [-1] * num_slices
+
+    def record(self, value, now):
+        epoch = int(now // self.slice_width)
+        i = epoch % len(self.slices)
+        if self.epochs[i] != epoch:
+            # This slot still holds data from a previous lap of the ring
+            self.slices[i].reset()
+            self.epochs[i] = epoch
+        self.slices[i].record(value)
+
+    def snapshot(self, now):
+        current = int(now // self.slice_width)
+        oldest = current - len(self.slices) + 1
+        merged = LatencyHistogram()
+        for epoch, hist in zip(self.epochs, self.slices):
+            if oldest <= epoch <= current:
+                merged.merge(hist)
+        return merged
+
+
+class FieldAggregate:
+    """Rolling histograms for one numeric field across every configured window."""
+
+    __slots__ = ("windows",)
+
+    def __init__(self):
+        self.windows = {name: RollingHistogram(length, slices) for name, (length, slices) in WINDOWS.items()}
+
+    def record(self, value, now):
+        for rolling in self.windows.values():
+            rolling.record(value, now)
+
+    def summary(self, now):
+        return {name: rolling.snapshot(now).summary() for name, rolling in self.windows.items()}
+
+
+class MetricsAggregator:
+    """
+    Streaming aggregates per metric type, label and field.
+    Safe to call from Flask's request threads.
+    """
+
+    def __init__(self, fields=SUMMARY_FIELDS):
+        self._fields = fields
+        self._lock = threading.Lock()
+        # metric_type -> label -> field -> FieldAggregate
+        self._aggregates = defaultdict(lambda: defaultdict(dict))
+
+    def record(self, metric_type, event, now=None):
+        now = time.time() if now is None else now
+        label = event.get("label") or "default"
+        with self._lock:
+            by_field = self._aggregates[metric_type][label]
+            for field in self._fields.get(metric_type, ()):
+                value = event.get(field)
+                # Skip missing values and the -1 sentinels some plugins report
+                if not isinstance(value, (int, float)) or isinstance(value, bool) or value < 0:
+                    continue
+                aggregate = by_field.get(field)
+                if aggregate is None:
+                    aggregate = by_field[field] = FieldAggregate()
+                aggregate.record(value, now)
+
+    def summary(self, metric_type, label=None, now=None):
+        """Return {label: {field: {window: stats}}} for a metric type"""
+        now = time.time() if now is None else now
+        with self._lock:
+            labels = self._aggregates.get(metric_type, {})
+            if label is not None:
+                labels = {label: labels[label]} if label in labels else {}
+            return {
+                name: {field: aggregate.summary(now) for field, aggregate in by_field.items()}
+                for name, by_field in labels.items()
+            }
@@ -1,17 +1,94 @@
-from flask import Flask, request, jsonify, render_template
+from flask import Flask, Response, request, jsonify, render_template
+import atexit
 import json
+import threading
+import time
 import os
+import sys
+import zlib
 from datetime import datetime
-from collections import defaultdict
+from collections import defaultdict, deque
 from pathlib import Path
 
+from aggregates import MetricsAggregator
+from broadcaster import Broadcaster, format_sse
+from slo_detector import SLODetector, WebhookAlertSink, load_slos, log_alert
+from storage import MetricsStore, TIERS, default_db_path
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
 # Set up the Flask app with proper template directory
 template_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), 'templates'))
 app = Flask(__name__, template_folder=template_dir)
 
-# Store metrics in memory (for simplicity)
-metrics_data = defaultdict(list)
-metrics_types = ["llm", "stt", "tts", "eou", "vad"]
+# Keep the most recent raw events per type in fixed-capacity ring buffers,
+# plus constant-memory percentile aggregates over rolling windows
+RAW_EVENTS_PER_TYPE = 100
+metrics_data = defaultdict(lambda: deque(maxlen=RAW_EVENTS_PER_TYPE))
+metrics_aggregates = MetricsAggregator()
+metrics_types = ["llm", "stt", "tts", "eou", "vad", "turn"]
+
+# Persist every event to SQLite so history survives restarts and can be queried by time range
+metrics_store = MetricsStore(default_db_path())
+atexit.register(metrics_store.close)
+for _metric_type in metrics_types:
+    metrics_data[_metric_type].extend(metrics_store.recent(_metric_type, RAW_EVENTS_PER_TYPE))
+
+# Push new events and aggregate updates to dashboards instead of having them poll
+broadcaster = Broadcaster()
+SUMMARY_PUSH_INTERVAL = 2.0
+DASHBOARD_RECENT_EVENTS = 5
+_dirty_types = set()
+
+# Watch provider latencies against SLOs and their own baselines; alerts go to
+# the log, to dashboards and, if SLO_WEBHOOK_URL is set, to a webhook
+slo_detector = SLODetector(
+    load_slos(os.getenv("METRICS_SLO_PATH")),
+    window=float(os.getenv("SLO_WINDOW_SECONDS", "60")),
+    sinks=[log_alert, lambda alert: broadcaster.publish("alert", alert)],
+)
+if os.getenv("SLO_WEBHOOK_URL"):
+    slo_detector.sinks.append(WebhookAlertSink(os.getenv("SLO_WEBHOOK_URL")))
+
+# Ingestion counters for /api/server/stats
+ingested_counts = defaultdict(int)
+server_started_at = time.time()
+
+# Upper bound on a decompressed batch body, to guard against compression bombs
+MAX_BATCH_BYTES = 16 * 1024 * 1024
+
+class BatchError(ValueError):
+    """Raised when a metrics batch cannot be decoded or fails validation"""
+
+def store_metric(metric_type, data, received_at):
+    """Store a single metrics event; the ring buffer drops the oldest entry when full"""
+    data['received_at'] = received_at
+    metrics_data[metric_type].append(data)
+    metrics_aggregates.record(metric_type, data)
+    metrics_store.add(metric_type, data)
+    slo_detector.record(metric_type, data)
+    _dirty_types.add(metric_type)
+    ingested_counts[metric_type] += 1
+
+def publish_summaries():
+    """Periodically push fresh aggregates for the metric types that changed"""
+    while True:
+        time.sleep(SUMMARY_PUSH_INTERVAL)
+        slo_detector.tick()
+        if not _dirty_types or not broadcaster.client_count:
+            continue
+        changed = list(_dirty_types)
+        _dirty_types.difference_update(changed)
+        for metric_type in changed:
+            broadcaster.publish("summary", {
+                "metric_type": metric_type,
+                "summary": metrics_aggregates.summary(metric_type),
+            })
+
+threading.Thread(target=publish_summaries, name="summary-publisher", daemon=True).start()
 
 @app.route('/metrics/<metric_type>', methods=['POST'])
 def receive_metrics(metric_type):
@@ -23,15 +100,83 @@ def receive_metrics(metric_type):
     
     data = request.json
     # Add timestamp for when server received it
-    data['received_at'] = datetime.now().isoformat()
-    metrics_data[metric_type].append(data)
-    
-    # Limit the size of stored metrics (keep only last 100 entries per type)
-    if len(metrics_data[metric_type]) > 100:
-        metrics_data[metric_type] = metrics_data[metric_type][-100:]
+    store_metric(metric_type, data, datetime.now().isoformat())
+    broadcaster.publish("metrics", {metric_type: [data]})
     
     return jsonify({"status": "success"}), 200
 
+def decode_batch_body(body, content_encoding):
+    """Decompress a batch body according to its Content-Encoding header"""
+    encoding = (content_encoding or 'identity').strip().lower()
+    if encoding == 'identity':
+        data = body
+    elif encoding == 'gzip':
+        decompressor = zlib.decompressobj(wbits=zlib.MAX_WBITS | 16)
+        try:
+            data = decompressor.decompress(body, MAX_BATCH_BYTES + 1)
+        except zlib.error as e:
+            raise BatchError(f"Invalid gzip body: {e}")
+    elif encoding == 'zstd':
+        if zstandard is None:
+            raise BatchError("zstd encoding requires the 'zstandard' package on the server")
+        try:
+            with zstandard.ZstdDecompressor().stream_reader(body) as reader:
+                data = reader.read(MAX_BATCH_BYTES + 1)
+        except zstandard.ZstdError as e:
+            raise BatchError(f"Invalid zstd body: {e}")
+    else:
+        raise BatchError(f"Unsupported Content-Encoding: {encoding}")
+
+    if len(data) > MAX_BATCH_BYTES:
+        raise BatchError(f"Decompressed batch exceeds {MAX_BATCH_BYTES} bytes")
+    return data
+
+def parse_batch(data):
+    """
+    Parse and validate an NDJSON batch in a single pass.
+    Returns a list of (metric_type, event) pairs; the whole batch is rejected
+    if any line is invalid so a batch is never partially stored.
+    """
+    events = []
+    for line_number, line in enumerate(data.splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            event = json.loads(line)
+        except ValueError:
+            raise BatchError(f"Line {line_number}: invalid JSON")
+        if not isinstance(event, dict):
+            raise BatchError(f"Line {line_number}: expected a JSON object")
+        metric_type = event.pop('metric_type', None)
+        if metric_type not in metrics_types:
+            raise BatchError(f"Line {line_number}: invalid metric type: {metric_type}")
+        events.append((metric_type, event))
+    return events
+
+@app.route('/metrics/batch', methods=['POST'])
+def receive_metrics_batch():
+    """
+    Endpoint to receive a batch of metrics events as newline-delimited JSON.
+    Each line is one event with a `metric_type` field, so a batch can mix types.
+    The body may be gzip or zstd compressed (set Content-Encoding accordingly).
+    """
+    try:
+        data = decode_batch_body(request.get_data(), request.headers.get('Content-Encoding'))
+        events = parse_batch(data)
+    except BatchError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    received_at = datetime.now().isoformat()
+    by_type = defaultdict(list)
+    for metric_type, event in events:
+        store_metric(metric_type, event, received_at)
+        by_type[metric_type].append(event)
+    # One message per batch, not per event
+    if by_type:
+        broadcaster.publish("metrics", by_type)
+    
+    return jsonify({"status": "success", "accepted": len(events)}), 200
+
 @app.route('/')
 def dashboard():
     """Display metrics dashboard"""
@@ -40,7 +185,24 @@ def dashboard():
 @app.route('/api/metrics')
 def get_metrics():
     """API endpoint to get all metrics data for AJAX requests"""
-    return jsonify(metrics_data)
+    return jsonify({metric_type: list(events) for metric_type, events in metrics_data.items()})
+
+@app.route('/api/stream')
+def stream_metrics():
+    """
+    Server-Sent Events stream for the dashboard. Starts with a snapshot of the
+    latest events and aggregates, then pushes only new `metrics` batches and
+    `summary` updates for the types that changed.
+    """
+    snapshot = {
+        "metrics": {t: list(metrics_data[t])[-DASHBOARD_RECENT_EVENTS:] for t in metrics_types},
+        "summaries": {t: metrics_aggregates.summary(t) for t in metrics_types},
+    }
+    return Response(
+        broadcaster.stream(initial=[format_sse("snapshot", snapshot)]),
+        mimetype='text/event-stream',
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 @app.route('/api/metrics/<metric_type>')
 def get_metric_type(metric_type):
@@ -48,7 +210,79 @@ def get_metric_type(metric_type):
     if metric_type not in metrics_types:
         return jsonify({"error": f"Invalid metric type: {metric_type}"}), 400
     
-    return jsonify(metrics_data[metric_type])
+    return jsonify(list(metrics_data[metric_type]))
+
+@app.route('/api/metrics/<metric_type>/summary')
+def get_metric_summary(metric_type):
+    """
+    API endpoint for streaming p50/p95/p99 aggregates of a metric type over
+    rolling 1m/5m/1h windows, grouped by label. Pass `?label=` to select one label.
+    """
+    if metric_type not in metrics_types:
+        return jsonify({"error": f"Invalid metric type: {metric_type}"}), 400
+    
+    return jsonify(metrics_aggregates.summary(metric_type, label=request.args.get('label')))
+
+@app.route('/api/metrics/<metric_type>/range')
+def get_metric_range(metric_type):
+    """
+    API endpoint for historical metrics between `start` and `end` (epoch seconds,
+    default: the last hour). `resolution` is `raw`, `1s`, `1m` or `1h`; when it is
+    omitted the finest rollup tier that fits the range is chosen. Rollups can be
+    filtered with `field` and `label`.
+    """
+    if metric_type not in metrics_types:
+        return jsonify({"error": f"Invalid metric type: {metric_type}"}), 400
+    
+    try:
+        end = float(request.args.get('end', time.time()))
+        start = float(request.args.get('start', end - 3600))
+    except ValueError:
+        return jsonify({"error": "start and end must be epoch seconds"}), 400
+    label = request.args.get('label')
+    field = request.args.get('field')
+    resolution = request.args.get('resolution') or metrics_store.pick_tier(start, end)
+    
+    truncated = False
+    if resolution == 'raw':
+        points, truncated = metrics_store.query_raw(metric_type, start, end, label=label)
+    elif resolution in TIERS:
+        points = metrics_store.query_rollups(metric_type, start, end, resolution, field=field, label=label)
+    else:
+        return jsonify({"error": f"Invalid resolution: {resolution}"}), 400
+    
+    return jsonify({"start": start, "end": end, "resolution": resolution, "points": points, "truncated": truncated})
+
+def current_rss_bytes():
+    """Resident memory of this process (current on Linux, peak elsewhere)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        import resource  # not available on Windows
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+@app.route('/api/server/stats')
+def get_server_stats():
+    """API endpoint for the server's own health: ingest counts, memory and queues"""
+    return jsonify({
+        "uptime": time.time() - server_started_at,
+        "ingested": dict(ingested_counts),
+        "ingested_total": sum(ingested_counts.values()),
+        "rss_bytes": current_rss_bytes(),
+        "store_pending": metrics_store.pending,
+        "store_dropped": metrics_store.dropped,
+        "stream_clients": broadcaster.client_count,
+    })
+
+@app.route('/api/health/providers')
+def get_provider_health():
+    """API endpoint for per-provider SLO status and recent alerts"""
+    return jsonify({
+        "providers": slo_detector.health(),
+        "alerts": list(slo_detector.alerts),
+    })
 
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5001) 
\ No newline at end of file
@@ -0,0 +1,142 @@
+"""
+Compare ingestion throughput of single-event posts against batched NDJSON posts.
+
+USAGE
+=====
+
+    # Start an in-process server on a free port and benchmark it
+    python benchmark_ingest.py
+
+    # Or benchmark a server that is already running
+    python benchmark_ingest.py --url http://localhost:5001 --events 20000
+
+Both modes reuse one keep-alive `requests.Session`, so the difference you see
+is per-request overhead rather than connection setup.
+"""
+
+import argparse
+import gzip
+import json
+import random
+import tempfile
+import threading
+import time
+
+import requests
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+def make_event(metric_type):
+    """Build a plausible metrics event of the given type"""
+    now = time.time()
+    if metric_type == "llm":
+        return {"type": "llm_metrics", "label": "livekit.plugins.openai.llm.LLM", "request_id": "req", "timestamp": now,
+                "duration": random.uniform(0.5, 3.0), "ttft": random.uniform(0.2, 1.2), "cancelled": False,
+                "completion_tokens": 42, "prompt_tokens": 812, "total_tokens": 854, "tokens_per_second": 35.2}
+    if metric_type == "stt":
+        return {"type": "stt_metrics", "label": "livekit.plugins.deepgram.stt.STT", "request_id": "req", "timestamp": now,
+                "duration": 0.0, "speech_id": None, "error": None, "streamed": True, "audio_duration": 0.05}
+    if metric_type == "tts":
+        return {"type": "tts_metrics", "label": "livekit.plugins.openai.tts.TTS", "request_id": "req", "timestamp": now,
+                "ttfb": random.uniform(0.1, 0.6), "duration": 1.2, "audio_duration": 3.4, "cancelled": False,
+                "characters_count": 57, "streamed": True, "speech_id": "speech", "error": None}
+    if metric_type == "eou":
+        return {"type": "eou_metrics", "label": "livekit.plugins.deepgram.stt.STT", "timestamp": now,
+                "end_of_utterance_delay": random.uniform(0.2, 0.9), "transcription_delay": 0.1,
+                "speech_id": "speech", "error": None}
+    return {"type": "vad_metrics", "timestamp": now, "idle_time": 0.01, "inference_duration_total": 0.002,
+            "inference_count": 32, "speech_id": None, "error": None}
+
+
+def make_events(count):
+    # VAD and STT dominate real traffic, so weight them accordingly
+    types = random.choices(["vad", "stt", "eou", "llm", "tts"], weights=[50, 30, 5, 5, 10], k=count)
+    return [(metric_type, make_event(metric_type)) for metric_type in types]
+
+
+def bench_single(url, events):
+    with requests.Session() as session:
+        start = time.perf_counter()
+        for metric_type, event in events:
+            session.post(f"{url}/metrics/{metric_type}", json=event, timeout=5).raise_for_status()
+        return time.perf_counter() - start
+
+
+def bench_batched(url, events, batch_size, encoding):
+    with requests.Session() as session:
+        start = time.perf_counter()
+        for i in range(0, len(events), batch_size):
+            body = "\n".join(
+                json.dumps({"metric_type": metric_type, **event}, separators=(",", ":"))
+                for metric_type, event in events[i:i + batch_size]
+            ).encode()
+            headers = {"Content-Type": "application/x-ndjson"}
+            if encoding == "gzip":
+                body = gzip.compress(body, compresslevel=1)
+                headers["Content-Encoding"] = "gzip"
+            elif encoding == "zstd":
+                body = zstandard.ZstdCompressor(level=1).compress(body)
+                headers["Content-Encoding"] = "zstd"
+            session.post(f"{url}/metrics/batch", data=body, headers=headers, timeout=5).raise_for_status()
+        return time.perf_counter() - start
+
+
+def start_local_server(db_dir):
+    """Run the metrics server in a background thread on a free port"""
+    import logging
+    import os
+    from werkzeug.serving import make_server
+
+    # app.py opens its store at import time; keep synthetic events out of the real metrics.db
+    os.environ["METRICS_DB_PATH"] = os.path.join(db_dir, "metrics.db")
+    from app import app
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}", server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Metrics server URL (default: start one in-process)")
+    parser.add_argument("--events", type=int, default=5000, help="Number of events per run")
+    parser.add_argument("--batch-size", type=int, default=200, help="Events per batched request")
+    args = parser.parse_args()
+
+    server = None
+    db_dir = None
+    url = args.url
+    if url is None:
+        db_dir = tempfile.TemporaryDirectory(prefix="benchmark-ingest-")
+        url, server = start_local_server(db_dir.name)
+
+    events = make_events(args.events)
+    runs = [("single", lambda: bench_single(url, events))]
+    encodings = ["identity", "gzip"] + (["zstd"] if zstandard else [])
+    for encoding in encodings:
+        runs.append((f"batch/{encoding}", lambda encoding=encoding: bench_batched(url, events, args.batch_size, encoding)))
+
+    print(f"{args.events} events, batch size {args.batch_size}, server {url}\n")
+    print(f"{'mode':<16}{'seconds':>10}{'events/s':>14}")
+    baseline = None
+    for name, run in runs:
+        elapsed = run()
+        rate = args.events / elapsed
+        baseline = baseline or rate
+        print(f"{name:<16}{elapsed:>10.3f}{rate:>14,.0f}  ({rate / baseline:.1f}x)")
+
+    if server is not None:
+        server.shutdown()
+        # Close the store before its directory goes away
+        from app import metrics_store
+        metrics_store.close()
+        db_dir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
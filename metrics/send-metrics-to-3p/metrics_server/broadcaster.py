@@ -0,0 +1,97 @@
+"""
+Server-Sent Events fan-out for the metrics dashboard.
+
+Every message is serialised once when it is published, then handed to each
+connected client's bounded queue. A slow client only ever holds
+`max_pending` messages; older ones are dropped for that client alone, and
+it is told how many it missed, so one stalled browser tab cannot grow
+server memory or hold up the others.
+"""
+
+import json
+import threading
+from collections import deque
+
+
+def format_sse(event, data):
+    """Encode one SSE message"""
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+class Subscription:
+    """One connected client: a bounded message queue plus a wakeup signal."""
+
+    def __init__(self, max_pending):
+        self._messages = deque(maxlen=max_pending)
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+        self._dropped = 0
+
+    def push(self, message):
+        with self._lock:
+            if len(self._messages) == self._messages.maxlen:
+                self._dropped += 1
+            self._messages.append(message)
+        self._ready.set()
+
+    def drain(self, timeout):
+        """Wait up to `timeout` seconds, then return all pending messages"""
+        self._ready.wait(timeout)
+        with self._lock:
+            self._ready.clear()
+            messages = list(self._messages)
+            self._messages.clear()
+            dropped, self._dropped = self._dropped, 0
+        if dropped:
+            messages.insert(0, format_sse("dropped", {"count": dropped}))
+        return messages
+
+
+class Broadcaster:
+    """Publishes messages to every subscribed client."""
+
+    def __init__(self, max_pending=256):
+        self._max_pending = max_pending
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self):
+        subscription = Subscription(self._max_pending)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    @property
+    def client_count(self):
+        return len(self._subscribers)
+
+    def publish(self, event, data):
+        if not self._subscribers:
+            return
+        message = format_sse(event, data)
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            subscription.push(message)
+
+    def stream(self, initial=(), keepalive=15.0):
+        """
+        Generator for a streaming response. Yields `initial` messages first,
+        then everything published until the client disconnects.
+        """
+        subscription = self.subscribe()
+        try:
+            yield from initial
+            while True:
+                messages = subscription.drain(keepalive)
+                if messages:
+                    yield "".join(messages)
+                else:
+                    # SSE comment line keeps proxies from closing an idle connection
+                    yield ": keepalive\n\n"
+        finally:
+            self.unsubscribe(subscription)
@@ -0,0 +1,274 @@
+"""
+Streaming latency SLO and regression detection.
+
+Every event that carries an SLO field (LLM ttft, TTS ttfb, EOU delay by
+default) is recorded into a per-provider histogram for the current window.
+When a window closes, its percentile is compared against:
+
+- the SLO threshold ("breach"), and
+- an EWMA baseline of that provider's previous healthy windows ("regressed",
+  when the window is `regression_factor` times slower than usual but still
+  inside the SLO).
+
+Alerts are sent to the configured sinks only when a provider's status
+changes, so a provider that stays slow produces one alert rather than one per
+window. Providers are keyed by the event label (plus the model, if present).
+
+Run it on a recording to check SLOs offline, for example on the output of
+`load_generator.py --record`:
+
+    python slo_detector.py load.jsonl --window 10
+"""
+
+import argparse
+import json
+import logging
+import queue
+import threading
+import time
+from collections import deque
+
+import requests
+
+from aggregates import LatencyHistogram
+
+logger = logging.getLogger("slo-detector")
+
+# (metric type, field) -> (percentile, threshold in seconds)
+DEFAULT_SLOS = {
+    ("llm", "ttft"): (95, 1.5),
+    ("tts", "ttfb"): (95, 0.8),
+    ("eou", "end_of_utterance_delay"): (95, 1.0),
+}
+
+# Worst first, for rolling statuses up to a provider
+STATUS_ORDER = ("breach", "regressed", "ok", "unknown")
+
+
+def load_slos(path):
+    """
+    Read SLOs from a JSON list such as
+    [{"metric_type": "llm", "field": "ttft", "percentile": 95, "threshold": 1.2}]
+    """
+    if not path:
+        return dict(DEFAULT_SLOS)
+    with open(path, encoding="utf-8") as f:
+        entries = json.load(f)
+    return {(e["metric_type"], e["field"]): (e.get("percentile", 95), e["threshold"]) for e in entries}
+
+
+def provider_of(event):
+    label = event.get("label") or "default"
+    model = event.get("model")
+    return f"{label}:{model}" if model else label
+
+
+class _Series:
+    """Window histogram, baseline and status for one SLO and provider."""
+
+    __slots__ = ("window_start", "histogram", "baseline", "healthy_windows", "status", "since", "last")
+
+    def __init__(self, window_start):
+        self.window_start = window_start
+        self.histogram = LatencyHistogram()
+        self.baseline = None
+        self.healthy_windows = 0
+        self.status = "unknown"
+        self.since = window_start
+        self.last = None
+
+
+class SLODetector:
+    """
+    Call `record` for every ingested event and `tick` periodically so that
+    windows close even when a provider goes quiet. Safe to call from Flask's
+    request threads.
+    """
+
+    def __init__(self, slos=None, *, window=60.0, min_samples=20, alpha=0.2, regression_factor=1.5,
+                 warmup_windows=3, sinks=(), max_alerts=100):
+        self.slos = DEFAULT_SLOS if slos is None else slos
+        self.window = window
+        self.min_samples = min_samples
+        self.alpha = alpha
+        self.regression_factor = regression_factor
+        self.warmup_windows = warmup_windows
+        self.sinks = list(sinks)
+        self.alerts = deque(maxlen=max_alerts)
+        self._lock = threading.Lock()
+        # (metric_type, field, provider) -> _Series
+        self._series = {}
+        self._fields = {}
+        for metric_type, field in self.slos:
+            self._fields.setdefault(metric_type, []).append(field)
+
+    def record(self, metric_type, event, now=None):
+        fields = self._fields.get(metric_type)
+        if not fields:
+            return
+        now = time.time() if now is None else now
+        provider = provider_of(event)
+        alerts = []
+        with self._lock:
+            for field in fields:
+                value = event.get(field)
+                # Skip missing values and the -1 sentinels some plugins report
+                if not isinstance(value, (int, float)) or isinstance(value, bool) or value < 0:
+                    continue
+                key = (metric_type, field, provider)
+                series = self._series.get(key)
+                if series is None:
+                    series = self._series[key] = _Series(self._window_start(now))
+                elif now >= series.window_start + self.window:
+                    alerts.extend(self._close_window(key, series, now))
+                series.histogram.record(value)
+        self._dispatch(alerts)
+
+    def tick(self, now=None):
+        """Close every window that has ended"""
+        now = time.time() if now is None else now
+        alerts = []
+        with self._lock:
+            for key, series in self._series.items():
+                if now >= series.window_start + self.window:
+                    alerts.extend(self._close_window(key, series, now))
+        self._dispatch(alerts)
+
+    def health(self):
+        """{provider: {"status": worst status, "slos": {"type.field": details}}}"""
+        with self._lock:
+            result = {}
+            for (metric_type, field, provider), series in self._series.items():
+                percentile, threshold = self.slos[(metric_type, field)]
+                entry = result.setdefault(provider, {"status": "unknown", "slos": {}})
+                entry["slos"][f"{metric_type}.{field}"] = {
+                    "status": series.status,
+                    "since": series.since,
+                    "percentile": percentile,
+                    "threshold": threshold,
+                    "baseline": series.baseline,
+                    "last_window": series.last,
+                }
+                if STATUS_ORDER.index(series.status) < STATUS_ORDER.index(entry["status"]):
+                    entry["status"] = series.status
+            return result
+
+    def _window_start(self, now):
+        return now - now % self.window
+
+    def _close_window(self, key, series, now):
+        metric_type, field, provider = key
+        percentile, threshold = self.slos[(metric_type, field)]
+        hist = series.histogram
+        window_start, window_end = series.window_start, series.window_start + self.window
+        series.window_start = self._window_start(now)
+
+        if hist.count < self.min_samples:
+            # Too few samples to judge; keep them for the next window
+            return []
+        value = hist.percentile(percentile)
+        series.last = {"start": window_start, "end": window_end, "samples": hist.count, "value": value}
+        hist.reset()
+
+        if value > threshold:
+            status = "breach"
+        elif (series.healthy_windows >= self.warmup_windows
+              and series.baseline is not None
+              and value > series.baseline * self.regression_factor):
+            status = "regressed"
+        else:
+            status = "ok"
+            # Only healthy windows feed the baseline, so a regression never becomes the new normal
+            series.baseline = value if series.baseline is None else (
+                self.alpha * value + (1 - self.alpha) * series.baseline)
+            series.healthy_windows += 1
+
+        if status == series.status:
+            return []
+        previous, series.status, series.since = series.status, status, window_end
+        if previous == "unknown" and status == "ok":
+            return []
+        return [{
+            "state": "resolved" if status == "ok" else status,
+            "previous": previous,
+            "provider": provider,
+            "metric_type": metric_type,
+            "field": field,
+            "percentile": percentile,
+            "value": value,
+            "threshold": threshold,
+            "baseline": series.baseline,
+            "samples": series.last["samples"],
+            "window_start": window_start,
+            "window_end": window_end,
+        }]
+
+    def _dispatch(self, alerts):
+        for alert in alerts:
+            self.alerts.append(alert)
+            for sink in self.sinks:
+                try:
+                    sink(alert)
+                except Exception:
+                    logger.exception("alert sink failed")
+
+
+def log_alert(alert):
+    logger.warning(
+        f"SLO {alert['state']}: {alert['provider']} {alert['metric_type']}.{alert['field']} "
+        f"p{alert['percentile']}={alert['value']:.3f}s (threshold {alert['threshold']}s, "
+        f"baseline {alert['baseline'] or 0:.3f}s, {alert['samples']} samples)"
+    )
+
+
+class WebhookAlertSink:
+    """POSTs each alert as JSON from a background thread, so ingestion never waits on the webhook"""
+
+    def __init__(self, url, *, timeout=5.0, max_pending=1000):
+        self.url = url
+        self.timeout = timeout
+        self._queue = queue.Queue(maxsize=max_pending)
+        threading.Thread(target=self._run, name="slo-webhook", daemon=True).start()
+
+    def __call__(self, alert):
+        try:
+            self._queue.put_nowait(alert)
+        except queue.Full:
+            logger.warning("Dropping SLO alert: webhook queue is full")
+
+    def _run(self):
+        while True:
+            alert = self._queue.get()
+            try:
+                requests.post(self.url, json=alert, timeout=self.timeout).raise_for_status()
+            except requests.RequestException as e:
+                logger.warning(f"Failed to deliver SLO alert to {self.url}: {e}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check latency SLOs over a JSONL metrics recording")
+    parser.add_argument("recording", help="JSONL from load_generator.py --record or the collector's FileSink")
+    parser.add_argument("--window", type=float, default=60.0, help="Window length in seconds")
+    parser.add_argument("--min-samples", type=int, default=20, help="Minimum samples to evaluate a window")
+    parser.add_argument("--slos", help="JSON file of SLOs (defaults to DEFAULT_SLOS)")
+    args = parser.parse_args(argv)
+
+    detector = SLODetector(load_slos(args.slos), window=args.window, min_samples=args.min_samples,
+                           sinks=[lambda alert: print(json.dumps(alert))])
+    last = 0.0
+    with open(args.recording, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            event = json.loads(line)
+            ts = event.get("timestamp")
+            if isinstance(ts, (int, float)):
+                last = max(last, ts)
+            # Replays use the recorded timestamps, so windows match the original run
+            detector.record(event.get("metric_type") or event.get("kind"), event, now=last)
+    detector.tick(last + args.window)
+    print(json.dumps(detector.health(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
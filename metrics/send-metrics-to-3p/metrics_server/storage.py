@@ -0,0 +1,257 @@
+"""
+Persistent time-series storage for the metrics server.
+
+Events are written to an SQLite database in WAL mode by a single background
+writer thread, in batches, so request handlers only pay for a queue put.
+Every batch is also rolled up into 1s/1m/1h aggregates (count, sum, min, max
+per metric type, label and field) with an upsert, and each tier is pruned to
+its own retention period. Dashboards can then query days of history from the
+coarse tiers without scanning raw events.
+"""
+
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+
+from aggregates import SUMMARY_FIELDS
+
+logger = logging.getLogger("metrics-storage")
+
+# Rollup tiers: name -> (bucket width in seconds, retention in seconds)
+TIERS = {
+    "1s": (1, 6 * 3600),
+    "1m": (60, 7 * 24 * 3600),
+    "1h": (3600, 90 * 24 * 3600),
+}
+RAW_RETENTION = 24 * 3600
+
+# Keep range responses small enough for a chart
+MAX_POINTS = 2000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    ts REAL NOT NULL,
+    metric_type TEXT NOT NULL,
+    label TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_events_type_ts ON events(metric_type, ts);
+
+CREATE TABLE IF NOT EXISTS rollups (
+    tier TEXT NOT NULL,
+    metric_type TEXT NOT NULL,
+    label TEXT NOT NULL,
+    field TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    total REAL NOT NULL,
+    min REAL NOT NULL,
+    max REAL NOT NULL,
+    PRIMARY KEY (tier, metric_type, field, label, bucket)
+) WITHOUT ROWID;
+-- Pruning deletes by (tier, bucket), which the primary key can't seek on
+CREATE INDEX IF NOT EXISTS idx_rollups_tier_bucket ON rollups(tier, bucket);
+"""
+
+UPSERT_ROLLUP = """
+INSERT INTO rollups (tier, metric_type, label, field, bucket, count, total, min, max)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (tier, metric_type, field, label, bucket) DO UPDATE SET
+    count = count + excluded.count,
+    total = total + excluded.total,
+    min = MIN(min, excluded.min),
+    max = MAX(max, excluded.max)
+"""
+
+
+def _connect(path):
+    conn = sqlite3.connect(path, timeout=10)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def event_time(event, default):
+    """Use the agent-side timestamp when it is numeric, else the receive time"""
+    ts = event.get("timestamp")
+    if isinstance(ts, (int, float)) and not isinstance(ts, bool):
+        return float(ts)
+    return default
+
+
+class MetricsStore:
+    """
+    Batched, persistent event store with automatic rollups.
+
+    `add` is safe to call from any thread and never touches the disk. Reads
+    use one connection per thread; WAL mode lets them run alongside the writer.
+    """
+
+    def __init__(self, path, *, flush_interval=1.0, max_batch=2000, max_pending=100_000, prune_interval=60.0):
+        self._path = path
+        self._flush_interval = flush_interval
+        self._max_batch = max_batch
+        self._prune_interval = prune_interval
+        self._pending = queue.Queue(maxsize=max_pending)
+        self._local = threading.local()
+        self._stopped = threading.Event()
+        self.dropped = 0
+
+        conn = _connect(path)
+        conn.executescript(SCHEMA)
+        conn.close()
+
+        self._writer = threading.Thread(target=self._run, name="metrics-store-writer", daemon=True)
+        self._writer.start()
+
+    def add(self, metric_type, event, received_at=None):
+        """Queue an event for the next write batch"""
+        ts = event_time(event, time.time() if received_at is None else received_at)
+        try:
+            self._pending.put_nowait((ts, metric_type, event))
+        except queue.Full:
+            self.dropped += 1
+
+    @property
+    def pending(self):
+        """Events queued but not yet written"""
+        return self._pending.qsize()
+
+    def close(self):
+        """Write any pending events and stop the writer thread"""
+        self._stopped.set()
+        self._writer.join()
+
+    def recent(self, metric_type, limit):
+        """The newest `limit` raw events of a type, oldest first"""
+        rows = self._reader().execute(
+            "SELECT data FROM events WHERE metric_type = ? ORDER BY ts DESC LIMIT ?",
+            (metric_type, limit),
+        ).fetchall()
+        return [json.loads(data) for (data,) in reversed(rows)]
+
+    def query_raw(self, metric_type, start, end, label=None, limit=MAX_POINTS):
+        """
+        The newest `limit` raw events in the range, oldest first, and whether
+        older events in the range were left out
+        """
+        sql = "SELECT data FROM events WHERE metric_type = ? AND ts >= ? AND ts < ?"
+        params = [metric_type, start, end]
+        if label is not None:
+            sql += " AND label = ?"
+            params.append(label)
+        sql += " ORDER BY ts DESC LIMIT ?"
+        params.append(limit + 1)
+        rows = self._reader().execute(sql, params).fetchall()
+        truncated = len(rows) > limit
+        return [json.loads(data) for (data,) in reversed(rows[:limit])], truncated
+
+    def query_rollups(self, metric_type, start, end, tier, field=None, label=None):
+        width = TIERS[tier][0]
+        sql = (
+            "SELECT bucket, label, field, count, total, min, max FROM rollups "
+            "WHERE tier = ? AND metric_type = ? AND bucket >= ? AND bucket < ?"
+        )
+        params = [tier, metric_type, int(start // width) * width, end]
+        if field is not None:
+            sql += " AND field = ?"
+            params.append(field)
+        if label is not None:
+            sql += " AND label = ?"
+            params.append(label)
+        sql += " ORDER BY bucket"
+        return [
+            {"ts": bucket, "label": row_label, "field": row_field, "count": count,
+             "mean": total / count, "min": min_value, "max": max_value}
+            for bucket, row_label, row_field, count, total, min_value, max_value in self._reader().execute(sql, params)
+        ]
+
+    @staticmethod
+    def pick_tier(start, end, fields=1):
+        """The finest rollup tier that keeps a range under MAX_POINTS points"""
+        for tier, (width, _) in TIERS.items():
+            if (end - start) / width * fields <= MAX_POINTS:
+                return tier
+        return "1h"
+
+    def _reader(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = _connect(self._path)
+        return conn
+
+    def _run(self):
+        conn = _connect(self._path)
+        last_prune = 0.0
+        while True:
+            batch = self._drain()
+            if batch:
+                try:
+                    self._write(conn, batch)
+                except sqlite3.Error as e:
+                    logger.error(f"Failed to write {len(batch)} metrics events: {e}")
+            now = time.time()
+            if now - last_prune >= self._prune_interval:
+                self._prune(conn, now)
+                last_prune = now
+            if self._stopped.is_set() and self._pending.empty():
+                break
+        conn.close()
+
+    def _drain(self):
+        """Collect a batch, waiting until it is full or the flush interval has passed"""
+        batch = []
+        deadline = time.monotonic() + self._flush_interval
+        while len(batch) < self._max_batch:
+            # Once stopping, take whatever is left without waiting
+            timeout = 0 if self._stopped.is_set() else deadline - time.monotonic()
+            try:
+                if timeout > 0:
+                    batch.append(self._pending.get(timeout=timeout))
+                else:
+                    batch.append(self._pending.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, conn, batch):
+        rows = []
+        # (tier, metric_type, label, field, bucket) -> [count, total, min, max]
+        rollups = defaultdict(lambda: [0, 0.0, float("inf"), float("-inf")])
+        for ts, metric_type, event in batch:
+            label = event.get("label") or "default"
+            rows.append((ts, metric_type, label, json.dumps(event, separators=(",", ":"))))
+            for field in SUMMARY_FIELDS.get(metric_type, ()):
+                value = event.get(field)
+                if not isinstance(value, (int, float)) or isinstance(value, bool) or value < 0:
+                    continue
+                for tier, (width, _) in TIERS.items():
+                    agg = rollups[(tier, metric_type, label, field, int(ts // width) * width)]
+                    agg[0] += 1
+                    agg[1] += value
+                    agg[2] = min(agg[2], value)
+                    agg[3] = max(agg[3], value)
+
+        with conn:
+            conn.executemany("INSERT INTO events (ts, metric_type, label, data) VALUES (?, ?, ?, ?)", rows)
+            conn.executemany(UPSERT_ROLLUP, [key + tuple(agg) for key, agg in rollups.items()])
+
+    def _prune(self, conn, now):
+        try:
+            with conn:
+                for metric_type in SUMMARY_FIELDS:
+                    # Prune per type so the (metric_type, ts) index is used
+                    conn.execute("DELETE FROM events WHERE metric_type = ? AND ts < ?", (metric_type, now - RAW_RETENTION))
+                for tier, (_, retention) in TIERS.items():
+                    conn.execute("DELETE FROM rollups WHERE tier = ? AND bucket < ?", (tier, now - retention))
+        except sqlite3.Error as e:
+            logger.error(f"Failed to prune metrics history: {e}")
+
+
+def default_db_path():
+    return os.getenv("METRICS_DB_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "metrics.db"))
@@ -0,0 +1,158 @@
+"""
+Joins per-component metrics into one end-to-end latency record per turn.
+
+The latency a user feels between finishing a sentence and hearing the agent
+respond is
+
+    end_of_utterance_delay (EOUMetrics) + ttft (LLMMetrics) + ttfb (TTSMetrics)
+
+The three metrics arrive separately, at different times, from different
+plugins, and they share a `speech_id`. `TurnLatencyCorrelator` buffers them by
+`speech_id` until a turn is complete, then emits a `TurnLatency` record and adds
+its total to a rolling window for percentiles.
+"""
+
+import logging
+import time
+from collections import OrderedDict, deque
+from dataclasses import asdict, dataclass
+from typing import Callable, Optional
+
+from livekit.agents.metrics import EOUMetrics, LLMMetrics, TTSMetrics
+
+logger = logging.getLogger("turn-latency")
+
+
+@dataclass
+class TurnLatency:
+    """End-to-end latency breakdown for one user turn, in seconds."""
+    speech_id: str
+    timestamp: float
+    end_of_utterance_delay: float
+    transcription_delay: float
+    llm_ttft: float
+    tts_ttfb: float
+    total_latency: float
+    llm_request_id: Optional[str] = None
+    tts_request_id: Optional[str] = None
+    llm_label: Optional[str] = None
+    tts_label: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class _PendingTurn:
+    __slots__ = ("created_at", "eou", "llm", "tts")
+
+    def __init__(self, created_at: float) -> None:
+        self.created_at = created_at
+        self.eou: Optional[EOUMetrics] = None
+        self.llm: Optional[LLMMetrics] = None
+        self.tts: Optional[TTSMetrics] = None
+
+
+class TurnLatencyCorrelator:
+    """
+    Feed it every metrics event with `observe`; it calls `on_turn` once per
+    completed turn. Only the first LLM and TTS metrics of a speech are used,
+    since those are the ones on the path to the first audio frame.
+
+    Turns that never complete (agent-initiated speech has no EOU, interrupted
+    replies may have no TTS) are discarded after `turn_timeout` seconds, and at
+    most `max_pending` turns are buffered.
+    """
+
+    def __init__(
+        self,
+        on_turn: Optional[Callable[[TurnLatency], None]] = None,
+        *,
+        window: int = 500,
+        turn_timeout: float = 30.0,
+        max_pending: int = 256,
+    ) -> None:
+        self._on_turn = on_turn
+        self._turn_timeout = turn_timeout
+        self._max_pending = max_pending
+        self._pending: OrderedDict[str, _PendingTurn] = OrderedDict()
+        self._totals: deque[float] = deque(maxlen=window)
+        self.completed = 0
+        self.expired = 0
+
+    def attach(self, session) -> None:
+        """Observe every metrics event emitted by an AgentSession."""
+        session.on("metrics_collected", lambda ev: self.observe(ev.metrics))
+
+    def observe(self, metrics) -> None:
+        if isinstance(metrics, EOUMetrics):
+            slot = "eou"
+        elif isinstance(metrics, LLMMetrics):
+            slot = "llm"
+        elif isinstance(metrics, TTSMetrics):
+            slot = "tts"
+        else:
+            return
+
+        speech_id = getattr(metrics, "speech_id", None)
+        if not speech_id:
+            return
+
+        now = time.monotonic()
+        self._expire(now)
+
+        turn = self._pending.get(speech_id)
+        if turn is None:
+            turn = self._pending[speech_id] = _PendingTurn(now)
+            if len(self._pending) > self._max_pending:
+                self._pending.popitem(last=False)
+                self.expired += 1
+
+        if getattr(turn, slot) is None:
+            setattr(turn, slot, metrics)
+
+        if turn.eou is not None and turn.llm is not None and turn.tts is not None:
+            del self._pending[speech_id]
+            self._complete(speech_id, turn)
+
+    def percentiles(self, percentiles=(50, 95, 99)) -> dict:
+        """Percentiles of total latency over the most recent turns."""
+        if not self._totals:
+            return {}
+        ordered = sorted(self._totals)
+        return {
+            f"p{p}": ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+            for p in percentiles
+        }
+
+    def _complete(self, speech_id: str, turn: _PendingTurn) -> None:
+        # ttft is -1 when the LLM produced no tokens; count it as zero rather than
+        # letting it shave a second off the total
+        llm_ttft = max(turn.llm.ttft, 0.0)
+        record = TurnLatency(
+            speech_id=speech_id,
+            timestamp=turn.eou.timestamp,
+            end_of_utterance_delay=turn.eou.end_of_utterance_delay,
+            transcription_delay=turn.eou.transcription_delay,
+            llm_ttft=llm_ttft,
+            tts_ttfb=turn.tts.ttfb,
+            total_latency=turn.eou.end_of_utterance_delay + llm_ttft + turn.tts.ttfb,
+            llm_request_id=turn.llm.request_id,
+            tts_request_id=turn.tts.request_id,
+            llm_label=turn.llm.label,
+            tts_label=turn.tts.label,
+        )
+        self._totals.append(record.total_latency)
+        self.completed += 1
+        if self._on_turn is not None:
+            try:
+                self._on_turn(record)
+            except Exception:
+                logger.exception("error in turn latency callback")
+
+    def _expire(self, now: float) -> None:
+        while self._pending:
+            speech_id, turn = next(iter(self._pending.items()))
+            if now - turn.created_at < self._turn_timeout:
+                break
+            del self._pending[speech_id]
+            self.expired += 1
@@ -8,7 +8,7 @@
 import logging
 from pathlib import Path
 from dotenv import load_dotenv
-from livekit.agents import JobContext, WorkerOptions, cli
+from livekit.agents import JobContext, JobProcess, WorkerOptions, cli
 from livekit.agents.voice import Agent, AgentSession
 from livekit.plugins import openai, deepgram, silero
 from livekit.agents.llm import ChatContext, ChatMessage
@@ -25,6 +25,9 @@ def count_sentences(text):
     sentences = re.findall(r'[^.!?]+[.!?](?:\s|$)', text)
     return len(sentences)
 
+def prewarm(proc: JobProcess):
+    proc.userdata["vad"] = silero.VAD.load()
+
 async def entrypoint(ctx: JobContext):
     await ctx.connect()
     
@@ -34,7 +37,7 @@ async def entrypoint(ctx: JobContext):
         stt=deepgram.STT(),
         llm=openai.LLM(),
         tts=openai.TTS(),
-        vad=silero.VAD.load()
+        vad=ctx.proc.userdata["vad"]
     )
     
     async def handle_interruption(context):
@@ -85,4 +88,4 @@ async def entrypoint(ctx: JobContext):
     await session.start(agent=agent, room=ctx.room)
 
 if __name__ == "__main__":
-    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint))
\ No newline at end of file
+    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint, prewarm_fnc=prewarm))
\ No newline at end of file
@@ -2,7 +2,7 @@ import logging
 from pathlib import Path
 from typing import Optional, Any
 from dotenv import load_dotenv
-from livekit.agents import JobContext, WorkerOptions, cli
+from livekit.agents import JobContext, JobProcess, WorkerOptions, cli
 from livekit.agents.voice import Agent, AgentSession
 from livekit.plugins import openai, deepgram, silero
 from livekit.agents.llm import ChatContext, ChatMessage
@@ -19,8 +19,7 @@ class SimpleAgent(Agent):
             instructions="You are a helpful agent.",
             stt=deepgram.STT(),
             llm=openai.LLM(),
-            tts=openai.TTS(),
-            vad=silero.VAD.load()
+            tts=openai.TTS()
         )
         self.moderator_llm = openai.LLM(model="gpt-4o-mini")
     
@@ -107,9 +106,12 @@ class SimpleAgent(Agent):
 
         return process_stream()
 
+def prewarm(proc: JobProcess):
+    proc.userdata["vad"] = silero.VAD.load()
+
 async def entrypoint(ctx: JobContext):
     await ctx.connect()
-    await AgentSession().start(agent=SimpleAgent(), room=ctx.room)
+    await AgentSession(vad=ctx.proc.userdata["vad"]).start(agent=SimpleAgent(), room=ctx.room)
 
 if __name__ == "__main__":
-    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint))
\ No newline at end of file
+    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint, prewarm_fnc=prewarm))
\ No newline at end of file
@@ -2,7 +2,7 @@ import logging
 import asyncio
 from pathlib import Path
 from dotenv import load_dotenv
-from livekit.agents import JobContext, WorkerOptions, cli
+from livekit.agents import JobContext, JobProcess, WorkerOptions, cli
 from livekit import rtc
 from livekit.agents.voice import Agent, AgentSession
 from livekit.plugins import deepgram, openai, cartesia, silero
@@ -22,17 +22,19 @@ class CartesiaAgent(Agent):
                 sample_rate=44100,
                 model="sonic",
                 voice="87bc56aa-ab01-4baa-9071-77d497064686"
-            ),
-            vad=silero.VAD.load()
+            )
         )
     
     async def on_enter(self):
         await self.session.say(f"Hi there! Is there anything I can help you with?")
 
+def prewarm(proc: JobProcess):
+    proc.userdata["vad"] = silero.VAD.load()
+
 async def entrypoint(ctx: JobContext):
     await ctx.connect()
 
-    session = AgentSession()
+    session = AgentSession(vad=ctx.proc.userdata["vad"])
 
     await session.start(
         agent=CartesiaAgent(),
@@ -40,4 +42,4 @@ async def entrypoint(ctx: JobContext):
     )
 
 if __name__ == "__main__":
-    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint))
\ No newline at end of file
+    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint, prewarm_fnc=prewarm))
\ No newline at end of file
@@ -1,7 +1,7 @@
 import logging
 from pathlib import Path
 from dotenv import load_dotenv
-from livekit.agents import JobContext, WorkerOptions, cli
+from livekit.agents import JobContext, JobProcess, WorkerOptions, cli
 from livekit.agents.llm import function_tool
 from livekit.agents.voice import Agent, AgentSession
 from livekit.plugins import deepgram, openai, elevenlabs, silero
@@ -28,8 +28,7 @@ class LanguageSwitcherAgent(Agent):
                 encoding="pcm_44100",
                 model="eleven_turbo_v2_5",
                 language="en"
-            ),
-            vad=silero.VAD.load()
+            )
         )
         self.current_language = "en"
         
@@ -103,10 +102,14 @@ class LanguageSwitcherAgent(Agent):
         await self._switch_language("it")
 
 
+def prewarm(proc: JobProcess):
+    proc.userdata["vad"] = silero.VAD.load()
+
+
 async def entrypoint(ctx: JobContext):
     await ctx.connect()
 
-    session = AgentSession()
+    session = AgentSession(vad=ctx.proc.userdata["vad"])
 
     await session.start(
         agent=LanguageSwitcherAgent(),
@@ -114,4 +117,4 @@ async def entrypoint(ctx: JobContext):
     )
 
 if __name__ == "__main__":
-    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint))
\ No newline at end of file
+    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint, prewarm_fnc=prewarm))
\ No newline at end of file
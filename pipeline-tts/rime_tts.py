@@ -1,6 +1,6 @@
 from pathlib import Path
 from dotenv import load_dotenv
-from livekit.agents import JobContext, WorkerOptions, cli
+from livekit.agents import JobContext, JobProcess, WorkerOptions, cli
 from livekit.agents.voice import Agent, AgentSession
 from livekit.plugins import deepgram, openai, rime, silero
 
@@ -19,17 +19,19 @@ class RimeAgent(Agent):
                 sample_rate=44100, 
                 model="mistv2", 
                 speaker="abbie"
-            ),
-            vad=silero.VAD.load()
+            )
         )
     
     async def on_enter(self):
         await self.session.say(f"Hi there! Is there anything I can help you with?")
 
+def prewarm(proc: JobProcess):
+    proc.userdata["vad"] = silero.VAD.load()
+
 async def entrypoint(ctx: JobContext):
     await ctx.connect()
 
-    session = AgentSession()
+    session = AgentSession(vad=ctx.proc.userdata["vad"])
 
     await session.start(
         agent=RimeAgent(),
@@ -37,4 +39,4 @@ async def entrypoint(ctx: JobContext):
     )
 
 if __name__ == "__main__":
-    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint))
\ No newline at end of file
+    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint, prewarm_fnc=prewarm))
\ No newline at end of file
@@ -1,7 +1,7 @@
 import logging
 from pathlib import Path
 from dotenv import load_dotenv
-from livekit.agents import JobContext, WorkerOptions, cli
+from livekit.agents import JobContext, JobProcess, WorkerOptions, cli
 from livekit.agents.llm import function_tool
 from livekit.agents.voice import Agent, AgentSession
 from livekit.plugins import deepgram, openai, rime, elevenlabs, cartesia, playai, silero
@@ -23,14 +23,11 @@ class RimeAgent(Agent):
                 You can switch to a different TTS provider if asked.
                 Don't use any unpronouncable characters.
             """,
-            stt=deepgram.STT(),
-            llm=openai.LLM(model="gpt-4o"),
             tts=rime.TTS(
                 sample_rate=44100, 
                 model="mistv2", 
                 speaker="abbie"
-            ),
-            vad=silero.VAD.load()
+            )
         )
 
     async def on_enter(self) -> None:
@@ -40,17 +37,17 @@ class RimeAgent(Agent):
     @function_tool
     async def switch_to_elevenlabs(self):
         """Switch to ElevenLabs TTS voice"""
-        return ElevenLabsAgent()
+        return self.session.userdata["elevenlabs"]
     
     @function_tool
     async def switch_to_cartesia(self):
         """Switch to Cartesia TTS voice"""
-        return CartesiaAgent()
+        return self.session.userdata["cartesia"]
     
     @function_tool
     async def switch_to_playai(self):
         """Switch to PlayAI TTS voice"""
-        return PlayAIAgent()
+        return self.session.userdata["playai"]
 
 
 class ElevenLabsAgent(Agent):
@@ -62,12 +59,9 @@ class ElevenLabsAgent(Agent):
                 You can switch to a different TTS provider if asked.
                 Don't use any unpronouncable characters.
             """,
-            stt=deepgram.STT(),
-            llm=openai.LLM(model="gpt-4o"),
             tts=elevenlabs.TTS(
                 model="eleven_multilingual_v2"
-            ),
-            vad=silero.VAD.load()
+            )
         )
 
     async def on_enter(self) -> None:
@@ -77,17 +71,17 @@ class ElevenLabsAgent(Agent):
     @function_tool
     async def switch_to_rime(self):
         """Switch to Rime TTS voice"""
-        return RimeAgent()
+        return self.session.userdata["rime"]
     
     @function_tool
     async def switch_to_cartesia(self):
         """Switch to Cartesia TTS voice"""
-        return CartesiaAgent()
+        return self.session.userdata["cartesia"]
     
     @function_tool
     async def switch_to_playai(self):
         """Switch to PlayAI TTS voice"""
-        return PlayAIAgent()
+        return self.session.userdata["playai"]
 
 
 class CartesiaAgent(Agent):
@@ -99,14 +93,11 @@ class CartesiaAgent(Agent):
                 You can switch to a different TTS provider if asked.
                 Don't use any unpronouncable characters.
             """,
-            stt=deepgram.STT(),
-            llm=openai.LLM(model="gpt-4o"),
             tts=cartesia.TTS(
                 sample_rate=44100,
                 model="sonic-preview",
                 voice="87bc56aa-ab01-4baa-9071-77d497064686"
-            ),
-            vad=silero.VAD.load()
+            )
         )
 
     async def on_enter(self) -> None:
@@ -116,17 +107,17 @@ class CartesiaAgent(Agent):
     @function_tool
     async def switch_to_rime(self):
         """Switch to Rime TTS voice"""
-        return RimeAgent()
+        return self.session.userdata["rime"]
     
     @function_tool
     async def switch_to_elevenlabs(self):
         """Switch to ElevenLabs TTS voice"""
-        return ElevenLabsAgent()
+        return self.session.userdata["elevenlabs"]
     
     @function_tool
     async def switch_to_playai(self):
         """Switch to PlayAI TTS voice"""
-        return PlayAIAgent()
+        return self.session.userdata["playai"]
 
 
 class PlayAIAgent(Agent):
@@ -138,14 +129,11 @@ class PlayAIAgent(Agent):
                 You can switch to a different TTS provider if asked.
                 Don't use any unpronouncable characters.
             """,
-            stt=deepgram.STT(),
-            llm=openai.LLM(model="gpt-4o"),
             tts=playai.TTS(
                 model="PlayDialog",
                 sample_rate=44100,
                 voice="s3://voice-cloning-zero-shot/9f1ee23a-9108-4538-90be-8e62efc195b6/charlessaad/manifest.json"
-            ),
-            vad=silero.VAD.load()
+            )
         )
 
     async def on_enter(self) -> None:
@@ -155,28 +143,45 @@ class PlayAIAgent(Agent):
     @function_tool
     async def switch_to_rime(self):
         """Switch to Rime TTS voice"""
-        return RimeAgent()
+        return self.session.userdata["rime"]
     
     @function_tool
     async def switch_to_elevenlabs(self):
         """Switch to ElevenLabs TTS voice"""
-        return ElevenLabsAgent()
+        return self.session.userdata["elevenlabs"]
     
     @function_tool
     async def switch_to_cartesia(self):
         """Switch to Cartesia TTS voice"""
-        return CartesiaAgent()
+        return self.session.userdata["cartesia"]
+
+
+def prewarm(proc: JobProcess):
+    proc.userdata["vad"] = silero.VAD.load()
 
 
 async def entrypoint(ctx: JobContext):
     await ctx.connect()
 
-    session = AgentSession()
+    # Each provider's agent is built once and reused on every switch; STT,
+    # LLM and VAD belong to the session, so only the TTS changes
+    agents = {
+        "rime": RimeAgent(),
+        "elevenlabs": ElevenLabsAgent(),
+        "cartesia": CartesiaAgent(),
+        "playai": PlayAIAgent(),
+    }
+    session = AgentSession(
+        userdata=agents,
+        stt=deepgram.STT(),
+        llm=openai.LLM(model="gpt-4o"),
+        vad=ctx.proc.userdata["vad"],
+    )
 
     await session.start(
-        agent=RimeAgent(),
+        agent=agents["rime"],
         room=ctx.room
     )
 
 if __name__ == "__main__":
-    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint))
+    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint, prewarm_fnc=prewarm))
@@ -21,6 +21,7 @@ import annoy
 
 from livekit.agents import (
     JobContext,
+    JobProcess,
     WorkerOptions,
     cli,
     RunContext,
@@ -214,6 +215,10 @@ class RAGEnrichedAgent(Agent):
         )
 
 
+def prewarm(proc: JobProcess):
+    proc.userdata["vad"] = silero.VAD.load()
+
+
 async def entrypoint(ctx: JobContext):
     """Main entrypoint for the agent."""
     await ctx.connect()
@@ -226,7 +231,7 @@ async def entrypoint(ctx: JobContext):
             voice="ash",
         ),
         turn_detection=EnglishModel(),
-        vad=silero.VAD.load(),
+        vad=ctx.proc.userdata["vad"],
     )
 
     await session.start(
@@ -239,4 +244,4 @@ async def entrypoint(ctx: JobContext):
 
 
 if __name__ == "__main__":
-    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint))
+    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint, prewarm_fnc=prewarm))
@@ -13,12 +13,15 @@ class Assistant(Agent):
     def __init__(self) -> None:
         super().__init__(instructions="You are a helpful voice AI assistant.")
 
+def prewarm(proc: agents.JobProcess):
+    proc.userdata["vad"] = silero.VAD.load()
+
 async def entrypoint(ctx: agents.JobContext):
     await ctx.connect()
 
     session = AgentSession(
         llm=openai.realtime.RealtimeModel(),
-        vad=silero.VAD.load()
+        vad=ctx.proc.userdata["vad"]
     )
 
     await session.start(
@@ -30,4 +33,4 @@ async def entrypoint(ctx: agents.JobContext):
 
 
 if __name__ == "__main__":
-    agents.cli.run_app(agents.WorkerOptions(entrypoint_fnc=entrypoint))
\ No newline at end of file
+    agents.cli.run_app(agents.WorkerOptions(entrypoint_fnc=entrypoint, prewarm_fnc=prewarm))
\ No newline at end of file
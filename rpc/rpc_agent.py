@@ -17,7 +17,7 @@ from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Optional, Dict, Any
 from dotenv import load_dotenv
-from livekit.agents import JobContext, WorkerOptions, cli, RoomOutputOptions
+from livekit.agents import JobContext, JobProcess, WorkerOptions, cli, RoomOutputOptions
 from livekit.agents.voice import Agent, AgentSession, RunContext
 from livekit.agents.llm import function_tool
 from livekit.plugins import openai, silero, deepgram
@@ -119,8 +119,7 @@ class RPCStateAgent(Agent):
             """,
             stt=deepgram.STT(),
             llm=openai.LLM(model="gpt-4o"),
-            tts=openai.TTS(),
-            vad=silero.VAD.load()
+            tts=openai.TTS()
         )
 
     @function_tool
@@ -229,6 +228,10 @@ class RPCStateAgent(Agent):
         return f"Deleted note with ID: {note_id}"
 
 
+def prewarm(proc: JobProcess):
+    proc.userdata["vad"] = silero.VAD.load()
+
+
 async def entrypoint(ctx: JobContext):
     await ctx.connect()
 
@@ -239,7 +242,7 @@ async def entrypoint(ctx: JobContext):
     # This makes the userdata available to the LLM through the RunContext
     # Note the generic type parameter [UserSessionData] which tells the
     # agent session what type of data to expect
-    session = AgentSession[UserSessionData](userdata=userdata)
+    session = AgentSession[UserSessionData](userdata=userdata, vad=ctx.proc.userdata["vad"])
     agent = RPCStateAgent()
     
     # How session data flows to the LLM:
@@ -431,4 +434,4 @@ async def entrypoint(ctx: JobContext):
     )
 
 if __name__ == "__main__":
-    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint))
+    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint, prewarm_fnc=prewarm))
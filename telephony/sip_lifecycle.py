@@ -4,7 +4,7 @@ import os
 import uuid
 from pathlib import Path
 from dotenv import load_dotenv
-from livekit.agents import JobContext, WorkerOptions, cli
+from livekit.agents import JobContext, JobProcess, WorkerOptions, cli
 from livekit import rtc
 from livekit import api
 from livekit.agents.llm import function_tool
@@ -28,8 +28,7 @@ class SIPLifecycleAgent(Agent):
             llm=openai.LLM(model="gpt-4o"),
             tts=elevenlabs.TTS(
                 model="eleven_multilingual_v2"
-            ),
-            vad=silero.VAD.load()
+            )
         )
 
     @function_tool
@@ -145,10 +144,13 @@ class SIPLifecycleAgent(Agent):
     async def on_enter(self):
         self.session.generate_reply()
 
+def prewarm(proc: JobProcess):
+    proc.userdata["vad"] = silero.VAD.load()
+
 async def entrypoint(ctx: JobContext):
     await ctx.connect()
     
-    session = AgentSession()
+    session = AgentSession(vad=ctx.proc.userdata["vad"])
     agent = SIPLifecycleAgent(job_context=ctx)
 
     await session.start(
@@ -223,4 +225,4 @@ async def entrypoint(ctx: JobContext):
     ctx.room.on("participant_attributes_changed", on_participant_attributes_changed_handler)
 
 if __name__ == "__main__":
-    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint))
+    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint, prewarm_fnc=prewarm))
@@ -5,7 +5,7 @@ import pandas as pd
 import json
 from pathlib import Path
 from dotenv import load_dotenv
-from livekit.agents import JobContext, WorkerOptions, cli
+from livekit.agents import JobContext, JobProcess, WorkerOptions, cli
 from livekit.agents.voice import Agent, AgentSession, RunContext
 from livekit.agents.llm import function_tool
 from livekit.plugins import openai, silero, deepgram
@@ -44,8 +44,7 @@ class SurveyAgent(Agent):
             instructions=instructions,
             stt=deepgram.STT(),
             llm=openai.LLM(model="gpt-4o"),
-            tts=openai.TTS(),
-            vad=silero.VAD.load()
+            tts=openai.TTS()
         )
 
     @function_tool
@@ -69,6 +68,9 @@ class SurveyAgent(Agent):
 
         return None, f"[Call ended]"
 
+def prewarm(proc: JobProcess):
+    proc.userdata["vad"] = silero.VAD.load()
+
 async def entrypoint(ctx: JobContext):
     await ctx.connect()
     
@@ -87,7 +89,7 @@ async def entrypoint(ctx: JobContext):
         "row_index": row_index
     }
     
-    session = AgentSession()
+    session = AgentSession(vad=ctx.proc.userdata["vad"])
     agent = SurveyAgent(question=question, context=context, job_context=ctx)
     
     await session.start(
@@ -96,4 +98,4 @@ async def entrypoint(ctx: JobContext):
     )
 
 if __name__ == "__main__":
-    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint, agent_name="survey-agent"))
\ No newline at end of file
+    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint, prewarm_fnc=prewarm, agent_name="survey-agent"))
\ No newline at end of file
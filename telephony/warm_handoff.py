@@ -3,7 +3,7 @@ import os
 import uuid
 from pathlib import Path
 from dotenv import load_dotenv
-from livekit.agents import JobContext, WorkerOptions, cli
+from livekit.agents import JobContext, JobProcess, WorkerOptions, cli
 from livekit import rtc
 from livekit import api
 from livekit.agents.llm import function_tool
@@ -25,8 +25,7 @@ class WarmHandoffAgent(Agent):
             tts=elevenlabs.TTS(
                 encoding="pcm_44100",
                 model="eleven_multilingual_v2"
-            ),
-            vad=silero.VAD.load()
+            )
         )
 
     @function_tool
@@ -103,10 +102,13 @@ class WarmHandoffAgent(Agent):
         # Generate initial greeting
         self.session.generate_reply()
 
+def prewarm(proc: JobProcess):
+    proc.userdata["vad"] = silero.VAD.load()
+
 async def entrypoint(ctx: JobContext):
     await ctx.connect()
 
-    session = AgentSession()
+    session = AgentSession(vad=ctx.proc.userdata["vad"])
     agent = WarmHandoffAgent(job_context=ctx)
 
     await session.start(
@@ -128,4 +130,4 @@ async def entrypoint(ctx: JobContext):
     ctx.room.on("participant_connected", on_participant_connected_handler)
 
 if __name__ == "__main__":
-    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint))
\ No newline at end of file
+    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint, prewarm_fnc=prewarm))
\ No newline at end of file
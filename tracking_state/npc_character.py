@@ -5,10 +5,10 @@ from typing import List, Annotated
 from enum import Enum
 from pydantic import Field
 
-from livekit.agents import JobContext, WorkerOptions, cli
+from livekit.agents import JobContext, JobProcess, WorkerOptions, cli
 from livekit.agents.llm import function_tool
 from livekit.agents.voice import Agent, AgentSession
-from livekit.plugins import deepgram, openai, cartesia, silero
+from livekit.plugins import deepgram, openai, elevenlabs, silero
 from livekit import api
 
 # Load environment and configure logger
@@ -26,13 +26,9 @@ class BaseAgent(Agent):
     """Base agent class handling common setup and job context."""
     def __init__(self, job_context: JobContext, instructions: str) -> None:
         self.job_context = job_context
-        super().__init__(
-            instructions=instructions,
-            stt=deepgram.STT(),
-            llm=openai.LLM(model="gpt-4o"),
-            tts=elevenlabs.TTS(),
-            vad=silero.VAD.load()
-        )
+        # Plugins are inherited from the session, so returning to the main
+        # conversation after a topic is just a new Agent, not new clients
+        super().__init__(instructions=instructions)
 
     @function_tool
     async def adjust_rapport(self, delta: int) -> int:
@@ -161,9 +157,18 @@ class NPCSummaryAgent(BaseAgent):
         except Exception as e:
             logger.error(f"Error deleting room: {e}")
 
+def prewarm(proc: JobProcess):
+    proc.userdata["vad"] = silero.VAD.load()
+
 async def entrypoint(ctx: JobContext) -> None:
     await ctx.connect()
-    session = AgentSession[NPCData]()
+    # One set of plugins for the whole conversation, shared by every agent
+    session = AgentSession[NPCData](
+        stt=deepgram.STT(),
+        llm=openai.LLM(model="gpt-4o"),
+        tts=elevenlabs.TTS(),
+        vad=ctx.proc.userdata["vad"],
+    )
     session.userdata = NPCData()
     await session.start(
         agent=NPCAgent(job_context=ctx),
@@ -171,4 +176,4 @@ async def entrypoint(ctx: JobContext) -> None:
     )
 
 if __name__ == "__main__":
-    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint))
\ No newline at end of file
+    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint, prewarm_fnc=prewarm))
\ No newline at end of file
@@ -2,7 +2,7 @@ import logging
 
 from dotenv import load_dotenv
 from livekit import rtc
-from livekit.agents import AutoSubscribe, JobContext, WorkerOptions, cli
+from livekit.agents import AutoSubscribe, JobContext, JobProcess, WorkerOptions, cli
 from livekit.agents.llm import ImageContent, ChatContext, ChatMessage
 from livekit.agents.voice import AgentSession, Agent, room_io
 from livekit.plugins import (
@@ -60,7 +60,6 @@ class Assistant(Agent):
                 "When you see an image in our conversation, naturally incorporate what you see "
                 "into your response. Keep visual descriptions brief but informative."
             ),
-            vad=silero.VAD.load(),
             stt=deepgram.STT(),
             llm=openai.LLM(model="gpt-4o-mini"),
             tts=cartesia.TTS(),
@@ -87,6 +86,10 @@ class Assistant(Agent):
         await self.update_chat_ctx(chat_ctx)
 
 
+def prewarm(proc: JobProcess):
+    proc.userdata["vad"] = silero.VAD.load()
+
+
 async def entrypoint(ctx: JobContext):
     logger.info(f"connecting to room {ctx.room.name}")
     await ctx.connect(auto_subscribe=AutoSubscribe.SUBSCRIBE_ALL)
@@ -98,6 +101,7 @@ async def entrypoint(ctx: JobContext):
     session = AgentSession(
         min_endpointing_delay=0.5,
         max_endpointing_delay=5.0,
+        vad=ctx.proc.userdata["vad"],
     )
 
     await session.start(
@@ -113,4 +117,4 @@ async def entrypoint(ctx: JobContext):
 
 
 if __name__ == "__main__":
-    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint))
\ No newline at end of file
+    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint, prewarm_fnc=prewarm))
\ No newline at end of file